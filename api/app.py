@@ -1,24 +1,261 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-import joblib
-import pandas as pd
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError, model_validator
+import hmac
+import os
+import time
 import numpy as np
-from typing import List
+from typing import Dict, List, Optional
+
+from api import formats
+from api.audit import AuditLogger
+from api.batching import MicroBatcher
+from api.cache import PredictionCache
+from api.drift import DriftMonitor
+from api.metrics import Metrics
+from api.profiler import SamplingProfiler
+from api.registry import ModelRegistry
+from src.explain import DEFAULT_WHATIF_FEATURES, whatif_grid
+from src.score_index import IndexCatalog
+from src.scoring import RISK_LABELS
+from src.validation import BulkValidationError, CustomerBatch
+
+# ========== CONFIG ==========
+MODELS_DIR = "models"
+MODEL_PATH = "models/churn_pipeline.pkl"  # default model version ("churn_pipeline")
+
+# Fast cold start: serve from the exported models/<name>.model/ (python -m src.artifact export)
+# or precompiled models/<name>.npz when it is newer than the .pkl, without importing sklearn / pandas
+FAST_START = os.getenv("CHURN_FAST_START", "0") == "1"
+
+# Poll MODELS_DIR for new/changed .pkl files every N seconds (0 = only POST /admin/reload)
+MODEL_WATCH_SECONDS = float(os.getenv("CHURN_MODEL_WATCH_SECONDS", "0"))
+
+# Rows scored per chunk by the streaming batch endpoint (bounds memory per step)
+BATCH_CHUNK_SIZE = int(os.getenv("CHURN_BATCH_CHUNK_SIZE", "10000"))
+
+# Opt-in micro-batching of concurrent /predict calls:
+# wait up to MAX_WAIT_MS for up to MAX_SIZE requests, then score them together
+MICROBATCH_ENABLED = os.getenv("CHURN_MICROBATCH", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.getenv("CHURN_MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("CHURN_MICROBATCH_MAX_WAIT_MS", "2"))
+
+# Prediction cache for repeat customers (CHURN_CACHE_MAX_ENTRIES=0 disables it)
+CACHE_MAX_ENTRIES = int(os.getenv("CHURN_CACHE_MAX_ENTRIES", "100000"))
+CACHE_MAX_BYTES = int(os.getenv("CHURN_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv("CHURN_CACHE_TTL_SECONDS", "3600"))
+
+# Audit trail of every prediction (features, probability, risk, model version, latency)
+# as rotated JSONL files in CHURN_AUDIT_DIR (unset = disabled)
+AUDIT_DIR = os.getenv("CHURN_AUDIT_DIR", "")
+AUDIT_MAX_QUEUE = int(os.getenv("CHURN_AUDIT_MAX_QUEUE", "10000"))
+AUDIT_ROTATE_MB = float(os.getenv("CHURN_AUDIT_ROTATE_MB", "64"))
+AUDIT_ROTATE_SECONDS = float(os.getenv("CHURN_AUDIT_ROTATE_SECONDS", "3600"))
+AUDIT_COMPRESS = os.getenv("CHURN_AUDIT_COMPRESS", "1") == "1"
+AUDIT_DROP_POLICY = os.getenv("CHURN_AUDIT_DROP_POLICY", "drop_newest")  # or drop_oldest
+
+# Drift monitor: live feature distributions vs the training profile (python -m api.drift),
+# served on GET /drift (empty CHURN_DRIFT_REFERENCE or a missing file = disabled)
+DRIFT_REFERENCE = os.getenv("CHURN_DRIFT_REFERENCE", "models/drift_reference.json")
+DRIFT_MIN_ROWS = int(os.getenv("CHURN_DRIFT_MIN_ROWS", "100"))
+
+# Prometheus-style GET /metrics: request counts, latency and per-stage timings
+METRICS_ENABLED = os.getenv("CHURN_METRICS", "1") == "1"
+
+# Sampling profiler (flamegraph stacks on GET /admin/profiler); can also be
+# switched on and off at runtime with POST /admin/profiler
+PROFILER_ENABLED = os.getenv("CHURN_PROFILER", "0") == "1"
+PROFILER_INTERVAL_MS = float(os.getenv("CHURN_PROFILER_INTERVAL_MS", "5"))
+
+# Precomputed customer scores (python -m src.score_index), one subdirectory per model version
+SCORE_INDEX_DIR = os.getenv("CHURN_SCORE_INDEX_DIR", "models/score_index")
+
+# Batch bodies: validated column by column against the model's categories, straight into
+# typed arrays (1), or with pydantic, one Customer object per row (0)
+BULK_VALIDATION = os.getenv("CHURN_BULK_VALIDATION", "1") == "1"
+
+# Opt-in: /predict also applies the batch rules (known categories, tenure >= 0, numeric
+# TotalCharges) and answers 422 where it would otherwise score what the Customer model accepts
+PREDICT_STRICT = os.getenv("CHURN_PREDICT_STRICT", "0") == "1"
+
+# Shared secret for the /admin endpoints, sent as `Authorization: Bearer <token>`
+# (unset = the admin endpoints are disabled)
+ADMIN_TOKEN = os.getenv("CHURN_ADMIN_TOKEN", "")
+
+# ========== LOAD MODEL ==========
+metrics = Metrics() if METRICS_ENABLED else None
+profiler = SamplingProfiler(interval=PROFILER_INTERVAL_MS / 1000)
+
+DEFAULT_MODEL = os.path.splitext(os.path.basename(MODEL_PATH))[0]
+registry = ModelRegistry(MODELS_DIR, DEFAULT_MODEL, fast_start=FAST_START, metrics=metrics)
 
-# Load the saved pipeline
-MODEL_PATH = "models/churn_pipeline.pkl"
 print(f"Loading model from: {MODEL_PATH}")
+registry.load(DEFAULT_MODEL, MODEL_PATH, require_healthy=False)
+print(f"Model loaded successfully! ({registry.get().loaded_from})")
+print(f"Self-test: {registry.get().readiness['status']}")
+
+
+# ========== SCORING HELPERS ==========
+def record_stage(stage, start):
+    """Time since `start` spent in `stage` of the current request (GET /metrics)"""
+    if metrics is not None:
+        metrics.observe_stage(stage, start)
+
+
+def score_customers(version, batch):
+    """Churn probabilities for a CustomerBatch: on the scoring processes when api.serve started them, else here"""
+    if scoring_pool is not None and scoring_pool.accepts(version, batch):
+        return scoring_pool.score(version, batch)
+    return version.score_batch(batch)
+
+
+def score_columns(version, columns):
+    """Churn probabilities for already-validated columns ({feature: values}), see score_customers"""
+    if scoring_pool is not None and version.validator is not None:
+        try:
+            batch = version.validator.validate(columns)
+        except BulkValidationError:
+            # Values pydantic let through but the typed arrays can't hold: score them here as before
+            scoring_pool.in_process += 1
+            return version.score_columns(columns)
+        return score_customers(version, batch)
+    return version.score_columns(columns)
+
+
+def predict_many(items):
+    """
+    Score a list of (model version, customer dict) pairs, one model call per version.
+    Returns (prediction 0/1, churn probability) per item, in order.
+    """
+    if metrics is not None:
+        metrics.observe_batch_size(len(items), "microbatch")
+    results = [None] * len(items)
+    groups = {}
+    for i, (version, _) in enumerate(items):
+        groups.setdefault(version, []).append(i)
+
+    for version, indices in groups.items():
+        columns = {col: [items[i][1][col] for i in indices] for col in items[indices[0]][1]}
+        probabilities = score_columns(version, columns)
+        labels = version.decision.labels(probabilities)
+        for i, label, p in zip(indices, labels.tolist(), probabilities.tolist()):
+            results[i] = (label, p)
+    return results
+
+
+def get_version(model):
+    """Version serving this request (404 if an unknown model is asked for)"""
+    try:
+        return registry.route(model)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model '{model}' is not loaded")
+
+
+batcher = MicroBatcher(predict_many, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS) if MICROBATCH_ENABLED else None
+
+cache = PredictionCache(
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    ttl=CACHE_TTL_SECONDS
+) if CACHE_MAX_ENTRIES > 0 else None
+
+audit = AuditLogger(
+    AUDIT_DIR,
+    max_queue=AUDIT_MAX_QUEUE,
+    rotate_bytes=int(AUDIT_ROTATE_MB * 1024 * 1024),
+    rotate_seconds=AUDIT_ROTATE_SECONDS,
+    compress=AUDIT_COMPRESS,
+    drop_policy=AUDIT_DROP_POLICY
+) if AUDIT_DIR else None
+
+drift = DriftMonitor.load(
+    DRIFT_REFERENCE,
+    min_rows=DRIFT_MIN_ROWS
+) if DRIFT_REFERENCE and os.path.exists(DRIFT_REFERENCE) else None
+
+score_indexes = IndexCatalog(SCORE_INDEX_DIR) if SCORE_INDEX_DIR else None
+
+# Scoring processes fed through shared memory (api.scoring_pool); set in every front-end
+# by `python -m api.serve --scorers N`. None = requests are scored in this process
+scoring_pool = None
 
-pipeline = joblib.load(MODEL_PATH)
-print("Model loaded successfully!")
+# Worker processes serving this app (set by `python -m api.serve --workers N`). Registry
+# changes only reach the worker that makes them, so with several workers the runtime
+# admin changes are refused and every worker watches MODELS_DIR instead
+workers = 1
+
+
+def get_score_index(model):
+    """Score index of the requested (or default) version: 404 if none was built, 409 if it is stale"""
+    if score_indexes is None:
+        raise HTTPException(status_code=404, detail="Score index lookups are disabled")
+    try:
+        version = registry.get(model)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model '{model}' is not loaded")
+    try:
+        index = score_indexes.get(version.name, version.path)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No score index for '{version.name}' in {SCORE_INDEX_DIR}; "
+                                                    f"build one with python -m src.score_index")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if index.manifest.get("risk_thresholds", version.decision.risk_thresholds) != version.decision.risk_thresholds:
+        raise HTTPException(status_code=409, detail=f"The score index for '{version.name}' was built with risk "
+                                                    f"thresholds {index.manifest['risk_thresholds']}, the model "
+                                                    f"uses {version.decision.risk_thresholds}; rebuild it")
+    return version, index
+
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    """/admin/* guard: 404 while CHURN_ADMIN_TOKEN is unset, 401 without the right bearer token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled (set CHURN_ADMIN_TOKEN)")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Missing or invalid admin token",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+def require_single_worker(change):
+    """409 for a registry change that would only reach one of several workers"""
+    if workers > 1:
+        raise HTTPException(status_code=409, detail=f"Serving with {workers} workers: {change} would only apply to "
+                                                    f"the worker that got this request. New or changed model files "
+                                                    f"in {MODELS_DIR}/ are picked up by every worker; restart with "
+                                                    f"--workers 1 to change models or routing at runtime")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if MODEL_WATCH_SECONDS > 0:
+        # Started per worker (threads don't survive the fork in api.serve)
+        registry.watch(MODEL_WATCH_SECONDS)
+    if PROFILER_ENABLED:
+        profiler.start()
+    yield
+    profiler.stop()
+    if batcher is not None:
+        await batcher.stop()
+    if audit is not None:
+        audit.close()
 
 
 # Create FastAPI app
 app = FastAPI(
     title="Telecom Churn Prediction API",
     description="API to predict customer churn for telecom company",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if formats.orjson is not None else JSONResponse
 )
+if metrics is not None:
+    # Every route below records request counts, latency and validation/serialization time
+    app.router.route_class = metrics.route_class()
 
 
 # ========== DATA MODELS ==========
@@ -44,12 +281,148 @@ class Customer(BaseModel):
     TotalCharges: str  # Can be empty string for new customers!
 
 
+class CustomerColumns(BaseModel):
+    """Column-oriented batch: one list per feature, all the same length"""
+    gender: List[str]
+    SeniorCitizen: List[int]
+    Partner: List[str]
+    Dependents: List[str]
+    tenure: List[int]
+    PhoneService: List[str]
+    MultipleLines: List[str]
+    InternetService: List[str]
+    OnlineSecurity: List[str]
+    OnlineBackup: List[str]
+    DeviceProtection: List[str]
+    TechSupport: List[str]
+    StreamingTV: List[str]
+    StreamingMovies: List[str]
+    Contract: List[str]
+    PaperlessBilling: List[str]
+    PaymentMethod: List[str]
+    MonthlyCharges: List[float]
+    TotalCharges: List[str]
+
+    @model_validator(mode="after")
+    def check_same_length(self):
+        lengths = {len(values) for values in dict(self).values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same number of customers")
+        return self
+
+    def __len__(self):
+        return len(self.gender)
+
+
 class Prediction(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())  # allow the model_version field
+
     churn_prediction: str  # "Churn" or "No Churn"
     churn_probability: float  # 0.0 to 1.0
     risk_level: str  # "Low", "Medium", "High"
+    model_version: Optional[str] = None  # which model version answered
+
+
+class WhatIfRequest(BaseModel):
+    customer: Customer
+    features: List[str] = list(DEFAULT_WHATIF_FEATURES)  # categorical columns to vary
+    values: Dict[str, List[str]] = {}  # only try these values for a column (default: every category)
+
+
+class ReloadRequest(BaseModel):
+    name: Optional[str] = None  # loads models/<name>.pkl (default model if omitted)
 
 
+class RoutingRequest(BaseModel):
+    split: Dict[str, float] = {}  # e.g. {"churn_pipeline": 90, "v2": 10}
+    shadow: Optional[str] = None  # also score every request with this version
+
+
+class ProfilerRequest(BaseModel):
+    enabled: bool
+    interval_ms: Optional[float] = None  # sampling interval (keeps the current one if omitted)
+    reset: bool = False  # drop the stacks collected so far
+
+
+
+# ========== BATCH BODIES ==========
+FEATURES = list(Customer.model_fields)
+CUSTOMER_LIST = TypeAdapter(List[Customer])
+
+
+def batch_body(schema):
+    """OpenAPI requestBody for a batch endpoint that reads (and negotiates) its body itself"""
+    return {"requestBody": {"required": True, "content": {
+        media_type: {"schema": schema} for media_type in formats.REQUEST_FORMATS
+    }}}
+
+
+def negotiate(request, supported, default):
+    """Response format for the Accept header (406 if none of `supported` is acceptable)"""
+    try:
+        return formats.response_format(request.headers.get("accept"), supported, default)
+    except formats.FormatError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+def parse_batch(version, content_type, body):
+    """
+    Batch body in any supported format, as rows or columns -> validated CustomerBatch
+    (400 / 415 / 422 like FastAPI's own parsing; 422s list the invalid values by row)
+    """
+    start = time.perf_counter()
+    try:
+        payload = formats.decode(formats.request_format(content_type), body)
+    except formats.FormatError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    record_stage("decode", start)
+
+    start = time.perf_counter()
+    if BULK_VALIDATION and version.validator is not None:
+        try:
+            batch = version.validator.validate(payload)
+        except BulkValidationError as e:
+            raise RequestValidationError(validation_errors(e.errors, e.error_count))
+    else:
+        try:
+            if isinstance(payload, list):
+                customers = CUSTOMER_LIST.validate_python(payload)
+                columns = {col: [getattr(c, col) for c in customers] for col in FEATURES}
+            else:
+                columns = dict(CustomerColumns.model_validate(payload))
+        except ValidationError as e:
+            raise RequestValidationError(validation_errors(e.errors(include_url=False)))
+        batch = CustomerBatch.from_columns(columns)
+    record_stage("schema", start)
+    return batch
+
+
+def validation_errors(errors, error_count=None):
+    """Errors located in the request body, plus a note if only the first ones are listed"""
+    errors = [{**error, "loc": ("body", *error["loc"])} for error in errors]
+    if error_count is not None and error_count > len(errors):
+        errors.append({"loc": ("body",), "msg": f"{error_count - len(errors)} more errors not shown",
+                       "type": "too_many_errors"})
+    return errors
+
+
+# ========== STREAMING ==========
+def stream_predictions(version, batch, encoder):
+    """Score `batch` in BATCH_CHUNK_SIZE chunks and yield each chunk's encoded predictions"""
+    for start in range(0, len(batch), BATCH_CHUNK_SIZE):
+        chunk = batch.take(slice(start, start + BATCH_CHUNK_SIZE))
+
+        chunk_start = time.perf_counter()
+        probabilities = score_customers(version, chunk)
+        if audit is not None:
+            audit.log_batch("/predict_batch/columns", version.name, (time.perf_counter() - chunk_start) * 1000,
+                            chunk.columns(), probabilities, version.decision.risk_levels(probabilities))
+        if drift is not None:
+            drift.update_columns(chunk.columns())
+
+        yield encoder.encode(start, probabilities)
+    yield encoder.close()
+
 
 # ========== ENDPOINTS ==========
 @app.get("/")
@@ -59,115 +432,407 @@ def home():
         "endpoints": {
             "GET /": "This info page",
             "GET /health": "Check API health",
+            "GET /livez": "Liveness probe",
+            "GET /readyz": "Readiness probe (cached warm-up self-test)",
+            "GET /stats": "Runtime stats (micro-batching, prediction cache, audit log, drift monitor, score index, "
+                          "scoring processes)",
+            "GET /drift": "Live feature drift vs the training data (PSI / KS per feature)",
+            "GET /metrics": "Prometheus metrics (requests, errors, latency, per-stage timings, batch sizes)",
+            "POST /drift/reset": "Restart the drift window",
             "POST /predict": "Predict for single customer",
-            "POST /predict_batch": "Predict for multiple customers"
+            "POST /predict_batch": "Predict for multiple customers",
+            "POST /predict_batch/columns": "Column-oriented batch, streamed back as NDJSON",
+            "POST /explain": "Per-feature contributions to each customer's churn score",
+            "POST /whatif": "Churn probability for every combination of alternative Contract / TechSupport / ...",
+            "GET /customers/{customer_id}/risk": "Precomputed risk of a known customer (score index)",
+            "GET /customers/top": "Highest-risk known customers (score index)",
+            "GET /customers/risk_bands": "Known customers per risk band (score index)",
+            "GET /models": "Loaded model versions, routing and swap stats",
+            "POST /admin/reload": "Load / hot-swap a model version in the background",
+            "POST /admin/routing": "Set traffic split and shadow model",
+            "GET /admin/profiler": "Sampled stacks in flamegraph (collapsed) format",
+            "POST /admin/profiler": "Switch the sampling profiler on/off"
         }
     }
 
+@app.get("/livez")
+async def liveness_check():
+    """Liveness: the process is up and serving requests (no model work)"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness: cached result of the warm-up self-test (503 if it failed)"""
+    readiness = registry.get().readiness
+    if readiness["status"] != "healthy":
+        return JSONResponse(status_code=503, content=readiness)
+    return readiness
+
 @app.get("/health")
-def health_check():
-    """Check if API and model are working"""
+async def health_check():
+    """Check if API and model are working (kept for compatibility, same as /readyz)"""
+    return {**registry.get().readiness, "timestamp": datetime.now().isoformat()}
+
+@app.get("/stats")
+def stats():
+    """Runtime stats for the optional serving components"""
+    return {
+        "microbatch": batcher.stats() if batcher is not None else {"enabled": False},
+        "cache": cache.stats() if cache is not None else {"enabled": False},
+        "audit": audit.stats() if audit is not None else {"enabled": False},
+        "drift": drift.stats() if drift is not None else {"enabled": False},
+        "score_index": score_indexes.stats() if score_indexes is not None else {"enabled": False},
+        "scoring_pool": scoring_pool.stats() if scoring_pool is not None else {"enabled": False}
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Request counts, error counts, latency, per-stage timings and batch sizes (Prometheus text format)"""
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (CHURN_METRICS=0)")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/drift")
+def drift_report():
+    """PSI (and KS for numeric features) of live traffic vs the training data, per feature"""
+    if drift is None:
+        return {"enabled": False}
+    return drift.report()
+
+@app.post("/drift/reset")
+def drift_reset():
+    """Start counting live traffic from scratch (e.g. after a retrain)"""
+    if drift is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring is disabled")
+    drift.reset()
+    return {"status": "reset"}
+
+@app.get("/models")
+def list_models():
+    """Loaded model versions (load time, memory), routing and recent swaps"""
+    return registry.stats()
+
+@app.post("/admin/reload", status_code=202, dependencies=[Depends(require_admin)])
+def reload_model(request: ReloadRequest = ReloadRequest()):
+    """
+    Load (or re-load) a model version in the background and swap it in when warm.
+    The current version keeps serving until then; see GET /models for the result.
+    """
+    require_single_worker("a reload")
+    name = request.name or registry.default_name
+    if os.path.basename(name) != name or name.startswith("."):
+        raise HTTPException(status_code=400, detail="Model name must be a file name in the models directory")
+    path = registry.path_for(name)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"Model file not found: {path}")
+    registry.reload(name, path)
+    return {"status": "loading", "model": name, "path": path}
+
+@app.post("/admin/routing", dependencies=[Depends(require_admin)])
+def set_routing(request: RoutingRequest):
+    """Route traffic by percentage across loaded versions and/or shadow one of them"""
+    require_single_worker("a routing change")
     try:
-        # Quick test prediction
-        test_data = pd.DataFrame([{
-            "gender": "Female",
-            "SeniorCitizen": 0,
-            "Partner": "Yes",
-            "Dependents": "No",
-            "tenure": 1,
-            "PhoneService": "Yes",
-            "MultipleLines": "No",
-            "InternetService": "DSL",
-            "OnlineSecurity": "No",
-            "OnlineBackup": "Yes",
-            "DeviceProtection": "No",
-            "TechSupport": "No",
-            "StreamingTV": "No",
-            "StreamingMovies": "No",
-            "Contract": "Month-to-month",
-            "PaperlessBilling": "Yes",
-            "PaymentMethod": "Electronic check",
-            "MonthlyCharges": 29.85,
-            "TotalCharges": "29.85"
-        }])
-        
-        _ = pipeline.predict(test_data)
-        
-        return {
-            "status": "healthy",
-            "model": "loaded",
-            "model_type": str(type(pipeline)),
-            "timestamp": pd.Timestamp.now().isoformat()
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "model": "error"
-        }
-    
+        registry.set_routing(request.split, request.shadow)
+    except KeyError as e:
+        raise HTTPException(status_code=422, detail=f"Model {e} is not loaded")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"split": registry.split, "shadow": registry.shadow}
+
+@app.get("/admin/profiler", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+def profiler_stacks():
+    """
+    Stacks sampled so far, one 'frame;frame;...;leaf count' line each:
+    feed to flamegraph.pl or speedscope. Status is in the X-Profiler-* headers.
+    """
+    stats = profiler.stats()
+    return PlainTextResponse(profiler.folded(), headers={
+        "X-Profiler-Running": str(stats["running"]).lower(),
+        "X-Profiler-Samples": str(stats["samples"])
+    })
+
+@app.post("/admin/profiler", dependencies=[Depends(require_admin)])
+def set_profiler(request: ProfilerRequest):
+    """Start / stop the sampling profiler (it has no cost while stopped)"""
+    if request.interval_ms is not None and request.interval_ms <= 0:
+        raise HTTPException(status_code=400, detail="interval_ms must be positive")
+    if request.reset:
+        profiler.reset()
+    if request.enabled:
+        profiler.start(request.interval_ms / 1000 if request.interval_ms is not None else None)
+    else:
+        profiler.stop()
+    return profiler.stats()
+
 @app.post("/predict", response_model=Prediction)
-def predict_single(customer: Customer):
+async def predict_single(customer: Customer, background_tasks: BackgroundTasks, model: Optional[str] = None):
     """
-    Predict churn for a single customer
+    Predict churn for a single customer (?model=<name> picks a loaded model version)
     """
-    # Convert to DataFrame (our pipeline expects this)
+    start = time.perf_counter()
+    version = get_version(model)
     customer_dict = customer.dict()
-    df = pd.DataFrame([customer_dict])
-    
-    # Make prediction
-    probability = pipeline.predict_proba(df)[0, 1]  # Probability of churn
-    prediction = pipeline.predict(df)[0]  # 0 or 1
-    
-    # Determine risk level
-    if probability >= 0.7:
-        risk = "High"
-    elif probability >= 0.4:
-        risk = "Medium"
+    record_stage("to_dict", start)
+
+    if PREDICT_STRICT and version.validator is not None:
+        # The batch endpoints' rules too (known categories, tenure >= 0, ...), so both answer alike
+        check_start = time.perf_counter()
+        errors = version.validator.check(customer_dict)
+        if errors:
+            raise RequestValidationError(validation_errors(errors))
+        record_stage("schema", check_start)
+
+    key = cache.key(customer_dict, version.token) if cache is not None else None
+    cached = cache.get(key) if cache is not None else None
+
+    if cached is not None:
+        _, probability = cached
+    elif batcher is not None:
+        # Scored together with other concurrent requests
+        _, probability = await batcher.submit((version, customer_dict))
+    elif scoring_pool is not None:
+        columns = {col: [value] for col, value in customer_dict.items()}
+        probability = float((await run_in_threadpool(score_columns, version, columns))[0])
     else:
-        risk = "Low"
+        _, probability = await run_in_threadpool(version.predict_one, customer_dict)
+
+    # Label and risk band from this version's thresholds, in one lookup (src.decision)
+    prediction, risk = version.decision.decide_one(probability)
+    if cache is not None and cached is None:
+        cache.put(key, (prediction, probability))
+
+    if registry.shadow and registry.shadow != version.name:
+        background_tasks.add_task(registry.score_shadow, [customer_dict], [float(probability)], version.decision)
+
+    if drift is not None:
+        drift.update(customer_dict)
+    if audit is not None:
+        audit.log("/predict", version.name, (time.perf_counter() - start) * 1000,
+                  customer_dict, probability, risk)
 
     return Prediction(
         churn_prediction="Churn" if prediction == 1 else "No Churn",
         churn_probability=float(probability),
-        risk_level=risk
+        risk_level=risk,
+        model_version=version.name
     )
 
-@app.post("/predict_batch")
-def predict_batch(customers: List[Customer]):
-    """
-    Predict churn for multiple customers at once
-    """
-    # Convert to DataFrame
-    data = [c.dict() for c in customers]
-    df = pd.DataFrame(data)
-    
-    # Make predictions
-    probabilities = pipeline.predict_proba(df)[:, 1]
-    predictions = pipeline.predict(df)
-    
-    # Prepare results
-    results = []
-    for i, (prob, pred) in enumerate(zip(probabilities, predictions)):
-        if prob >= 0.7:
-            risk = "High"
-        elif prob >= 0.4:
-            risk = "Medium"
+@app.post("/predict_batch", openapi_extra=batch_body({"type": "array", "items": Customer.model_json_schema()}))
+async def predict_batch(request: Request, background_tasks: BackgroundTasks, model: Optional[str] = None,
+                        probabilities_only: bool = False):
+    """
+    Predict churn for multiple customers at once (?model=<name> picks a loaded model version).
+    The body can be JSON rows or columns, Arrow or MessagePack (Content-Type); the answer
+    is JSON rows, or columnar JSON / Arrow / MessagePack (Accept).
+    ?probabilities_only=true answers with just the churn probabilities.
+    """
+    media_type = negotiate(request, formats.BATCH_RESPONSE_FORMATS, formats.JSON)
+    body = await request.body()
+    return await run_in_threadpool(score_batch, request.headers.get("content-type"), body, media_type,
+                                   background_tasks, model, probabilities_only)
+
+
+def score_batch(content_type, body, media_type, background_tasks, model, probabilities_only):
+    start = time.perf_counter()
+    version = get_version(model)
+    batch = parse_batch(version, content_type, body)
+    n = len(batch)
+    if metrics is not None:
+        metrics.observe_batch_size(n)
+    probabilities = np.empty(n)
+
+    # Serve repeat customers from the cache, only score the misses
+    if cache is not None:
+        columns = batch.columns()
+        keys = [cache.key(dict(zip(columns, values)), version.token) for values in zip(*columns.values())]
+        misses = []
+        for i, key in enumerate(keys):
+            cached = cache.get(key)
+            if cached is None:
+                misses.append(i)
+            else:
+                probabilities[i] = cached[1]
+    else:
+        misses = list(range(n))
+
+    if misses:
+        # One vectorized model call for everything the cache didn't have
+        if len(misses) == n:
+            to_score = batch
         else:
-            risk = "Low"
-            
-        results.append({
-            "customer_id": i + 1,
-            "churn_prediction": "Churn" if pred == 1 else "No Churn",
-            "churn_probability": float(prob),
-            "risk_level": risk
-        })
-    
+            columns_start = time.perf_counter()
+            to_score = batch.take(misses)
+            record_stage("columns", columns_start)
+        probabilities[misses] = score_customers(version, to_score)
+
+        if cache is not None:
+            labels = version.decision.labels(probabilities[misses])
+            for i, label, p in zip(misses, labels.tolist(), probabilities[misses].tolist()):
+                cache.put(keys[i], (label, p))
+
+    if registry.shadow and registry.shadow != version.name and n:
+        background_tasks.add_task(registry.score_shadow, batch.columns(), probabilities.tolist(), version.decision)
+
+    if drift is not None and n:
+        drift.update_columns(batch.columns())
+    if audit is not None and n:
+        audit.log_batch("/predict_batch", version.name, (time.perf_counter() - start) * 1000,
+                        batch.columns(), probabilities, version.decision.risk_levels(probabilities))
+
+    encode_start = time.perf_counter()
+    content = formats.encode_batch(media_type, version.name, probabilities, probabilities_only, version.decision)
+    record_stage("encode", encode_start)
+    return Response(content, media_type=media_type)
+
+@app.post("/predict_batch/columns", openapi_extra=batch_body(CustomerColumns.model_json_schema()))
+async def predict_batch_columns(request: Request, model: Optional[str] = None, probabilities_only: bool = False):
+    """
+    Predict churn for a column-oriented batch (one list per feature).
+    Scored in fixed-size chunks and streamed back as NDJSON, one customer per line
+    (or an Arrow stream / MessagePack maps per chunk, see Accept),
+    so the response never has to sit in memory all at once.
+    """
+    media_type = negotiate(request, formats.STREAM_RESPONSE_FORMATS, formats.NDJSON)
+    version = get_version(model)
+    body = await request.body()
+    batch = await run_in_threadpool(parse_batch, version, request.headers.get("content-type"), body)
+    if metrics is not None:
+        metrics.observe_batch_size(len(batch))
+    return StreamingResponse(
+        stream_predictions(version, batch, formats.ChunkEncoder(media_type, version.name, probabilities_only,
+                                                                 version.decision)),
+        media_type=media_type
+    )
+
+@app.post("/explain", openapi_extra=batch_body({"type": "array", "items": Customer.model_json_schema()}))
+async def explain(request: Request, model: Optional[str] = None, top: int = Query(3, ge=0)):
+    """
+    Why each customer got their score: the contribution of every feature to the
+    log-odds of churn (base_value + contributions = log-odds), in closed form from the
+    model's coefficients. Same bodies as /predict_batch; JSON rows (with the ?top=
+    features raising the risk most) or, for Accept: application/vnd.churn.columns+json, columns.
+    """
+    media_type = negotiate(request, (formats.JSON, formats.COLUMNS_JSON), formats.JSON)
+    body = await request.body()
+    return await run_in_threadpool(explain_batch, request.headers.get("content-type"), body, media_type, model, top)
+
+
+def explain_batch(content_type, body, media_type, model, top):
+    version = get_version(model)
+    if version.explainer is None:
+        raise HTTPException(status_code=501, detail=f"Model '{version.name}' is not a compiled linear model, "
+                                                    f"per-feature contributions are unavailable")
+    batch = parse_batch(version, content_type, body)
+    if metrics is not None:
+        metrics.observe_batch_size(len(batch))
+    explanation = version.explain_batch(batch)
+
+    start = time.perf_counter()
+    content = {"model_version": version.name, "base_value": explanation.base_value,
+               "total_customers": len(explanation)}
+    if media_type == formats.COLUMNS_JSON:
+        content.update(
+            churn_probability=explanation.probabilities.tolist(),
+            risk_level=version.decision.risk_codes(explanation.probabilities).tolist(),
+            risk_level_labels=RISK_LABELS.tolist(),
+            contributions=explanation.columns()
+        )
+    else:
+        content["explanations"] = explanation.rows(top)
+    content = formats.dumps(content)
+    record_stage("encode", start)
+    return Response(content, media_type=media_type)
+
+@app.post("/whatif")
+def whatif(request: WhatIfRequest, model: Optional[str] = None):
+    """
+    Score every combination of alternative values of `features` (default Contract,
+    TechSupport, PaymentMethod) for one customer in a single model call.
+    Scenarios come back lowest churn probability first.
+    """
+    version = get_version(model)
+    customer = request.customer.dict()
+    if version.validator is None:
+        raise HTTPException(status_code=501, detail=f"Categories of model '{version.name}' are unknown")
+    errors = version.validator.check(customer)
+    if errors:  # same rules as /predict and /explain (unknown categories can't be scored)
+        raise RequestValidationError(validation_errors([{**error, "loc": ("customer", *error["loc"])}
+                                                        for error in errors]))
+
+    candidates = {}
+    for col in dict.fromkeys(request.features + list(request.values)):
+        if col not in version.validator.categories:
+            raise HTTPException(status_code=422, detail=f"'{col}' is not a categorical feature")
+        allowed = version.validator.values[col].tolist()
+        if col in request.values:
+            unknown = [v for v in request.values[col] if v not in version.validator.categories[col]]
+            if unknown:
+                raise HTTPException(status_code=422, detail=f"Unknown {col} values {unknown}, "
+                                                            f"expected some of {version.validator.categories[col]}")
+            allowed = [value for value, category in zip(allowed, version.validator.categories[col])
+                       if category in request.values[col]]
+        candidates[col] = allowed
+    try:
+        columns, changes = whatif_grid(customer, candidates)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    probabilities = score_columns(version, columns)
+    risks = version.decision.risk_levels(probabilities).tolist()
+    current = float(probabilities[0])
+    scenarios = probabilities[1:]
     return {
-        "predictions": results,
-        "total_customers": len(results),
-        "summary": {
-            "total_churn_risk": sum(1 for r in results if r["churn_prediction"] == "Churn"),
-            "high_risk_customers": sum(1 for r in results if r["risk_level"] == "High")
-        }
-    }
\ No newline at end of file
+        "model_version": version.name,
+        "churn_probability": current,
+        "risk_level": risks[0],
+        "total_scenarios": len(changes),
+        "scenarios": [
+            {"changes": changes[i], "churn_probability": float(scenarios[i]), "risk_level": risks[i + 1],
+             "change": float(scenarios[i]) - current}
+            for i in np.argsort(scenarios, kind="stable").tolist()
+        ]
+    }
+
+@app.get("/customers/top")
+def top_risk_customers(k: int = Query(10, ge=1, le=10000), offset: int = Query(0, ge=0),
+                       model: Optional[str] = None):
+    """
+    The k highest-risk customers of the indexed base (?offset= pages further down),
+    straight from the precomputed score index
+    """
+    version, index = get_score_index(model)
+    return {
+        "customers": [
+            {"customer_id": customer_id, "churn_probability": probability, "risk_level": risk}
+            for customer_id, probability, risk in index.top(k, offset)
+        ],
+        "model_version": version.name,
+        "scored_at": index.manifest["built_at"]
+    }
+
+@app.get("/customers/risk_bands")
+def risk_band_counts(model: Optional[str] = None):
+    """Number of indexed customers per risk band"""
+    version, index = get_score_index(model)
+    return {
+        "risk_bands": index.band_counts(),
+        "total_customers": len(index),
+        "model_version": version.name,
+        "scored_at": index.manifest["built_at"]
+    }
+
+@app.get("/customers/{customer_id}/risk", response_model=Prediction)
+def customer_risk(customer_id: str, model: Optional[str] = None):
+    """Precomputed churn risk of a known customer (no model call); 404 if the ID isn't indexed"""
+    version, index = get_score_index(model)
+    result = score_indexes.lookup(index, customer_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Customer '{customer_id}' is not in the score index")
+    probability, risk = result
+    return Prediction(
+        churn_prediction="Churn" if version.decision.decide_one(probability)[0] else "No Churn",
+        churn_probability=probability,
+        risk_level=risk,
+        model_version=version.name
+    )
@@ -0,0 +1,225 @@
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+
+DROP_POLICIES = ("drop_newest", "drop_oldest")
+
+
+class AuditLogger:
+    """
+    Audit trail of requests and predictions, written off the request path.
+
+    - log() / log_batch() only put one entry on a bounded in-memory queue (no I/O,
+      no JSON encoding), so they are safe to call from async endpoints
+    - A background thread wakes every `flush_interval` seconds (sooner once
+      `batch_size` entries are waiting), drains the queue in batches, encodes
+      them as JSON lines and appends them to the current file
+    - Files rotate past `rotate_bytes` or `rotate_seconds` and are gzipped
+      (`compress`), named audit-<start time>-<pid>.jsonl[.gz]
+    - Backpressure: a slow disk makes the writer take bigger batches; once the
+      queue is full, entries are dropped (`drop_policy`: the new entry, or the
+      oldest queued one) and counted in stats() instead of slowing requests down
+    """
+
+    def __init__(self, directory, max_queue=10_000, batch_size=100, flush_interval=1.0,
+                 rotate_bytes=64 * 1024 * 1024, rotate_seconds=3600.0, compress=True,
+                 drop_policy="drop_newest"):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {DROP_POLICIES}, got {drop_policy!r}")
+        self.directory = directory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.drop_policy = drop_policy
+
+        self._queue = None
+        self._thread = None
+        self._stopping = None
+        self._wakeup = None
+        self._pid = None
+        self._start_lock = threading.Lock()  # request threads may all log their first entry at once
+        self._file = None
+        self._path = None
+        self._opened_at = 0.0
+
+        # Stats
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.rotations = 0
+        self.write_errors = 0
+        self.max_queue_depth = 0
+        self.last_batch_ms = 0.0
+
+    # ========== REQUEST PATH ==========
+    def log(self, endpoint, model_version, latency_ms, features, probability, risk_level):
+        """Record one prediction"""
+        self._put((time.time(), endpoint, model_version, latency_ms, [features], [probability], [risk_level]))
+
+    def log_batch(self, endpoint, model_version, latency_ms, features, probabilities, risk_levels):
+        """
+        Record a batch: features as a list of customer dicts or a dict of columns.
+        One queue entry, expanded to one line per customer by the writer.
+        """
+        self._put((time.time(), endpoint, model_version, latency_ms, features, probabilities, risk_levels))
+
+    def _put(self, entry):
+        if self._pid != os.getpid():
+            # First use in this process (threads don't survive the fork in api.serve)
+            self.start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            if self.drop_policy == "drop_newest":
+                return
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait(entry)
+            except (queue.Empty, queue.Full):
+                return
+        self.enqueued += 1
+        if self.enqueued % self.batch_size == 0 and self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    # ========== LIFECYCLE ==========
+    def start(self):
+        """Start this process's writer thread (no-op if it is already running here)"""
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._stopping = threading.Event()
+            self._wakeup = threading.Event()
+            self._file = None
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+            # Last: _put() checks the pid without the lock and must never see a half-started logger
+            self._pid = os.getpid()
+
+    def close(self, timeout=5.0):
+        """Flush what is queued, close (and compress) the current file"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        with self._start_lock:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join(timeout)
+            self._thread = None
+            self._pid = None
+
+    def stats(self):
+        return {
+            "enabled": True,
+            "directory": self.directory,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "max_queue": self.max_queue,
+            "drop_policy": self.drop_policy,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "records_written": self.written,
+            "batches": self.batches,
+            "last_batch_ms": self.last_batch_ms,
+            "rotations": self.rotations,
+            "write_errors": self.write_errors,
+            "current_file": self._path
+        }
+
+    # ========== BACKGROUND WRITER ==========
+    def _run(self):
+        # Wakes every flush_interval (or once batch_size entries are waiting),
+        # never once per request
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+            self._maybe_rotate()
+        self._drain()
+        self._close_file()
+
+    def _drain(self):
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        while True:
+            entries = []
+            while len(entries) < self.batch_size:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not entries:
+                return
+            self._write(entries)
+            # Encoding holds the GIL: let request threads / the event loop in between batches
+            time.sleep(0)
+
+    def _write(self, entries):
+        start = time.perf_counter()
+        try:
+            lines = []
+            for timestamp, endpoint, model_version, latency_ms, features, probabilities, risks in entries:
+                at = datetime.fromtimestamp(timestamp).isoformat()
+                if isinstance(features, dict):  # column-oriented batch
+                    names = list(features)
+                    features = (dict(zip(names, values)) for values in zip(*features.values()))
+                for customer, probability, risk in zip(features, probabilities, risks):
+                    lines.append(json.dumps({
+                        "timestamp": at,
+                        "endpoint": endpoint,
+                        "model_version": model_version,
+                        "latency_ms": latency_ms,
+                        "features": customer,
+                        "churn_probability": float(probability),
+                        "risk_level": risk
+                    }, separators=(",", ":")))
+            self._maybe_rotate()
+            if self._file is None:
+                self._open_file()
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            self.written += len(lines)
+        except Exception as e:
+            # Lose this batch (disk error, a value JSON can't encode, ...) rather than
+            # the writer thread, which would leave the queue to fill up and drop everything
+            self.write_errors += 1
+            print(f"Audit log write failed: {type(e).__name__}: {e}")
+        self.batches += 1
+        self.last_batch_ms = (time.perf_counter() - start) * 1000
+
+    def _open_file(self):
+        name = f"audit-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}.jsonl"
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._opened_at = time.monotonic()
+
+    def _maybe_rotate(self):
+        if self._file is None:
+            return
+        if self._file.tell() >= self.rotate_bytes or time.monotonic() - self._opened_at >= self.rotate_seconds:
+            self._close_file()
+            self.rotations += 1
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+            if self.compress:
+                with open(self._path, "rb") as src, gzip.open(self._path + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self._path)
+        except OSError as e:
+            self.write_errors += 1
+            print(f"Audit log rotation failed: {e}")
+        self._file = None
+        self._path = None
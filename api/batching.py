@@ -0,0 +1,137 @@
+import asyncio
+from collections import Counter
+
+
+class MicroBatcher:
+    """
+    Groups concurrent single predictions into one vectorized model call.
+
+    Callers `await submit(item)`. A background task collects queued items until
+    it has `max_batch_size` of them or `max_wait_ms` has passed since the first
+    one arrived, scores them with ONE `score_batch(items)` call (on a worker
+    thread, so the event loop keeps accepting requests) and hands every caller
+    its own result. If that call raises, the items are scored one by one, so
+    only the callers whose item fails get the exception.
+    """
+
+    def __init__(self, score_batch, max_batch_size=64, max_wait_ms=2.0):
+        self.score_batch = score_batch  # list of items -> list of results (same order)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue = None
+        self._task = None
+        self._loop = None
+        self._batch = []  # (item, future) pairs taken off the queue and not answered yet
+
+        # Stats
+        self.batches = 0
+        self.items = 0
+        self.retried_batches = 0  # scored again item by item after the batch call raised
+        self.max_queue_depth = 0
+        self.batch_sizes = Counter()  # power-of-two bucket -> number of batches
+
+    # ========== PUBLIC API ==========
+    async def submit(self, item):
+        """Queue one item and wait for its result"""
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def stop(self):
+        """Cancel the background task; callers still queued or being scored get CancelledError"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        pending = self._batch
+        self._batch = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            future.cancel()  # no-op for callers already answered
+
+    def stats(self):
+        return {
+            "enabled": True,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "retried_batches": self.retried_batches,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            # "<=N": batches whose size fell in (N/2, N]
+            "batch_size_histogram": {f"<={k}": v for k, v in sorted(self.batch_sizes.items())}
+        }
+
+    # ========== BACKGROUND LOOP ==========
+    def _ensure_started(self):
+        # Started lazily so the queue and task live on the loop that is serving requests
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._loop is not loop or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            batch = self._batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already waiting without yielding to the loop
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._score(batch)
+
+    async def _score(self, batch):
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.items += len(items)
+        self.batch_sizes[1 << (len(items) - 1).bit_length()] += 1
+
+        try:
+            outcomes = [(result, None) for result in
+                        await self._loop.run_in_executor(None, self.score_batch, items)]
+        except Exception as e:
+            if len(items) == 1:
+                outcomes = [(None, e)]
+            else:
+                # e.g. one customer the model can't take: don't fail everyone else with it
+                self.retried_batches += 1
+                outcomes = await self._loop.run_in_executor(None, self._score_each, items)
+
+        for (_, future), (result, error) in zip(batch, outcomes):
+            if future.done():  # caller may have disconnected
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        self._batch = []
+
+    def _score_each(self, items):
+        """(result, None) or (None, exception) per item, scored one at a time"""
+        outcomes = []
+        for item in items:
+            try:
+                outcomes.append((self.score_batch([item])[0], None))
+            except Exception as e:
+                outcomes.append((None, e))
+        return outcomes
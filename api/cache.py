@@ -0,0 +1,141 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from src.scoring import to_total_charges
+
+# Rough per-entry bookkeeping cost (OrderedDict node + expiry tuple + float)
+_ENTRY_OVERHEAD = 200
+
+
+class PredictionCache:
+    """
+    Bounded LRU + TTL cache of predictions, keyed on the customer's features.
+
+    - Keys are a 16-byte hash of the canonicalized feature values, with
+      TotalCharges normalized the way DataCleaner does it ("" / " " / "0" -> 0.0)
+    - Evicts least-recently-used entries past `max_entries` or `max_bytes`
+    - Entries expire after `ttl` seconds
+    - Clears itself when the model file's mtime/size changes
+    Safe to use from the event loop and threadpool at the same time.
+    """
+
+    def __init__(self, max_entries=100_000, max_bytes=64 * 1024 * 1024, ttl=3600.0,
+                 model_path=None, check_interval=1.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.model_path = model_path
+        self.check_interval = check_interval
+
+        self._data = OrderedDict()  # key -> (expires_at, value, size)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._model_token = self._read_model_token()
+        self._next_check = time.monotonic() + check_interval
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # ========== KEYS ==========
+    @staticmethod
+    def key(customer_dict, namespace=""):
+        """
+        Hash of the canonical feature values (independent of dict order).
+        `namespace` (e.g. the model version) keeps different models' entries apart.
+        """
+        canonical = [namespace]
+        for name in sorted(customer_dict):
+            value = customer_dict[name]
+            if name == 'TotalCharges':
+                value = to_total_charges(value)
+            elif isinstance(value, (int, float)):
+                value = float(value)
+            canonical.append((name, value))
+        return hashlib.blake2b(repr(canonical).encode(), digest_size=16).digest()
+
+    # ========== LOOKUP / STORE ==========
+    def get(self, key):
+        """Cached value or None"""
+        now = time.monotonic()
+        self._check_model(now)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value, size = entry
+            if expires_at < now:
+                del self._data[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = sys.getsizeof(key) + sys.getsizeof(value) + _ENTRY_OVERHEAD
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (expires_at, value, size)
+            self._bytes += size
+
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    # ========== MODEL FILE WATCH ==========
+    def _read_model_token(self):
+        if self.model_path is None:
+            return None
+        try:
+            stat = os.stat(self.model_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _check_model(self, now):
+        # At most one stat() per check_interval
+        if self.model_path is None or now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        token = self._read_model_token()
+        if token != self._model_token:
+            self._model_token = token
+            self.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,284 @@
+"""
+Python client for the churn API.
+
+ChurnClient (sync) and AsyncChurnClient (asyncio) keep a pool of keep-alive
+connections open, so repeated calls skip the TCP/TLS handshake, and retry
+connection errors, timeouts and 429/502/503/504 answers with exponential
+backoff (honouring Retry-After, up to max_retry_after seconds). With a
+deadline, a call gives up after that many seconds, retries included.
+
+    with ChurnClient("http://localhost:8000") as client:
+        client.predict(customer)                 # one /predict call
+        client.predict_many(customers)           # /predict_batch calls of batch_size
+
+    async with AsyncChurnClient(batch_window_ms=5) as client:
+        # concurrent predict() calls are sent together as one /predict_batch request
+        results = await asyncio.gather(*(client.predict(c) for c in customers))
+"""
+import asyncio
+import random
+import time
+
+import httpx
+
+DEFAULT_URL = "https://telecom-churn-api.onrender.com"
+RETRY_STATUS = (429, 502, 503, 504)
+RETRY_ERRORS = (httpx.TransportError,)  # connect / read errors and timeouts
+
+
+class ChurnAPIError(Exception):
+    """The API answered with an error status (after any retries)"""
+
+    def __init__(self, status_code, detail):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class _Base:
+    def __init__(self, base_url, timeout, retries, backoff, max_connections, deadline, max_retry_after):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.deadline = deadline
+        self.max_retry_after = max_retry_after
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.attempts = 0  # HTTP requests sent, retries included
+        self.retried = 0
+
+    def _delay(self, attempt, response=None):
+        """Exponential backoff with jitter, or the server's Retry-After (up to max_retry_after) if it sent one"""
+        if response is not None and "retry-after" in response.headers:
+            try:
+                return min(max(float(response.headers["retry-after"]), 0.0), self.max_retry_after)
+            except ValueError:
+                pass
+        return self.backoff * 2 ** attempt * (0.5 + random.random() / 2)
+
+    def _deadline(self):
+        """When a call started now must be done (time.monotonic()), retries included; None without a deadline"""
+        return time.monotonic() + self.deadline if self.deadline else None
+
+    def _timeout(self, deadline):
+        """Timeout for the next attempt: the client's, cut short by the deadline"""
+        if deadline is None:
+            return self.timeout
+        remaining = max(deadline - time.monotonic(), 0.001)
+        return remaining if self.timeout is None else min(self.timeout, remaining)
+
+    def _retry_delay(self, attempt, deadline, response=None):
+        """How long to wait before retrying, or None to give up (out of retries, or it would pass the deadline)"""
+        if attempt == self.retries:
+            return None
+        delay = self._delay(attempt, response)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    @staticmethod
+    def _result(response):
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise ChurnAPIError(response.status_code, detail)
+        return response.json()
+
+    @staticmethod
+    def _params(model):
+        return {"model": model} if model else None
+
+
+class ChurnClient(_Base):
+    """Blocking client; one instance shares its connection pool across calls (and threads)"""
+
+    def __init__(self, base_url=DEFAULT_URL, timeout=10.0, retries=3, backoff=0.2, max_connections=10,
+                 batch_size=1000, deadline=None, max_retry_after=10.0, transport=None):
+        super().__init__(base_url, timeout, retries, backoff, max_connections, deadline, max_retry_after)
+        self.batch_size = batch_size
+        self._http = httpx.Client(base_url=self.base_url, timeout=timeout, limits=self.limits,
+                                  transport=transport)
+
+    def _request(self, method, path, **kwargs):
+        deadline = self._deadline()
+        for attempt in range(self.retries + 1):
+            self.attempts += 1
+            try:
+                response = self._http.request(method, path, timeout=self._timeout(deadline), **kwargs)
+            except RETRY_ERRORS:
+                delay = self._retry_delay(attempt, deadline)
+                if delay is None:
+                    raise
+            else:
+                retry = response.status_code in RETRY_STATUS
+                delay = self._retry_delay(attempt, deadline, response) if retry else None
+                if delay is None:
+                    return self._result(response)
+            self.retried += 1
+            time.sleep(delay)
+
+    def predict(self, customer, model=None):
+        """/predict for one customer dict"""
+        return self._request("POST", "/predict", json=customer, params=self._params(model))
+
+    def predict_batch(self, customers, model=None):
+        """One /predict_batch call (the raw response)"""
+        return self._request("POST", "/predict_batch", json=list(customers), params=self._params(model))
+
+    def predict_many(self, customers, model=None):
+        """
+        Score any number of customers with /predict_batch calls of batch_size;
+        returns one /predict-shaped result per customer, in order
+        """
+        customers = list(customers)
+        results = []
+        for start in range(0, len(customers), self.batch_size):
+            results.extend(_split_batch(self.predict_batch(customers[start:start + self.batch_size], model)))
+        return results
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def close(self):
+        self._http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncChurnClient(_Base):
+    """
+    asyncio client. With batch_window_ms > 0, predict() calls made within that
+    window of each other (up to batch_size, per model) are sent as one
+    /predict_batch request and each caller gets its own result back. If the
+    API rejects the batch (4xx), each customer is sent again on its own to
+    /predict, so only the callers whose customers are bad get the error.
+    """
+
+    def __init__(self, base_url=DEFAULT_URL, timeout=10.0, retries=3, backoff=0.2, max_connections=10,
+                 batch_size=1000, batch_window_ms=0.0, deadline=None, max_retry_after=10.0, transport=None):
+        super().__init__(base_url, timeout, retries, backoff, max_connections, deadline, max_retry_after)
+        self.batch_size = batch_size
+        self.batch_window = batch_window_ms / 1000
+        self._http = httpx.AsyncClient(base_url=self.base_url, timeout=timeout, limits=self.limits,
+                                       transport=transport)
+        self._pending = {}  # model -> [(customer, future)]
+        self._senders = set()
+        self.batches_sent = 0
+        self.batches_rejected = 0  # sent again one customer at a time
+
+    async def _request(self, method, path, **kwargs):
+        deadline = self._deadline()
+        for attempt in range(self.retries + 1):
+            self.attempts += 1
+            try:
+                response = await self._http.request(method, path, timeout=self._timeout(deadline), **kwargs)
+            except RETRY_ERRORS:
+                delay = self._retry_delay(attempt, deadline)
+                if delay is None:
+                    raise
+            else:
+                retry = response.status_code in RETRY_STATUS
+                delay = self._retry_delay(attempt, deadline, response) if retry else None
+                if delay is None:
+                    return self._result(response)
+            self.retried += 1
+            await asyncio.sleep(delay)
+
+    async def predict(self, customer, model=None):
+        """/predict for one customer dict (batched with concurrent calls if batch_window_ms > 0)"""
+        if self.batch_window <= 0:
+            return await self._request("POST", "/predict", json=customer, params=self._params(model))
+
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(model, [])
+        pending.append((customer, future))
+        if len(pending) >= self.batch_size:
+            self._start_send(model, self._pending.pop(model))
+        elif len(pending) == 1:
+            self._start_send(model, pending, self.batch_window)
+        return await future
+
+    async def predict_batch(self, customers, model=None):
+        """One /predict_batch call (the raw response)"""
+        return await self._request("POST", "/predict_batch", json=list(customers), params=self._params(model))
+
+    async def predict_many(self, customers, model=None):
+        """Like ChurnClient.predict_many, with the batch_size chunks sent concurrently"""
+        customers = list(customers)
+        batches = await asyncio.gather(*(self.predict_batch(customers[start:start + self.batch_size], model)
+                                         for start in range(0, len(customers), self.batch_size)))
+        return [result for batch in batches for result in _split_batch(batch)]
+
+    async def health(self):
+        return await self._request("GET", "/health")
+
+    # ========== CLIENT-SIDE BATCHING ==========
+    def _start_send(self, model, batch, delay=0.0):
+        task = asyncio.get_running_loop().create_task(self._send(model, batch, delay))
+        self._senders.add(task)
+        task.add_done_callback(self._senders.discard)
+
+    async def _send(self, model, batch, delay):
+        if delay:
+            await asyncio.sleep(delay)
+            if self._pending.get(model) is not batch:
+                return  # already sent when it filled up
+            del self._pending[model]
+        self.batches_sent += 1
+        try:
+            results = _split_batch(await self.predict_batch([customer for customer, _ in batch], model))
+        except ChurnAPIError as e:
+            if not 400 <= e.status_code < 500 or len(batch) == 1:
+                _fail(batch, e)
+                return
+            # Rejected, most likely for one bad customer: send each on its own so only its caller fails
+            self.batches_rejected += 1
+            results = await asyncio.gather(*(self._request("POST", "/predict", json=customer,
+                                                           params=self._params(model))
+                                             for customer, _ in batch), return_exceptions=True)
+        except Exception as e:
+            _fail(batch, e)
+            return
+        for (_, future), result in zip(batch, results):
+            if future.done():  # caller may have been cancelled
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def aclose(self):
+        """Send whatever is still waiting to be batched, then close the connections"""
+        for model in list(self._pending):
+            self._start_send(model, self._pending.pop(model))
+        if self._senders:
+            await asyncio.gather(*self._senders, return_exceptions=True)
+        await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+def _fail(batch, error):
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(error)
+
+
+def _split_batch(response):
+    """/predict_batch response -> one /predict-shaped result per customer"""
+    return [{
+        "churn_prediction": p["churn_prediction"],
+        "churn_probability": p["churn_probability"],
+        "risk_level": p["risk_level"],
+        "model_version": response.get("model_version")
+    } for p in response["predictions"]]
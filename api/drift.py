@@ -0,0 +1,222 @@
+"""
+Data-drift monitor for live traffic.
+
+Every scored customer updates fixed-size sketches (O(1) per row, constant memory):
+- numeric features: counts per bin, the bins being the reference profile's quantiles
+- categorical features: counts per category seen in the reference profile
+  (anything else lands in one OTHER bucket, so junk input can't grow memory)
+
+GET /drift compares them with the reference profile built from the training CSV:
+
+    python -m api.drift data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv models/drift_reference.json
+"""
+import argparse
+import bisect
+import csv
+import json
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from src.scoring import coerce_numeric, to_total_charges
+
+NUMERIC_FEATURES = ('tenure', 'MonthlyCharges', 'TotalCharges')
+# Same as DataCleaner.multi_cat_cols (not imported: serving must not need pandas)
+CATEGORICAL_FEATURES = ('MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup',
+                        'DeviceProtection', 'TechSupport', 'StreamingTV', 'StreamingMovies',
+                        'Contract', 'PaymentMethod')
+OTHER = "__other__"
+
+# Population Stability Index bands: < 0.1 stable, 0.1-0.25 moderate, >= 0.25 significant
+PSI_THRESHOLDS = (0.1, 0.25)
+PSI_STATUS = ("stable", "moderate", "significant")
+# Floor for empty bins, so PSI stays finite
+EPSILON = 1e-4
+
+
+# ========== REFERENCE PROFILE ==========
+def build_reference_profile(columns, bins=20):
+    """
+    Profile of a column-oriented dataset ({feature: list of values}):
+    quantile bin edges + counts for the numeric features, category counts for the others
+    """
+    numeric = {}
+    for col in NUMERIC_FEATURES:
+        values = _as_float(col, columns[col])
+        # Inner edges only; value x falls in bin bisect_right(edges, x)
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        numeric[col] = {"edges": edges.tolist(), "counts": counts.tolist()}
+
+    categorical = {col: dict(Counter(str(v) for v in columns[col])) for col in CATEGORICAL_FEATURES}
+    return {
+        "rows": len(columns[NUMERIC_FEATURES[0]]),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "numeric": numeric,
+        "categorical": categorical
+    }
+
+
+def _as_float(col, values):
+    if col == 'TotalCharges':
+        return coerce_numeric(values)  # "" (new customers) -> 0, as in DataCleaner
+    return np.asarray(values, dtype=np.float64)
+
+
+# ========== PSI / KS ==========
+def psi(expected, actual):
+    """Population Stability Index between two count vectors"""
+    e = np.maximum(np.asarray(expected, dtype=np.float64) / max(sum(expected), 1), EPSILON)
+    a = np.maximum(np.asarray(actual, dtype=np.float64) / max(sum(actual), 1), EPSILON)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def binned_ks(expected, actual):
+    """Kolmogorov-Smirnov statistic of two binned samples (max CDF gap at the bin edges)"""
+    e = np.cumsum(expected) / max(sum(expected), 1)
+    a = np.cumsum(actual) / max(sum(actual), 1)
+    return float(np.max(np.abs(a - e)))
+
+
+def psi_status(value):
+    return PSI_STATUS[bisect.bisect_right(PSI_THRESHOLDS, value)]
+
+
+# ========== LIVE MONITOR ==========
+class DriftMonitor:
+    """
+    Live feature distributions vs a reference profile.
+
+    update() (one customer dict) and update_columns() (a column-oriented batch)
+    only bump counters under a lock; report() computes PSI per feature and, for
+    the numeric ones, the binned KS statistic. Counts cover everything since
+    start (or the last reset()) in this process.
+    """
+
+    def __init__(self, reference, min_rows=100):
+        self.reference = reference
+        self.min_rows = min_rows
+        self._edges = {col: reference["numeric"][col]["edges"] for col in NUMERIC_FEATURES}
+        self._edge_arrays = {col: np.array(edges) for col, edges in self._edges.items()}
+        # Reference categories (+ OTHER) in a fixed order
+        self._categories = {col: sorted(reference["categorical"][col]) + [OTHER]
+                            for col in CATEGORICAL_FEATURES}
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def load(cls, path, min_rows=100):
+        with open(path) as f:
+            return cls(json.load(f), min_rows=min_rows)
+
+    def reset(self):
+        with self._lock:
+            self.rows = 0
+            self.started = time.time()
+            self._numeric = {col: [0] * (len(edges) + 1) for col, edges in self._edges.items()}
+            self._categorical = {col: dict.fromkeys(categories, 0)
+                                 for col, categories in self._categories.items()}
+
+    # ========== REQUEST PATH ==========
+    def update(self, record):
+        """Count one customer dict: one bisect per numeric feature, one dict bump per categorical"""
+        bins = [bisect.bisect_right(self._edges['tenure'], record['tenure']),
+                bisect.bisect_right(self._edges['MonthlyCharges'], record['MonthlyCharges']),
+                bisect.bisect_right(self._edges['TotalCharges'], to_total_charges(record['TotalCharges']))]
+        with self._lock:
+            self.rows += 1
+            for col, b in zip(NUMERIC_FEATURES, bins):
+                self._numeric[col][b] += 1
+            for col in CATEGORICAL_FEATURES:
+                counts = self._categorical[col]
+                value = record[col]
+                if value in counts:
+                    counts[value] += 1
+                else:
+                    counts[OTHER] += 1
+
+    def update_columns(self, columns):
+        """Count a column-oriented batch ({feature: list of values}), vectorized per feature"""
+        n = len(columns[NUMERIC_FEATURES[0]])
+        if n == 0:
+            return
+        binned = {col: np.bincount(np.searchsorted(self._edge_arrays[col], _as_float(col, columns[col]),
+                                                   side='right'),
+                                   minlength=len(self._edges[col]) + 1).tolist()
+                  for col in NUMERIC_FEATURES}
+        tallies = {col: Counter(columns[col]) for col in CATEGORICAL_FEATURES}
+        with self._lock:
+            self.rows += n
+            for col, added in binned.items():
+                self._numeric[col] = [c + a for c, a in zip(self._numeric[col], added)]
+            for col, tally in tallies.items():
+                counts = self._categorical[col]
+                for value, count in tally.items():
+                    if value in counts:
+                        counts[value] += count
+                    else:
+                        counts[OTHER] += count
+
+    def update_records(self, records):
+        """Count a list of customer dicts"""
+        self.update_columns({col: [r[col] for r in records] for col in NUMERIC_FEATURES + CATEGORICAL_FEATURES})
+
+    # ========== REPORT ==========
+    def report(self):
+        with self._lock:
+            rows = self.rows
+            numeric = {col: list(counts) for col, counts in self._numeric.items()}
+            categorical = {col: dict(counts) for col, counts in self._categorical.items()}
+
+        features = {}
+        for col in NUMERIC_FEATURES:
+            expected = self.reference["numeric"][col]["counts"]
+            features[col] = {"type": "numeric", "psi": psi(expected, numeric[col]),
+                             "ks": binned_ks(expected, numeric[col])}
+        for col in CATEGORICAL_FEATURES:
+            reference = self.reference["categorical"][col]
+            expected = [reference.get(c, 0) for c in self._categories[col]]
+            actual = [categorical[col][c] for c in self._categories[col]]
+            features[col] = {"type": "categorical", "psi": psi(expected, actual),
+                             "unseen_categories": categorical[col][OTHER]}
+
+        enough = rows >= self.min_rows
+        for values in features.values():
+            values["status"] = psi_status(values["psi"]) if enough else "insufficient_data"
+        drifted = sorted(col for col, values in features.items() if values["status"] == "significant")
+        return {
+            "enabled": True,
+            "rows": rows,
+            "min_rows": self.min_rows,
+            "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "reference_rows": self.reference["rows"],
+            "drift_detected": bool(drifted),
+            "drifted_features": drifted,
+            "features": features
+        }
+
+    def stats(self):
+        return {"enabled": True, "rows": self.rows, "min_rows": self.min_rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the drift reference profile from the training CSV")
+    parser.add_argument("input", help="training CSV (the usual customer columns)")
+    parser.add_argument("output", help="where to write the profile (JSON)")
+    parser.add_argument("--bins", type=int, default=20, help="quantile bins per numeric feature")
+    args = parser.parse_args(argv)
+
+    with open(args.input, newline="") as f:
+        rows = list(csv.DictReader(f))
+    columns = {col: [row[col] for row in rows] for col in NUMERIC_FEATURES + CATEGORICAL_FEATURES}
+    profile = build_reference_profile(columns, bins=args.bins)
+    profile["source"] = args.input
+    with open(args.output, "w") as f:
+        json.dump(profile, f, indent=1)
+    print(f"Profiled {profile['rows']:,} customers -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
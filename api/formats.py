@@ -0,0 +1,265 @@
+"""
+Wire formats for the batch endpoints, picked by Content-Type (request) and Accept (response).
+
+- application/json                      rows (list of objects) or columns (object of lists);
+                                        responses encoded with orjson
+- application/vnd.churn.columns+json    columns in, columns out: one array per output field,
+                                        labels / risk bands as small integer codes
+- application/vnd.apache.arrow.stream   Arrow IPC stream (needs pyarrow), dictionary-encoded labels
+- application/x-msgpack                 MessagePack, rows or columns in, columns out (needs msgpack)
+
+JSON goes through orjson when it is installed (the standard library otherwise); pyarrow
+and msgpack are imported on first use, so servers that never see them don't pay for them.
+"""
+import io
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from src.decision import DEFAULT_POLICY
+from src.scoring import RISK_LABELS
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+COLUMNS_JSON = "application/vnd.churn.columns+json"
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/x-msgpack"
+
+REQUEST_FORMATS = (JSON, COLUMNS_JSON, ARROW, MSGPACK)
+BATCH_RESPONSE_FORMATS = (JSON, COLUMNS_JSON, ARROW, MSGPACK)
+STREAM_RESPONSE_FORMATS = (NDJSON, ARROW, MSGPACK)
+
+CHURN_LABELS = np.array(["No Churn", "Churn"])
+
+
+class FormatError(Exception):
+    """Unsupported or undecodable payload; status_code is the HTTP answer (400 / 406 / 415)"""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# ========== NEGOTIATION ==========
+def request_format(content_type):
+    """Format of a request body from its Content-Type header (JSON if missing)"""
+    media_type = (content_type or JSON).split(";")[0].strip().lower()
+    if media_type not in REQUEST_FORMATS:
+        raise FormatError(415, f"Unsupported Content-Type {media_type!r}, use one of {', '.join(REQUEST_FORMATS)}")
+    return media_type
+
+
+def response_format(accept, supported, default):
+    """Best format in `supported` for an Accept header (`default` for */* or no header)"""
+    choices = []
+    for i, part in enumerate((accept or "*/*").split(",")):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    pass
+        choices.append((-quality, i, media_type.lower()))
+    for quality, _, media_type in sorted(choices):
+        if quality == 0:
+            break
+        if media_type in ("*/*", "application/*"):
+            return default
+        if media_type in supported:
+            return media_type
+        if media_type == JSON and default in supported:
+            return default  # the endpoint's own JSON flavour (e.g. NDJSON for streams)
+    raise FormatError(406, f"Can't answer with {accept!r}, use one of {', '.join(supported)}")
+
+
+# ========== REQUEST BODIES ==========
+def decode(media_type, body):
+    """Request body -> list of row dicts or dict of column lists (not validated yet)"""
+    try:
+        if media_type in (JSON, COLUMNS_JSON):
+            return _loads(body)
+        if media_type == MSGPACK:
+            return _msgpack().unpackb(body)
+        if media_type == ARROW:
+            table = _pyarrow().ipc.open_stream(body).read_all()
+            # to_pydict converts value by value; through numpy is ~15x faster (nulls keep to_pylist)
+            return {name: column.to_pylist() if column.null_count else column.to_numpy(zero_copy_only=False).tolist()
+                    for name, column in zip(table.column_names, table.columns)}
+    except FormatError:
+        raise
+    except Exception as e:
+        raise FormatError(400, f"Can't decode the {media_type} body: {e}")
+    raise FormatError(415, f"Unsupported Content-Type {media_type!r}")
+
+
+def encode_columns(media_type, columns):
+    """Column dict -> request body (what a client sends; used by tests and benchmarks)"""
+    if media_type in (JSON, COLUMNS_JSON):
+        return dumps(columns)
+    if media_type == MSGPACK:
+        return _msgpack().packb(columns)
+    if media_type == ARROW:
+        pa = _pyarrow()
+        return _arrow_stream([pa.RecordBatch.from_pydict(columns)])
+    raise FormatError(415, f"Unsupported format {media_type!r}")
+
+
+# ========== BATCH RESPONSES ==========
+def encode_batch(media_type, model_version, probabilities, probabilities_only=False, decision=DEFAULT_POLICY):
+    """
+    Whole /predict_batch answer. JSON keeps the row-per-customer layout; the other
+    formats are columnar. probabilities_only leaves out labels, risk bands and summary.
+    Labels and risk bands come from the model version's `decision` (src.decision).
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    labels, risks = decision.decide(probabilities)
+
+    if media_type == JSON:
+        if probabilities_only:
+            return dumps({"model_version": model_version, "total_customers": len(probabilities),
+                          "churn_probability": probabilities.tolist()})
+        predictions = [
+            {"customer_id": i + 1, "churn_prediction": label, "churn_probability": prob, "risk_level": risk}
+            for i, (label, prob, risk) in enumerate(zip(CHURN_LABELS[labels].tolist(), probabilities.tolist(),
+                                                        RISK_LABELS[risks].tolist()))
+        ]
+        return dumps({"predictions": predictions, "model_version": model_version,
+                      "total_customers": len(predictions), "summary": _summary(labels, risks)})
+
+    if media_type == ARROW:
+        return _arrow_stream([_arrow_batch(probabilities, labels, risks, probabilities_only)],
+                             {"model_version": model_version or ""})
+
+    body = {"model_version": model_version, "total_customers": len(probabilities),
+            "churn_probability": probabilities.tolist()}
+    if not probabilities_only:
+        body.update(_coded(labels, risks))
+        body["summary"] = _summary(labels, risks)
+    if media_type == COLUMNS_JSON:
+        return dumps(body)
+    if media_type == MSGPACK:
+        return _msgpack().packb(body)
+    raise FormatError(406, f"Unsupported format {media_type!r}")
+
+
+def _coded(labels, risks):
+    return {"churn_prediction": labels.tolist(), "churn_prediction_labels": CHURN_LABELS.tolist(),
+            "risk_level": risks.tolist(), "risk_level_labels": RISK_LABELS.tolist()}
+
+
+def _summary(labels, risks):
+    return {"total_churn_risk": int(labels.sum()), "high_risk_customers": int((risks == 2).sum())}
+
+
+# ========== STREAMED RESPONSES ==========
+class ChunkEncoder:
+    """Encodes /predict_batch/columns chunks as they are scored, into one continuous stream"""
+
+    def __init__(self, media_type, model_version, probabilities_only=False, decision=DEFAULT_POLICY):
+        self.media_type = media_type
+        self.model_version = model_version
+        self.probabilities_only = probabilities_only
+        self.decision = decision
+        self._arrow_sink = None
+        self._arrow_writer = None
+
+    def encode(self, start, probabilities):
+        """Bytes for one chunk whose first customer has index `start`"""
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        labels, risks = self.decision.decide(probabilities)
+
+        if self.media_type == NDJSON:
+            if self.probabilities_only:
+                return b"".join(dumps({"customer_id": start + i + 1, "churn_probability": prob}) + b"\n"
+                                for i, prob in enumerate(probabilities.tolist()))
+            return b"".join(
+                dumps({"customer_id": start + i + 1, "churn_prediction": label, "churn_probability": prob,
+                       "risk_level": risk}) + b"\n"
+                for i, (label, prob, risk) in enumerate(zip(CHURN_LABELS[labels].tolist(), probabilities.tolist(),
+                                                            RISK_LABELS[risks].tolist()))
+            )
+        if self.media_type == MSGPACK:
+            # One map per chunk; msgpack.Unpacker reads them back one after another
+            chunk = {"start": start, "model_version": self.model_version,
+                     "churn_probability": probabilities.tolist()}
+            if not self.probabilities_only:
+                chunk.update(_coded(labels, risks))
+            return _msgpack().packb(chunk)
+        if self.media_type == ARROW:
+            batch = _arrow_batch(probabilities, labels, risks, self.probabilities_only)
+            if self._arrow_writer is None:
+                pa = _pyarrow()
+                self._arrow_sink = io.BytesIO()
+                schema = batch.schema.with_metadata({"model_version": self.model_version or ""})
+                self._arrow_writer = pa.ipc.new_stream(self._arrow_sink, schema)
+            self._arrow_writer.write_batch(batch)
+            return self._take_arrow_bytes()
+        raise FormatError(406, f"Unsupported format {self.media_type!r}")
+
+    def close(self):
+        """Trailing bytes (the Arrow end-of-stream marker)"""
+        if self._arrow_writer is None:
+            return b""
+        self._arrow_writer.close()
+        return self._take_arrow_bytes()
+
+    def _take_arrow_bytes(self):
+        data = self._arrow_sink.getvalue()
+        self._arrow_sink.seek(0)
+        self._arrow_sink.truncate()
+        return data
+
+
+# ========== HELPERS ==========
+def _arrow_batch(probabilities, labels, risks, probabilities_only=False):
+    pa = _pyarrow()
+    arrays = {"churn_probability": pa.array(probabilities)}
+    if not probabilities_only:
+        arrays["churn_prediction"] = pa.DictionaryArray.from_arrays(labels, CHURN_LABELS.tolist())
+        arrays["risk_level"] = pa.DictionaryArray.from_arrays(risks, RISK_LABELS.tolist())
+    return pa.RecordBatch.from_pydict(arrays)
+
+
+def _arrow_stream(batches, metadata=None):
+    pa = _pyarrow()
+    sink = io.BytesIO()
+    schema = batches[0].schema.with_metadata(metadata) if metadata else batches[0].schema
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    return sink.getvalue()
+
+
+def dumps(obj):
+    """JSON bytes: orjson when installed, the standard library otherwise"""
+    if orjson is None:
+        return json.dumps(obj, separators=(",", ":")).encode()
+    return orjson.dumps(obj)
+
+
+def _loads(body):
+    return json.loads(body) if orjson is None else orjson.loads(body)
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise FormatError(415, "Arrow payloads need pyarrow on the server: pip install pyarrow")
+    return pa
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise FormatError(415, "MessagePack payloads need msgpack on the server: pip install msgpack")
+    return msgpack
@@ -0,0 +1,207 @@
+"""
+Prometheus-style metrics for the API, served as text on GET /metrics.
+
+- churn_requests_total / churn_errors_total: per endpoint, method and status
+- churn_request_latency_seconds: per endpoint, from request received to response ready
+- churn_stage_seconds: per endpoint and stage of the inference path
+  (validation, to_dict, dataframe, cleaner, preprocessor, model, serialization, ...)
+- churn_batch_size: customers per batch call
+
+No client library: counters and fixed-bucket histograms under one lock,
+rendered in the text exposition format.
+"""
+import asyncio
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from collections import Counter
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                 0.025, 0.05, 0.1, 0.25, 1.0)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000, 100000)
+
+# [endpoint, received, entered endpoint, left endpoint] for the request being served.
+# A list, so a sync endpoint's worker thread (which gets a copy of the context) can fill it in.
+_request = contextvars.ContextVar("churn_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Request, stage and batch-size metrics for one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter()  # (endpoint, method, status) -> requests
+        self.errors = Counter()    # (endpoint, method, status) -> requests with status >= 400
+        self.latency = {}          # endpoint -> Histogram
+        self.stages = {}           # (endpoint, stage) -> Histogram
+        self.batch_sizes = {}      # endpoint -> Histogram
+
+    # ========== RECORDING ==========
+    def observe_request(self, endpoint, method, status, seconds):
+        with self._lock:
+            self.requests[endpoint, method, status] += 1
+            if status >= 400:
+                self.errors[endpoint, method, status] += 1
+            self._histogram(self.latency, endpoint, LATENCY_BUCKETS).observe(seconds)
+
+    def observe_stage(self, stage, start, endpoint=None):
+        """Time since `start` (time.perf_counter()) spent in `stage` of the current request"""
+        seconds = time.perf_counter() - start
+        if endpoint is None:
+            request = _request.get()
+            if request is None:
+                return  # not serving a request (self-test at load time, scripts)
+            endpoint = request[0]
+        self._record_stage(endpoint, stage, seconds)
+
+    def _record_stage(self, endpoint, stage, seconds):
+        with self._lock:
+            self._histogram(self.stages, (endpoint, stage), STAGE_BUCKETS).observe(seconds)
+
+    def observe_batch_size(self, size, endpoint=None):
+        if endpoint is None:
+            request = _request.get()
+            endpoint = request[0] if request is not None else ""
+        with self._lock:
+            self._histogram(self.batch_sizes, endpoint, BATCH_SIZE_BUCKETS).observe(size)
+
+    @staticmethod
+    def _histogram(histograms, key, buckets):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(buckets)
+        return histogram
+
+    # ========== FASTAPI HOOK ==========
+    def route_class(self):
+        """
+        APIRoute subclass that records every request to this Metrics.
+        Set as app.router.route_class before the routes are declared.
+
+        The endpoint function is wrapped to mark when it starts and returns, which
+        splits a request into validation (body parsing + pydantic, plus the hop to
+        the thread pool for sync endpoints), the endpoint itself, and serialization
+        (response model + JSON encoding).
+        """
+        metrics = self
+
+        class InstrumentedRoute(APIRoute):
+            def __init__(self, path, endpoint, **kwargs):
+                super().__init__(path, _mark_endpoint(endpoint), **kwargs)
+
+            def get_route_handler(self):
+                handler = super().get_route_handler()
+                path = self.path
+
+                async def instrumented(request):
+                    request_state = [path, time.perf_counter(), None, None]
+                    # Not reset afterwards: each request runs in its own task (and context), and
+                    # a StreamingResponse body is produced after this returns, still in it
+                    _request.set(request_state)
+                    status = 500
+                    try:
+                        response = await handler(request)
+                        status = response.status_code
+                        return response
+                    except HTTPException as e:
+                        status = e.status_code
+                        raise
+                    except RequestValidationError:
+                        status = 422
+                        raise
+                    finally:
+                        _, received, entered, left = request_state
+                        end = time.perf_counter()
+                        # entered is None: rejected before the endpoint ran (e.g. 422)
+                        metrics._record_stage(path, "validation", (entered or end) - received)
+                        if left is not None:
+                            metrics._record_stage(path, "serialization", end - left)
+                        metrics.observe_request(path, request.method, status, end - received)
+
+                return instrumented
+
+        return InstrumentedRoute
+
+    # ========== EXPOSITION ==========
+    def render(self):
+        """All metrics in the Prometheus text format"""
+        lines = []
+        with self._lock:
+            _counter(lines, "churn_requests_total", "Requests served", ("endpoint", "method", "status"),
+                     self.requests)
+            _counter(lines, "churn_errors_total", "Requests answered with a 4xx/5xx status",
+                     ("endpoint", "method", "status"), self.errors)
+            _histograms(lines, "churn_request_latency_seconds", "Time from request received to response ready",
+                        ("endpoint",), self.latency)
+            _histograms(lines, "churn_stage_seconds", "Time spent in each stage of the inference path",
+                        ("endpoint", "stage"), self.stages)
+            _histograms(lines, "churn_batch_size", "Customers per batch call", ("endpoint",), self.batch_sizes)
+        return "\n".join(lines) + "\n"
+
+
+def _mark_endpoint(endpoint):
+    """Wrap an endpoint so the current request records when it enters and leaves it"""
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def marked(*args, **kwargs):
+            request = _request.get()
+            if request is not None:
+                request[2] = time.perf_counter()
+            result = await endpoint(*args, **kwargs)
+            if request is not None:
+                request[3] = time.perf_counter()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def marked(*args, **kwargs):
+            request = _request.get()
+            if request is not None:
+                request[2] = time.perf_counter()
+            result = endpoint(*args, **kwargs)
+            if request is not None:
+                request[3] = time.perf_counter()
+            return result
+    return marked
+
+
+def _labels(names, values):
+    values = values if isinstance(values, tuple) else (values,)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+def _counter(lines, name, help_text, label_names, counts):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for key, value in sorted(counts.items()):
+        lines.append(f"{name}{{{_labels(label_names, key)}}} {value}")
+
+
+def _histograms(lines, name, help_text, label_names, histograms):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, histogram in sorted(histograms.items()):
+        labels = _labels(label_names, key)
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that can be switched on and off while the API runs.
+
+    While running, a background thread wakes every `interval` seconds, grabs the
+    current stack of every other thread (sys._current_frames) and counts it.
+    folded() returns the counts in the "collapsed stack" format that
+    flamegraph.pl / speedscope / inferno read directly:
+
+        app.py:predict_single;registry.py:predict_one;scoring.py:transform_one 42
+
+    When stopped there is no thread and no hook on the request path, so it costs nothing.
+    Distinct stacks are capped at `max_stacks`; further new ones are counted as [other].
+    """
+
+    def __init__(self, interval=0.005, max_stacks=10_000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.stopped_at = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, interval=None):
+        """Start sampling (restarts with the new interval if already running)"""
+        self.stop()
+        if interval is not None:
+            self.interval = interval
+        self._stopping = threading.Event()
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        self.stopped_at = time.time()
+
+    def reset(self):
+        with self._lock:
+            self.stacks = Counter()
+            self.samples = 0
+
+    def folded(self):
+        """Collected stacks, one 'frame;frame;...;leaf count' line each"""
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at
+        }
+
+    # ========== SAMPLER THREAD ==========
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stopping.wait(self.interval):
+            frames = sys._current_frames()
+            stacks = [_fold(frame) for ident, frame in frames.items() if ident != own]
+            del frames
+            with self._lock:
+                self.samples += 1
+                for stack in stacks:
+                    if stack in self.stacks or len(self.stacks) < self.max_stacks:
+                        self.stacks[stack] += 1
+                    else:
+                        self.stacks["[other]"] += 1
+
+
+def _fold(frame):
+    """Root-first 'file:function;...' for one thread's stack"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
@@ -0,0 +1,461 @@
+import glob
+import math
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from src.artifact import MANIFEST, artifact_path, is_artifact, load_artifact
+from src.decision import DecisionPolicy
+from src.explain import Explainer
+from src.scoring import CompiledScorer
+from src.validation import BulkValidator
+
+# Scored once when a model version loads (warm-up + readiness self-test)
+SELF_TEST_CUSTOMER = {
+    "gender": "Female",
+    "SeniorCitizen": 0,
+    "Partner": "Yes",
+    "Dependents": "No",
+    "tenure": 1,
+    "PhoneService": "Yes",
+    "MultipleLines": "No",
+    "InternetService": "DSL",
+    "OnlineSecurity": "No",
+    "OnlineBackup": "Yes",
+    "DeviceProtection": "No",
+    "TechSupport": "No",
+    "StreamingTV": "No",
+    "StreamingMovies": "No",
+    "Contract": "Month-to-month",
+    "PaperlessBilling": "Yes",
+    "PaymentMethod": "Electronic check",
+    "MonthlyCharges": 29.85,
+    "TotalCharges": "29.85"
+}
+
+
+class ModelVersion:
+    """One loaded model: the sklearn pipeline and/or its compiled scorer, and its decision thresholds"""
+
+    def __init__(self, name, path, pipeline, scorer, loaded_from, metrics=None, decision=None):
+        self.name = name
+        self.path = path
+        self.pipeline = pipeline
+        self.scorer = scorer
+        self.loaded_from = loaded_from
+        # Per-stage timers (api.metrics.Metrics), None = not recorded
+        self.metrics = metrics
+        # Label threshold and risk bands (src.decision; <name>.thresholds.json, else the defaults)
+        self.decision = decision or DecisionPolicy()
+        # Column-wise checks against this model's categories (None: requests go through pydantic)
+        self.validator = _bulk_validator(scorer, pipeline)
+        # Closed-form per-feature contributions (linear models only, None otherwise)
+        self.explainer = Explainer(scorer, self.decision) if scorer is not None and scorer.linear else None
+        # sklearn fallback runs the pipeline step by step, so each step can be timed
+        self._steps, self._classifier = _split_pipeline(pipeline) if pipeline is not None else ([], None)
+        self.loaded_at = datetime.now().isoformat()
+        # Changes on every (re)load, so caches keyed on it never serve stale predictions
+        self.token = f"{name}@{time.time_ns()}"
+
+        self.load_ms = None
+        self.rss_delta_bytes = None
+        self.readiness = None
+
+    # ========== LOADING ==========
+    @classmethod
+    def load(cls, name, path, fast_start=False, metrics=None):
+        """
+        Load `path` (a joblib pipeline) and run the warm-up self-test.
+        With fast_start, an exported `<same name>.model/` (src.artifact, memory-mapped)
+        or a precompiled `<same name>.npz` next to it is used instead when it is newer,
+        so sklearn / pandas are never imported. `<same name>.thresholds.json` sets its decision thresholds.
+        """
+        start = time.perf_counter()
+        rss_before = _rss_bytes()
+        decision = DecisionPolicy.for_model(path)
+
+        exported = artifact_path(path)
+        scorer_path = os.path.splitext(path)[0] + ".npz"
+        if fast_start and is_artifact(exported) and _newer(os.path.join(exported, MANIFEST), path):
+            version = cls(name, path, None, load_artifact(exported), exported, metrics, decision)
+        elif fast_start and os.path.exists(scorer_path) and _newer(scorer_path, path):
+            version = cls(name, path, None, CompiledScorer.load(scorer_path), scorer_path, metrics, decision)
+        else:
+            import joblib
+
+            pipeline = joblib.load(path)
+            # Compile into a pure-NumPy scorer (falls back to the sklearn pipeline if it can't be)
+            try:
+                scorer = CompiledScorer.from_pipeline(pipeline)
+            except TypeError as e:
+                scorer = None
+                print(f"Compiled scorer unavailable for '{name}', using sklearn pipeline: {e}")
+            version = cls(name, path, pipeline, scorer, path, metrics, decision)
+
+        version.readiness = version.self_test()
+        version.load_ms = (time.perf_counter() - start) * 1000
+        if rss_before is not None:
+            version.rss_delta_bytes = _rss_bytes() - rss_before
+        return version
+
+    # ========== SCORING ==========
+    def predict_one(self, customer_dict):
+        """(prediction 0/1, churn probability) for one customer dict; the label comes from self.decision"""
+        if self.scorer is not None:
+            # Fast path: one dot product, no DataFrame / ColumnTransformer
+            start = time.perf_counter()
+            x = self.scorer.transform_one(customer_dict)
+            self._stage("transform", start)
+            start = time.perf_counter()
+            _, probability = self.scorer.predict_features_one(x)
+            self._stage("model", start)
+            return self.decision.decide_one(probability)[0], probability
+
+        import pandas as pd  # only needed for the sklearn fallback
+
+        # Convert to DataFrame (our pipeline expects this)
+        start = time.perf_counter()
+        df = pd.DataFrame([customer_dict])
+        self._stage("dataframe", start)
+        features = self._transform(df)  # once, shared by predict_proba and predict
+
+        start = time.perf_counter()
+        probability = float(self._classifier.predict_proba(features)[0, 1])  # Probability of churn
+        self._stage("model_predict_proba", start)
+        # No second model call for classifier.predict(): the label is a threshold on the same probability
+        return self.decision.decide_one(probability)[0], probability
+
+    def score_columns(self, columns):
+        """Churn probabilities for column-oriented input (dict of lists or DataFrame)"""
+        if self.scorer is not None:
+            start = time.perf_counter()
+            X = self.scorer.transform(columns)
+            self._stage("transform", start)
+            start = time.perf_counter()
+            probabilities = self.scorer.predict_proba_features(X)
+            self._stage("model", start)
+            return probabilities
+
+        import pandas as pd  # only needed for the sklearn fallback
+
+        start = time.perf_counter()
+        df = pd.DataFrame(columns)
+        self._stage("dataframe", start)
+        features = self._transform(df)
+        start = time.perf_counter()
+        probabilities = self._classifier.predict_proba(features)[:, 1]
+        self._stage("model_predict_proba", start)
+        return probabilities
+
+    def score_batch(self, batch):
+        """
+        Churn probabilities for a CustomerBatch. Typed arrays from this version's
+        validator go straight into the compiled scorer; anything else is scored as columns.
+        """
+        if self.scorer is None or batch.codes is None or batch.validator is not self.validator:
+            return self.score_columns(batch.columns())
+        start = time.perf_counter()
+        X = self.scorer.transform_codes(batch.numeric, batch.codes)
+        self._stage("transform", start)
+        start = time.perf_counter()
+        probabilities = self.scorer.predict_proba_features(X)
+        self._stage("model", start)
+        return probabilities
+
+    def explain_batch(self, batch):
+        """Per-feature contributions (src.explain.Explanation) for a CustomerBatch"""
+        if self.explainer is None:
+            raise TypeError(f"'{self.name}' has no compiled linear scorer to explain")
+        start = time.perf_counter()
+        if batch.codes is not None and batch.validator is self.validator:
+            X = self.scorer.transform_codes(batch.numeric, batch.codes)
+        else:
+            X = self.scorer.transform(batch.columns())
+        self._stage("transform", start)
+        start = time.perf_counter()
+        explanation = self.explainer.explain(X)
+        self._stage("explain", start)
+        return explanation
+
+    def _transform(self, X):
+        """Run the pipeline's transformers one at a time (e.g. cleaner, preprocessor)"""
+        for name, step in self._steps:
+            start = time.perf_counter()
+            X = step.transform(X)
+            self._stage(name, start)
+        return X
+
+    def _stage(self, stage, start):
+        if self.metrics is not None:
+            self.metrics.observe_stage(stage, start)
+
+    def self_test(self):
+        """
+        Warm up the single and batch scoring paths once and return the result.
+        /readyz and /health serve this instead of predicting on every probe.
+        """
+        start = time.perf_counter()
+        try:
+            self.predict_one(SELF_TEST_CUSTOMER)
+            self.score_columns({col: [value] for col, value in SELF_TEST_CUSTOMER.items()})
+            return {
+                "status": "healthy",
+                "model": "loaded",
+                "model_version": self.name,
+                "model_type": str(type(self.pipeline if self.pipeline is not None else self.scorer)),
+                "loaded_from": self.loaded_from,
+                "compiled_scorer": self.scorer is not None,
+                "self_test_ms": (time.perf_counter() - start) * 1000,
+                "checked_at": datetime.now().isoformat()
+            }
+        except Exception as e:
+            return {
+                "status": "unhealthy",
+                "error": str(e),
+                "model": "error",
+                "model_version": self.name,
+                "checked_at": datetime.now().isoformat()
+            }
+
+    def info(self):
+        return {
+            "path": self.path,
+            "loaded_from": self.loaded_from,
+            "loaded_at": self.loaded_at,
+            "load_ms": self.load_ms,
+            "rss_delta_bytes": self.rss_delta_bytes,
+            "compiled_scorer": self.scorer is not None,
+            "thresholds": self.decision.to_dict(),
+            "status": self.readiness["status"]
+        }
+
+
+class ModelRegistry:
+    """
+    Named model versions held in memory, with atomic hot swaps.
+
+    - Versions are named after their file in `models_dir` (models/v2.pkl -> "v2")
+    - reload() loads and warms a version in a background thread, then swaps it in
+      by replacing the versions dict; in-flight requests keep the version object
+      they already hold, so nothing blocks on a reload
+    - route() picks the version for a request: an explicit name, else a weighted
+      traffic split, else the default
+    - An optional shadow version is scored alongside the served one for comparison
+    """
+
+    def __init__(self, models_dir, default_name, fast_start=False, metrics=None):
+        self.models_dir = models_dir
+        self.default_name = default_name
+        self.fast_start = fast_start
+        self.metrics = metrics
+
+        self._versions = {}  # name -> ModelVersion (replaced wholesale on every swap)
+        self._load_lock = threading.Lock()  # one load/swap at a time, never taken by requests
+        self._shadow_lock = threading.Lock()  # shadow_stats, updated from background tasks
+        self._watch_thread = None
+        self._mtimes = {}
+
+        self.split = {}  # name -> traffic weight
+        self.shadow = None
+        self.shadow_stats = {"requests": 0, "label_disagreements": 0, "abs_diff_sum": 0.0}
+        self.swaps = []  # recent swap events
+        self.errors = {}  # name -> last load error
+
+    # ========== LOOKUP / ROUTING ==========
+    def path_for(self, name):
+        return os.path.join(self.models_dir, f"{name}.pkl")
+
+    def get(self, name=None):
+        """Loaded version by name (default version if None); KeyError if not loaded"""
+        return self._versions[name or self.default_name]
+
+    def names(self):
+        return list(self._versions)
+
+    def route(self, requested=None):
+        """Version that should serve this request"""
+        if requested:
+            return self.get(requested)
+        if self.split:
+            names = list(self.split)
+            return self.get(random.choices(names, weights=[self.split[n] for n in names])[0])
+        return self.get()
+
+    def set_routing(self, split=None, shadow=None):
+        """
+        Set traffic split ({name: weight}) and shadow version. Names must be loaded (KeyError),
+        weights finite and >= 0 with a positive total (ValueError): route() draws from them
+        """
+        split = split or {}
+        for name in list(split) + ([shadow] if shadow else []):
+            if name not in self._versions:
+                raise KeyError(name)
+        weights = list(split.values())
+        if not all(math.isfinite(w) and w >= 0 for w in weights):
+            raise ValueError(f"Traffic weights must be finite numbers >= 0, got {split}")
+        if split and sum(weights) <= 0:
+            raise ValueError(f"Traffic weights must add up to more than 0, got {split}")
+        with self._shadow_lock:
+            self.split = dict(split)
+            self.shadow = shadow
+            self.shadow_stats = {"requests": 0, "label_disagreements": 0, "abs_diff_sum": 0.0}
+
+    # ========== LOADING / SWAPPING ==========
+    def load(self, name, path=None, require_healthy=True):
+        """
+        Load + warm `name` (blocking) and swap it in; returns the new version.
+        A version that fails its self-test is not swapped in unless require_healthy=False
+        (used at startup, so /readyz can report the failure).
+        """
+        path = path or self.path_for(name)
+        with self._load_lock:
+            try:
+                mtime = os.path.getmtime(path)
+                version = ModelVersion.load(name, path, self.fast_start, self.metrics)
+                if require_healthy and version.readiness["status"] != "healthy":
+                    raise RuntimeError(version.readiness["error"])
+            except Exception as e:
+                self.errors[name] = f"{type(e).__name__}: {e}"
+                print(f"Failed to load model '{name}' from {path}: {e}")
+                raise
+            self._mtimes[path] = mtime
+            self.errors.pop(name, None)
+            self._swap(version)
+        return version
+
+    def reload(self, name=None, path=None):
+        """Load `name` in a background thread; the current version keeps serving meanwhile"""
+        name = name or self.default_name
+        thread = threading.Thread(target=self._load_quietly, args=(name, path), daemon=True)
+        thread.start()
+        return thread
+
+    def _load_quietly(self, name, path):
+        try:
+            self.load(name, path)
+        except Exception:
+            pass  # recorded in self.errors
+
+    def _swap(self, version):
+        start = time.perf_counter()
+        versions = dict(self._versions)
+        old = versions.get(version.name)
+        versions[version.name] = version
+        self._versions = versions  # single reference assignment: atomic for readers
+        swap_us = (time.perf_counter() - start) * 1e6
+
+        self.swaps = (self.swaps + [{
+            "model": version.name,
+            "replaced": old.loaded_at if old is not None else None,
+            "load_ms": version.load_ms,
+            "swap_us": swap_us,
+            "at": version.loaded_at
+        }])[-20:]
+        print(f"Model '{version.name}' loaded in {version.load_ms:.0f} ms, swapped in {swap_us:.1f} us")
+
+    # ========== WATCHING ==========
+    def watch(self, interval):
+        """Poll models_dir every `interval` seconds and (re)load new or changed .pkl files"""
+        if self._watch_thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.check_for_changes()
+
+        self._watch_thread = threading.Thread(target=run, daemon=True)
+        self._watch_thread.start()
+
+    def check_for_changes(self):
+        for path in sorted(glob.glob(os.path.join(self.models_dir, "*.pkl"))):
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if self._mtimes.get(path) != mtime:
+                name = os.path.splitext(os.path.basename(path))[0]
+                self._mtimes[path] = mtime  # don't retry a broken file every poll
+                self._load_quietly(name, path)
+
+    # ========== SHADOW ==========
+    def score_shadow(self, customers, probabilities, decision=None):
+        """
+        Score the same customers (a list of customer dicts or a dict of columns)
+        with the shadow version and record how it differs (labels: the served
+        version's `decision` vs the shadow's own)
+        """
+        shadow = self._versions.get(self.shadow) if self.shadow else None
+        if shadow is None:
+            return
+        if isinstance(customers, dict):
+            columns = customers
+        else:
+            columns = {col: [c[col] for c in customers] for col in customers[0]}
+        shadow_probabilities = shadow.score_columns(columns)
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+
+        abs_diff = float(np.abs(probabilities - shadow_probabilities).sum())
+        disagreements = int(((decision or DecisionPolicy()).labels(probabilities)
+                             != shadow.decision.labels(shadow_probabilities)).sum())
+        with self._shadow_lock:
+            if self.shadow != shadow.name:
+                return  # routing changed while we scored: don't count against the new shadow's stats
+            stats = self.shadow_stats
+            stats["requests"] += len(probabilities)
+            stats["abs_diff_sum"] += abs_diff
+            stats["label_disagreements"] += disagreements
+
+    def stats(self):
+        with self._shadow_lock:
+            shadow = dict(self.shadow_stats)
+        n = shadow.pop("abs_diff_sum")
+        shadow["mean_abs_diff"] = n / shadow["requests"] if shadow["requests"] else 0.0
+        return {
+            "default": self.default_name,
+            "versions": {name: v.info() for name, v in self._versions.items()},
+            "split": self.split,
+            "shadow": self.shadow,
+            "shadow_stats": shadow,
+            "recent_swaps": self.swaps,
+            "errors": self.errors
+        }
+
+
+def _bulk_validator(scorer, pipeline):
+    try:
+        return BulkValidator.from_scorer(scorer) if scorer is not None else BulkValidator.from_pipeline(pipeline)
+    except TypeError as e:
+        print(f"Bulk validation unavailable, batches are validated with pydantic: {e}")
+        return None
+
+
+def _newer(path, than):
+    return not os.path.exists(than) or os.path.getmtime(path) >= os.path.getmtime(than)
+
+
+def _split_pipeline(pipeline):
+    """([(step name, transformer), ...], final estimator) with nested Pipelines unpacked"""
+    steps = _named_steps("model", pipeline)
+    return steps[:-1], steps[-1][1]
+
+
+def _named_steps(name, estimator):
+    steps = getattr(estimator, "steps", None)
+    if steps is None:
+        return [(name, estimator)]
+    return [pair for step_name, step in steps if step is not None and step != "passthrough"
+            for pair in _named_steps(step_name, step)]
+
+
+def _rss_bytes():
+    """Current resident set size (Linux), or None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,295 @@
+"""
+Scoring processes fed through shared memory (python -m api.serve --scorers N).
+
+The uvicorn workers (front-ends) keep parsing and validating requests; the
+model work moves to N scoring processes, each pinned to its own CPU. All of
+them are forked from the process that loaded the model and share one
+anonymous shared-memory block cut into fixed-size slots:
+
+- every front-end owns a ring of `slots` slots. A validated batch (typed
+  arrays: numeric columns + category codes, see src.validation) is copied
+  into free slots, at most `slot_rows` customers per slot
+- the slot number is written to a pipe (the doorbell) that every scoring
+  process reads; whichever is idle takes it, scores the slot in place, writes
+  the probabilities into the same slot and releases the slot's semaphore
+- the front-end thread waiting on that semaphore copies the probabilities
+  out and puts the slot back on its ring
+
+A batch bigger than one slot is spread over several slots, and so over
+several scoring processes. Only model versions loaded before the fork are
+served this way (scoring processes don't reload); anything else, e.g. a
+version hot-swapped into one front-end, is scored in the front-end as before.
+
+The pool never makes a request wait for it: a chunk that finds no free slot,
+or whose scoring process times out or fails, is scored in the front-end. A
+slot that timed out comes back once its scoring process is done with it. A
+scoring process that dies is replaced by the process that started it
+(replace(), called by api.serve); its slot in flight is marked failed, so the
+front-end scores that chunk itself and gets the slot back.
+"""
+import mmap
+import multiprocessing
+import os
+import queue
+import signal
+import struct
+from collections import deque
+
+import numpy as np
+
+from src.validation import CustomerBatch
+
+# Slot header (int64 each): customers in the slot, version id, status
+OK, FAILED = 0, 1
+HEADER_FIELDS = 3
+IDLE = -1  # a scoring process's current slot when it has none
+DOORBELL = struct.Struct("i")  # one slot number; pipe writes this small are atomic
+
+
+class ScoringPool:
+    """Shared-memory slots plus the scoring processes that serve them"""
+
+    def __init__(self, versions, frontends, scorers, slots=8, slot_rows=4096, timeout=30.0):
+        # Versions the scoring processes serve: those validated into typed arrays, same fields as the first
+        versions = [v for v in versions if v.validator is not None]
+        if not versions:
+            raise ValueError("No loaded model version validates batches into typed arrays")
+        validator = versions[0].validator
+        self.numeric = [(col, np.dtype(dtype)) for col, (dtype, _) in validator.numeric_rules.items()]
+        self.categorical = list(validator.categories)
+        self._versions = [v for v in versions if v.validator.fields == validator.fields]
+        self._ids = {v.token: i for i, v in enumerate(self._versions)}
+
+        self.frontends = frontends
+        self.scorers = scorers
+        self.slots = slots  # per front-end
+        self.slot_rows = slot_rows
+        self.timeout = timeout
+
+        # Slot layout: header, numeric columns, probabilities (8-byte values), then int16 category codes
+        self.slot_bytes = 8 * (HEADER_FIELDS + slot_rows * (len(self.numeric) + 1)) + 2 * slot_rows * len(
+            self.categorical)
+        total = frontends * slots
+        self._memory = mmap.mmap(-1, total * self.slot_bytes)  # MAP_SHARED | MAP_ANONYMOUS: survives fork
+        self._views = [self._slot_views(slot) for slot in range(total)]
+        self._done = [multiprocessing.Semaphore(0) for _ in range(total)]
+        self._doorbell_read, self._doorbell_write = os.pipe()
+        # Shared with every process: replacements so far, then the slot each scoring process is scoring
+        self._shared = mmap.mmap(-1, 8 * (1 + scorers))
+        self._restarts = np.frombuffer(self._shared, np.int64, 1, 0)
+        self._working = np.frombuffer(self._shared, np.int64, scorers, 8)
+        self._working[:] = IDLE
+
+        self.pids = []
+        self._cpus = []
+        self.frontend = None  # set by attach() in each front-end
+        self._free = None
+        self._lost = set()  # slots whose scoring timed out; back on the ring once they are done
+
+        # Stats (per front-end process)
+        self.requests = 0
+        self.customers = 0
+        self.chunks = 0
+        self.in_process = 0
+        self.chunks_in_process = 0
+        self.timeouts = 0
+
+    def _slot_views(self, slot):
+        """(header, {column: numeric array}, {column: code array}, probabilities) over one slot"""
+        offset = slot * self.slot_bytes
+        header = np.frombuffer(self._memory, np.int64, HEADER_FIELDS, offset)
+        offset += 8 * HEADER_FIELDS
+        numeric = {}
+        for col, dtype in self.numeric:
+            numeric[col] = np.frombuffer(self._memory, dtype, self.slot_rows, offset)
+            offset += dtype.itemsize * self.slot_rows
+        probabilities = np.frombuffer(self._memory, np.float64, self.slot_rows, offset)
+        offset += 8 * self.slot_rows
+        codes = {}
+        for col in self.categorical:
+            codes[col] = np.frombuffer(self._memory, np.int16, self.slot_rows, offset)
+            offset += 2 * self.slot_rows
+        return header, numeric, codes, probabilities
+
+    # ========== SCORING PROCESSES ==========
+    def start(self):
+        """Fork the scoring processes, pinned round-robin to the CPUs this process may use; returns their pids"""
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else [None]
+        self._cpus = [cpus[i % len(cpus)] for i in range(self.scorers)]
+        self.pids = [self._fork(i) for i in range(self.scorers)]
+        return self.pids
+
+    def replace(self, pid):
+        """
+        Scoring process `pid` exited: fail the slot it was scoring (its front-end then scores
+        that chunk itself) and fork a replacement. Called by the process that ran start().
+        """
+        i = self.pids.index(pid)
+        slot = int(self._working[i])
+        if slot != IDLE:
+            self._views[slot][0][2] = FAILED
+            self._working[i] = IDLE
+            self._done[slot].release()
+        self._restarts[0] += 1
+        self.pids[i] = self._fork(i)
+        return self.pids[i]
+
+    def _fork(self, i):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self._serve(i, self._cpus[i])
+            finally:
+                os._exit(0)
+        return pid
+
+    def _serve(self, i, cpu):
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # stopped by the parent's SIGTERM
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        if cpu is not None:
+            os.sched_setaffinity(0, {cpu})
+        while True:
+            message = os.read(self._doorbell_read, DOORBELL.size)
+            if not message:
+                return
+            slot, = DOORBELL.unpack(message)
+            self._working[i] = slot
+            self._score_slot(slot)
+            self._working[i] = IDLE
+            self._done[slot].release()
+
+    def _score_slot(self, slot):
+        header, numeric, codes, probabilities = self._views[slot]
+        n = int(header[0])
+        try:
+            version = self._versions[int(header[1])]
+            batch = CustomerBatch(n, {col: values[:n] for col, values in numeric.items()},
+                                  {col: values[:n] for col, values in codes.items()}, version.validator)
+            probabilities[:n] = version.score_batch(batch)
+            header[2] = OK
+        except Exception as e:
+            header[2] = FAILED
+            print(f"Scoring process {os.getpid()} failed on a batch of {n}: {e}")
+
+    # ========== FRONT-ENDS ==========
+    def attach(self, frontend):
+        """Make this (forked) process front-end number `frontend`, owner of its ring of slots"""
+        self.frontend = frontend
+        self._free = queue.Queue()
+        for slot in range(frontend * self.slots, (frontend + 1) * self.slots):
+            self._free.put(slot)
+
+    def accepts(self, version, batch):
+        """
+        Whether `batch` can be scored here: typed arrays of a version the scoring processes
+        hold, and a free slot to start with (else scoring in the front-end beats waiting)
+        """
+        if (self._free is not None and version.token in self._ids and batch.codes is not None
+                and batch.validator is version.validator):
+            self._reclaim()
+            if not self._free.empty():
+                return True
+        self.in_process += 1
+        return False
+
+    def score(self, version, batch):
+        """
+        Churn probabilities for a CustomerBatch (see accepts()), blocking until every
+        slot it was split into has been scored. Chunks the scoring processes can't take
+        (no free slot, a timeout, a failure) are scored here with version.score_batch.
+        """
+        version_id = self._ids[version.token]
+        n = len(batch)
+        probabilities = np.empty(n)
+        pending = deque()  # (slot, start, stop) handed to the scoring processes, not collected yet
+        errors = []
+        self.requests += 1
+        self.customers += n
+        try:
+            for start in range(0, n, self.slot_rows):
+                stop = min(start + self.slot_rows, n)
+                slot = self._acquire(pending, version, batch, probabilities, errors)
+                if slot is None:
+                    self._score_here(version, batch, start, stop, probabilities, errors)
+                    continue
+                self._submit(slot, version_id, batch, start, stop)
+                pending.append((slot, start, stop))
+        finally:
+            while pending:
+                self._collect(pending.popleft(), version, batch, probabilities, errors)
+        if errors:
+            raise errors[0]
+        return probabilities
+
+    def _acquire(self, pending, version, batch, probabilities, errors):
+        """
+        A free slot of this front-end's ring, or None if there is none: collects our own pending
+        chunks rather than waiting for other requests' slots
+        """
+        while True:
+            try:
+                return self._free.get_nowait()
+            except queue.Empty:
+                if not pending:
+                    return None
+                self._collect(pending.popleft(), version, batch, probabilities, errors)
+
+    def _reclaim(self):
+        """Put timed-out slots whose scoring has finished since back on the ring"""
+        for slot in list(self._lost):
+            if self._done[slot].acquire(block=False):
+                self._lost.discard(slot)
+                self._free.put(slot)
+
+    def _score_here(self, version, batch, start, stop, probabilities, errors):
+        self.chunks_in_process += 1
+        try:
+            probabilities[start:stop] = version.score_batch(batch.take(slice(start, stop)))
+        except Exception as e:
+            errors.append(e)
+
+    def _submit(self, slot, version_id, batch, start, stop):
+        header, numeric, codes, _ = self._views[slot]
+        n = stop - start
+        for col, values in numeric.items():
+            values[:n] = batch.numeric[col][start:stop]
+        for col, values in codes.items():
+            values[:n] = batch.codes[col][start:stop]
+        header[:] = (n, version_id, OK)
+        self.chunks += 1
+        os.write(self._doorbell_write, DOORBELL.pack(slot))
+
+    def _collect(self, chunk, version, batch, probabilities, errors):
+        slot, start, stop = chunk
+        if not self._done[slot].acquire(timeout=self.timeout):
+            # A scoring process may still write into it: off the ring until it is done (_reclaim)
+            self.timeouts += 1
+            self._lost.add(slot)
+            self._score_here(version, batch, start, stop, probabilities, errors)
+            return
+        header, _, _, result = self._views[slot]
+        if header[2] == OK:
+            probabilities[start:stop] = result[:stop - start]
+        self._free.put(slot)
+        if header[2] != OK:  # failed, or its scoring process died (replace())
+            self._score_here(version, batch, start, stop, probabilities, errors)
+
+    def stats(self):
+        return {
+            "enabled": True,
+            "scoring_processes": self.scorers,
+            "frontends": self.frontends,
+            "frontend": self.frontend,
+            "slots": self.slots,
+            "slot_rows": self.slot_rows,
+            "free_slots": self._free.qsize() if self._free is not None else 0,
+            "versions": [v.name for v in self._versions],
+            "requests": self.requests,
+            "customers": self.customers,
+            "chunks": self.chunks,
+            "scored_in_process": self.in_process,
+            "chunks_scored_in_process": self.chunks_in_process,
+            "timeouts": self.timeouts,
+            "lost_slots": len(self._lost),
+            "scoring_process_restarts": int(self._restarts[0])
+        }
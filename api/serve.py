@@ -0,0 +1,127 @@
+"""
+Prefork server: load the model ONCE in the parent process, then fork workers.
+
+Workers inherit the already-imported modules and loaded model, so they start
+instantly and share those memory pages copy-on-write (gc.freeze() keeps the
+garbage collector from touching, and so copying, the inherited objects).
+uvicorn's own --workers spawns fresh interpreters that each load everything again.
+
+With --scorers N the workers only parse and validate requests; the model work
+is done by N scoring processes pinned to their own CPUs, which read the
+validated batches from shared memory (api.scoring_pool).
+
+Each worker has its own copy of the model registry. With more than one worker,
+runtime registry changes (POST /admin/reload, /admin/routing) are refused
+(409) and every worker watches models/ instead, so a new or changed model file
+reaches all of them.
+
+    CHURN_FAST_START=1 python -m api.serve --workers 4 --port 8000
+    CHURN_FAST_START=1 python -m api.serve --workers 2 --scorers 4
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+
+import uvicorn
+
+# Model directory poll interval with several workers, unless CHURN_MODEL_WATCH_SECONDS sets one
+MULTI_WORKER_WATCH_SECONDS = 10.0
+
+
+def bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, log_level):
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefork churn API server")
+    parser.add_argument("--host", default=os.getenv("CHURN_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CHURN_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("CHURN_WORKERS", "1")))
+    parser.add_argument("--scorers", type=int, default=int(os.getenv("CHURN_SCORERS", "0")),
+                        help="CPU-pinned scoring processes (0: the workers score requests themselves)")
+    parser.add_argument("--slots", type=int, default=int(os.getenv("CHURN_SCORING_SLOTS", "8")),
+                        help="shared-memory slots per worker (batches in flight to the scoring processes)")
+    parser.add_argument("--slot-rows", type=int, default=int(os.getenv("CHURN_SCORING_SLOT_ROWS", "4096")),
+                        help="customers per slot; bigger batches are split over several slots")
+    parser.add_argument("--scoring-timeout", type=float,
+                        default=float(os.getenv("CHURN_SCORING_TIMEOUT_SECONDS", "30")))
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    # Import (and load the model) before forking
+    import api.app as app_module
+    from api.scoring_pool import ScoringPool
+
+    if args.workers > 1:
+        # /admin/reload and /admin/routing would only change the worker that gets the call, so
+        # api.app refuses them; every worker polls models/ for new or changed files instead
+        app_module.workers = args.workers
+        if app_module.MODEL_WATCH_SECONDS <= 0:
+            app_module.MODEL_WATCH_SECONDS = MULTI_WORKER_WATCH_SECONDS
+
+    pool = None
+    if args.scorers > 0:
+        registry = app_module.registry
+        pool = ScoringPool([registry.get(name) for name in registry.names()], args.workers, args.scorers,
+                           args.slots, args.slot_rows, args.scoring_timeout)
+
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} worker(s)")
+
+    workers = []
+    if pool is not None:
+        pool.start()
+        print(f"Scoring in {args.scorers} process(es), pinned round-robin to CPUs "
+              f"{sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else '(not supported)'}")
+    for frontend in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            if pool is not None:
+                pool.attach(frontend)
+                app_module.scoring_pool = pool
+            run_worker(app_module.app, sock, args.log_level)
+            os._exit(0)
+        workers.append(pid)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers + (pool.pids if pool is not None else []):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while True:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if pool is not None and pid in pool.pids and not stopping:
+            # Its worker scores the chunk it was on itself; the rest of the queue goes to the replacement
+            print(f"Scoring process {pid} exited (status {status}), replaced by {pool.replace(pid)}")
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -80,6 +80,78 @@ try:
 except Exception as e:
     print(f"    Error: {e}")
 
+# Test 4: Column-oriented batch, streamed back as NDJSON
+print("\n4. Testing /predict_batch/columns endpoint...")
+try:
+    columns = {key: [value, value, value] for key, value in test_customer.items()}  # 3 customers
+
+    response = requests.post(
+        "http://localhost:8000/predict_batch/columns",
+        json=columns,
+        stream=True
+    )
+
+    if response.status_code == 200:
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+        print(f"   Streamed predictions: {len(lines)}")
+        print(f"   First: {lines[0]}")
+    else:
+        print(f"   Error: {response.text}")
+
+except Exception as e:
+    print(f"    Error: {e}")
+
+# Test 5: Same batch as columns, answered in the compact columnar format
+print("\n5. Testing /predict_batch with columnar JSON...")
+try:
+    response = requests.post(
+        "http://localhost:8000/predict_batch",
+        json=columns,
+        headers={"Accept": "application/vnd.churn.columns+json"}
+    )
+
+    if response.status_code == 200:
+        result = response.json()
+        labels = result["risk_level_labels"]
+        print(f"   Probabilities: {result['churn_probability']}")
+        print(f"   Risk levels: {[labels[code] for code in result['risk_level']]}")
+    else:
+        print(f"   Error: {response.text}")
+
+except Exception as e:
+    print(f"    Error: {e}")
+
+# Test 6: Why is this customer at risk?
+print("\n6. Testing /explain endpoint...")
+try:
+    response = requests.post("http://localhost:8000/explain", json=[test_customer])
+
+    if response.status_code == 200:
+        explanation = response.json()["explanations"][0]
+        print(f"   Risk level: {explanation['risk_level']}")
+        print(f"   Top factors: {explanation['top_factors']}")
+    else:
+        print(f"   Error: {response.text}")
+
+except Exception as e:
+    print(f"    Error: {e}")
+
+# Test 7: Which change would lower the risk?
+print("\n7. Testing /whatif endpoint...")
+try:
+    response = requests.post("http://localhost:8000/whatif", json={"customer": test_customer})
+
+    if response.status_code == 200:
+        result = response.json()
+        best = result["scenarios"][0]
+        print(f"   Scenarios: {result['total_scenarios']}")
+        print(f"   Best: {best['changes']} -> {best['churn_probability']:.3f} ({best['risk_level']})")
+    else:
+        print(f"   Error: {response.text}")
+
+except Exception as e:
+    print(f"    Error: {e}")
+
 print("\n" + "="*50)
 print(" Test complete!")
 #print("\n API Documentation available at: http://localhost:8000/docs")
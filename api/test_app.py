@@ -0,0 +1,118 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import api.app as app_module
+from api.registry import SELF_TEST_CUSTOMER
+
+
+@pytest.fixture
+def client():
+    return TestClient(app_module.app)
+
+
+def test_probes_when_the_model_is_ready(client):
+    assert client.get("/livez").json() == {"status": "alive"}
+
+    ready = client.get("/readyz")
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "healthy" and ready.json()["model"] == "loaded"
+    assert ready.json()["model_version"] == app_module.registry.default_name
+
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert {**health.json(), "timestamp": None} == {**ready.json(), "timestamp": None}
+
+
+def test_probes_when_the_self_test_failed(client, monkeypatch):
+    version = app_module.registry.get()
+
+    def broken(customer):
+        raise ValueError("model file is corrupt")
+
+    monkeypatch.setattr(version, "predict_one", broken)
+    monkeypatch.setattr(version, "readiness", version.self_test())
+
+    live = client.get("/livez")
+    assert live.status_code == 200 and live.json() == {"status": "alive"}  # up, just not ready
+
+    ready = client.get("/readyz")
+    assert ready.status_code == 503
+    assert ready.json()["status"] == "unhealthy" and ready.json()["error"] == "model file is corrupt"
+
+    health = client.get("/health")  # answers 200 either way (older monitors), the status says which
+    assert health.status_code == 200
+    assert health.json()["status"] == "unhealthy" and "timestamp" in health.json()
+
+
+def test_admin_endpoints_need_the_admin_token(client, monkeypatch):
+    routing = {"split": {}, "shadow": None}
+
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "")
+    assert client.post("/admin/routing", json=routing).status_code == 404  # no token configured: disabled
+    assert client.post("/admin/reload", json={}, headers={"Authorization": "Bearer "}).status_code == 404
+
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "s3cret")
+    assert client.post("/admin/routing", json=routing).status_code == 401
+    assert client.post("/admin/routing", json=routing, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.post("/admin/reload", json={"name": "../etc"}, headers={"Authorization": "s3cret"}).status_code == 401
+
+    admin = {"Authorization": "Bearer s3cret"}
+    assert client.post("/admin/routing", json=routing, headers=admin).json() == {"split": {}, "shadow": None}
+    for split in ({"churn_pipeline": 0}, {"churn_pipeline": -1}, {"missing": 100}):
+        assert client.post("/admin/routing", json={"split": split}, headers=admin).status_code == 422
+    assert client.post("/predict", json=SELF_TEST_CUSTOMER).status_code == 200
+    assert client.post("/admin/reload", json={"name": "../etc"}, headers=admin).status_code == 400
+
+
+def test_profiler_endpoints_need_the_admin_token(client, monkeypatch):
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "")
+    assert client.get("/admin/profiler").status_code == 404
+    assert client.post("/admin/profiler", json={"enabled": True}).status_code == 404
+
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "s3cret")
+    assert client.get("/admin/profiler").status_code == 401
+    assert client.post("/admin/profiler", json={"enabled": True}).status_code == 401
+    assert not app_module.profiler.stats()["running"]
+
+    admin = {"Authorization": "Bearer s3cret"}
+    assert client.post("/admin/profiler", json={"enabled": False, "reset": True}, headers=admin).status_code == 200
+    assert client.get("/admin/profiler", headers=admin).headers["X-Profiler-Running"] == "false"
+
+
+def test_registry_changes_are_refused_with_several_workers(client, monkeypatch):
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(app_module, "workers", 2)
+    admin = {"Authorization": "Bearer s3cret"}
+    assert client.post("/admin/reload", json={}, headers=admin).status_code == 409
+    assert client.post("/admin/routing", json={"split": {}}, headers=admin).status_code == 409
+    assert client.get("/models").json()["split"] == {}
+
+
+@pytest.mark.parametrize("change", [{"tenure": "5"}, {"MonthlyCharges": "29.85"}, {"tenure": -1},
+                                    {"Contract": "Weekly"}, {"TotalCharges": True}, {"TotalCharges": "n/a"}])
+def test_strict_predict_checks_customers_like_predict_batch(client, monkeypatch, change):
+    monkeypatch.setattr(app_module, "PREDICT_STRICT", True)
+    customer = {**SELF_TEST_CUSTOMER, **change}
+    single, batch = client.post("/predict", json=customer), client.post("/predict_batch", json=[customer])
+    assert single.status_code == batch.status_code, (single.text, batch.text)
+    if single.status_code == 200:
+        assert single.json()["churn_probability"] == batch.json()["predictions"][0]["churn_probability"]
+    else:
+        assert [e["loc"][-1] for e in single.json()["detail"]] == [e["loc"][-1] for e in batch.json()["detail"]]
+
+
+@pytest.mark.parametrize("change", [{"tenure": -1}, {"Contract": "Weekly"}, {"TotalCharges": "n/a"}])
+def test_predict_scores_what_the_customer_model_accepts_by_default(client, change):
+    assert not app_module.PREDICT_STRICT
+    response = client.post("/predict", json={**SELF_TEST_CUSTOMER, **change})
+    assert response.status_code == 200, response.text
+    assert 0 <= response.json()["churn_probability"] <= 1
+
+
+def test_whatif_rejects_customers_the_model_cannot_score(client):
+    response = client.post("/whatif", json={"customer": SELF_TEST_CUSTOMER, "features": ["Contract"]})
+    assert response.status_code == 200 and response.json()["total_scenarios"] == 2
+
+    response = client.post("/whatif", json={"customer": {**SELF_TEST_CUSTOMER, "gender": "X"}})
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "customer", "gender"]]
@@ -0,0 +1,79 @@
+import gzip
+import json
+import threading
+
+from api.audit import AuditLogger
+
+CUSTOMER = {"gender": "Male", "tenure": 5, "MonthlyCharges": 89.50, "TotalCharges": ""}
+
+
+def read_records(directory):
+    records = []
+    for path in sorted(directory.iterdir()):
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+def test_rows_and_column_batches_are_written_rotated_and_compressed(tmp_path):
+    audit = AuditLogger(str(tmp_path), rotate_bytes=300, flush_interval=0.05)
+    audit.log("/predict", "v1", 1.5, CUSTOMER, 0.8, "High")
+    audit.log_batch("/predict_batch", "v1", 3.0, [CUSTOMER, CUSTOMER], [0.1, 0.5], ["Low", "Medium"])
+    audit.log_batch("/predict_batch/columns", "v2", 2.0,
+                    {"tenure": [1, 2], "gender": ["Male", "Female"]}, [0.2, 0.3], ["Low", "Low"])
+    audit.close()
+
+    records = read_records(tmp_path)
+    assert [r["churn_probability"] for r in records] == [0.8, 0.1, 0.5, 0.2, 0.3]
+    assert records[0]["features"] == CUSTOMER and records[0]["model_version"] == "v1"
+    assert records[4]["features"] == {"tenure": 2, "gender": "Female"}
+    assert all(path.suffix == ".gz" for path in tmp_path.iterdir())
+    assert audit.written == 5 and audit.dropped == 0
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    audit = AuditLogger(str(tmp_path), max_queue=3, flush_interval=0.05, compress=False)
+    disk = threading.Event()
+    write = audit._write
+    audit._write = lambda entries: (disk.wait(), write(entries))  # a very slow disk
+
+    for i in range(20):
+        audit.log("/predict", "v1", 1.0, CUSTOMER, i / 100, "Low")
+    assert audit.dropped > 0
+    assert audit.enqueued + audit.dropped == 20
+
+    disk.set()
+    audit.close()
+    assert len(read_records(tmp_path)) == audit.enqueued
+
+
+def test_a_batch_that_cannot_be_written_does_not_stop_the_writer(tmp_path):
+    audit = AuditLogger(str(tmp_path), batch_size=1, flush_interval=0.05, compress=False)
+    audit.log("/predict", "v1", 1.0, {**CUSTOMER, "tenure": object()}, 0.1, "Low")  # not JSON
+    audit.log("/predict", "v1", 1.0, CUSTOMER, 0.2, "Low")
+    audit.close()
+
+    assert [r["churn_probability"] for r in read_records(tmp_path)] == [0.2]
+    assert audit.write_errors == 1 and audit.written == 1
+
+
+def test_concurrent_first_calls_start_one_writer(tmp_path):
+    audit = AuditLogger(str(tmp_path), flush_interval=0.05, compress=False)
+    barrier = threading.Barrier(8)
+
+    def log_some(i):
+        barrier.wait()
+        for j in range(50):
+            audit.log("/predict_batch", "v1", 1.0, CUSTOMER, (i * 50 + j) / 1000, "Low")
+
+    threads = [threading.Thread(target=log_some, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writers = [t for t in threading.enumerate() if t.name == "audit-writer"]
+    audit.close()
+
+    assert len(writers) == 1
+    assert len(read_records(tmp_path)) == 400 and len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+
+from api.batching import MicroBatcher
+
+
+def score(items):
+    if "bad" in items:
+        raise ValueError("can't score 'bad'")
+    return [item.upper() for item in items]
+
+
+def test_a_failing_item_only_fails_its_own_caller():
+    batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        results = await asyncio.gather(*(batcher.submit(item) for item in ("a", "bad", "c")),
+                                       return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    a, bad, c = asyncio.run(run())
+    assert (a, c) == ("A", "C") and isinstance(bad, ValueError)
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["retried_batches"] == 1
+
+
+def test_stop_cancels_queued_and_in_flight_callers():
+    started, release = threading.Event(), threading.Event()
+
+    def slow_score(items):
+        started.set()
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(slow_score, max_batch_size=1, max_wait_ms=0)
+
+    async def run():
+        in_flight = asyncio.ensure_future(batcher.submit("first"))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        queued = asyncio.ensure_future(batcher.submit("second"))
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(batcher.stop(), 1)
+        release.set()
+        for caller in (in_flight, queued):
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(caller, 1)
+
+    asyncio.run(run())
@@ -0,0 +1,62 @@
+import os
+import time
+
+from api.cache import PredictionCache
+
+CUSTOMER = {
+    "gender": "Male", "SeniorCitizen": 0, "tenure": 5,
+    "MonthlyCharges": 89.50, "TotalCharges": ""
+}
+
+
+def test_key_normalizes_total_charges_like_data_cleaner():
+    key = PredictionCache.key
+    assert key(CUSTOMER) == key(dict(CUSTOMER, TotalCharges="0"))
+    assert key(CUSTOMER) == key(dict(CUSTOMER, TotalCharges=" "))
+    assert key(dict(CUSTOMER, TotalCharges="29.85")) == key(dict(CUSTOMER, TotalCharges="29.850"))
+    assert key(CUSTOMER) != key(dict(CUSTOMER, TotalCharges="29.85"))
+    assert key(CUSTOMER) == key(dict(reversed(list(CUSTOMER.items()))))
+
+
+def test_lru_eviction_by_entries():
+    cache = PredictionCache(max_entries=2)
+    cache.put(b"a", 1)
+    cache.put(b"b", 2)
+    cache.get(b"a")          # "b" is now least recently used
+    cache.put(b"c", 3)
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == 1 and cache.get(b"c") == 3
+    assert cache.evictions == 1
+
+
+def test_byte_budget():
+    cache = PredictionCache(max_bytes=1000)
+    for i in range(100):
+        cache.put(str(i).encode(), (1, 0.5))
+
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.evictions > 0
+
+
+def test_ttl_expiry():
+    cache = PredictionCache(ttl=0.01)
+    cache.put(b"a", 1)
+    time.sleep(0.02)
+
+    assert cache.get(b"a") is None
+    assert cache.expirations == 1
+
+
+def test_model_file_change_invalidates(tmp_path):
+    model = tmp_path / "model.pkl"
+    model.write_bytes(b"v1")
+    cache = PredictionCache(model_path=str(model), check_interval=0)
+    cache.put(b"a", 1)
+    assert cache.get(b"a") == 1
+
+    model.write_bytes(b"version 2")
+    os.utime(model, ns=(0, 0))
+
+    assert cache.get(b"a") is None
+    assert cache.invalidations == 1
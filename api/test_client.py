@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from api.client import AsyncChurnClient, ChurnAPIError, ChurnClient
+
+CUSTOMER = {"gender": "Male", "tenure": 5, "MonthlyCharges": 89.50, "TotalCharges": ""}
+
+
+def fake_api(calls, failures=0):
+    """Stand-in for the API: /predict and /predict_batch answers, the first `failures` calls get a 503"""
+    def handle(request):
+        calls.append(request.url.path)
+        if len(calls) <= failures:
+            return httpx.Response(503, json={"detail": "warming up"}, headers={"Retry-After": "0"})
+        body = json.loads(request.content)
+        if any(customer["tenure"] < 0 for customer in (body if isinstance(body, list) else [body])):
+            return httpx.Response(422, json={"detail": "tenure must be >= 0"})
+        if request.url.path == "/predict":
+            return httpx.Response(200, json={"churn_prediction": "Churn", "churn_probability": 0.9,
+                                             "risk_level": "High", "model_version": "v1"})
+        if not body:
+            return httpx.Response(422, json={"detail": "empty batch"})
+        return httpx.Response(200, json={"model_version": "v1", "predictions": [
+            {"customer_id": i + 1, "churn_prediction": "No Churn", "churn_probability": c["tenure"] / 100,
+             "risk_level": "Low"} for i, c in enumerate(body)]})
+    return httpx.MockTransport(handle)
+
+
+def test_retries_then_raises_on_client_errors():
+    calls = []
+    with ChurnClient("http://api", backoff=0, transport=fake_api(calls, failures=2)) as client:
+        assert client.predict(CUSTOMER)["risk_level"] == "High"
+        assert client.retried == 2 and calls == ["/predict"] * 3
+
+        with pytest.raises(ChurnAPIError) as error:
+            client.predict_batch([])
+        assert error.value.status_code == 422 and client.retried == 2  # not retried
+
+        results = client.predict_many([dict(CUSTOMER, tenure=t) for t in range(5)])
+    assert [r["churn_probability"] for r in results] == [0.0, 0.01, 0.02, 0.03, 0.04]
+
+
+def test_concurrent_predicts_are_sent_as_batches():
+    calls = []
+
+    async def run():
+        async with AsyncChurnClient("http://api", batch_size=4, batch_window_ms=50,
+                                    transport=fake_api(calls)) as client:
+            results = await asyncio.gather(*(client.predict(dict(CUSTOMER, tenure=t)) for t in range(10)))
+            return results, client.batches_sent
+
+    results, batches = asyncio.run(run())
+    assert [r["churn_probability"] for r in results] == [t / 100 for t in range(10)]
+    assert results[0]["model_version"] == "v1"
+    assert batches == 3 and calls == ["/predict_batch"] * 3  # 4 + 4 when full, 2 after the window
+
+
+def test_retry_after_is_capped_and_a_deadline_covers_every_attempt():
+    calls = []
+
+    def overloaded(request):
+        calls.append(request.url.path)
+        return httpx.Response(503, json={"detail": "overloaded"}, headers={"Retry-After": "3600"})
+
+    transport = httpx.MockTransport(overloaded)
+    with ChurnClient("http://api", retries=2, max_retry_after=0.05, transport=transport) as client:
+        start = time.monotonic()
+        with pytest.raises(ChurnAPIError) as error:
+            client.predict(CUSTOMER)
+        assert error.value.status_code == 503 and len(calls) == 3 and time.monotonic() - start < 1
+
+    calls.clear()
+    with ChurnClient("http://api", retries=100, max_retry_after=0.1, deadline=0.35, transport=transport) as client:
+        start = time.monotonic()
+        with pytest.raises(ChurnAPIError):
+            client.predict(CUSTOMER)
+        assert time.monotonic() - start < 0.35 and 2 <= len(calls) <= 4  # gave up instead of passing the deadline
+
+
+def test_a_rejected_batch_only_fails_the_callers_with_bad_customers():
+    calls = []
+
+    async def run():
+        async with AsyncChurnClient("http://api", batch_window_ms=50, transport=fake_api(calls)) as client:
+            results = await asyncio.gather(*(client.predict(dict(CUSTOMER, tenure=t)) for t in (1, -1, 3)),
+                                           return_exceptions=True)
+            return results, client.batches_rejected
+
+    (first, bad, third), rejected = asyncio.run(run())
+    assert first["churn_probability"] == 0.9 and third["churn_probability"] == 0.9  # answered by /predict
+    assert isinstance(bad, ChurnAPIError) and bad.status_code == 422
+    assert rejected == 1 and calls == ["/predict_batch"] + ["/predict"] * 3
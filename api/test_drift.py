@@ -0,0 +1,66 @@
+import csv
+import os
+
+import pytest
+
+from api.drift import (CATEGORICAL_FEATURES, NUMERIC_FEATURES, OTHER, DriftMonitor,
+                       build_reference_profile)
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+
+
+@pytest.fixture(scope="module")
+def customers():
+    with open(DATA_PATH, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture(scope="module")
+def profile(customers):
+    return build_reference_profile({col: [c[col] for c in customers]
+                                    for col in NUMERIC_FEATURES + CATEGORICAL_FEATURES})
+
+
+def as_request(customer):
+    """CSV row -> what /predict sees after validation"""
+    return dict(customer, tenure=int(customer["tenure"]), MonthlyCharges=float(customer["MonthlyCharges"]))
+
+
+def test_categorical_features_match_the_cleaner():
+    from src.preprocessing import DataCleaner
+
+    assert list(CATEGORICAL_FEATURES) == DataCleaner().multi_cat_cols
+
+
+def test_training_traffic_is_stable_and_shifted_traffic_drifts(customers, profile):
+    monitor = DriftMonitor(profile)
+    for customer in customers[::3]:
+        monitor.update(as_request(customer))
+    report = monitor.report()
+    assert not report["drift_detected"]
+    assert all(f["psi"] < 0.1 for f in report["features"].values())
+
+    # Only brand-new, month-to-month customers, paying in a way never seen in training
+    monitor.reset()
+    shifted = [dict(as_request(c), tenure=1, TotalCharges="", Contract="Month-to-month", PaymentMethod="Crypto")
+               for c in customers[:500]]
+    monitor.update_records(shifted)
+    report = monitor.report()
+    assert report["rows"] == 500
+    assert {"tenure", "TotalCharges", "Contract", "PaymentMethod"} <= set(report["drifted_features"])
+    assert report["features"]["tenure"]["ks"] > 0.5
+    assert report["features"]["PaymentMethod"]["unseen_categories"] == 500
+    assert report["features"]["MonthlyCharges"]["status"] == "stable"
+
+
+def test_batch_and_single_updates_count_the_same(customers, profile):
+    single, batch = DriftMonitor(profile), DriftMonitor(profile)
+    rows = [as_request(c) for c in customers[:1000]]
+    for row in rows:
+        single.update(row)
+    batch.update_columns({col: [r[col] for r in rows] for col in rows[0]})
+
+    assert single._numeric == batch._numeric
+    assert single._categorical == batch._categorical
+    assert single._categorical["Contract"][OTHER] == 0
+    assert single.report()["features"] == batch.report()["features"]
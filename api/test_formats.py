@@ -0,0 +1,76 @@
+import io
+
+import msgpack
+import pyarrow as pa
+import pytest
+
+from api import formats
+from api.registry import SELF_TEST_CUSTOMER
+
+COLUMNS = {col: [value] * 3 for col, value in SELF_TEST_CUSTOMER.items()}
+PROBABILITIES = [0.1, 0.55, 0.9]
+
+
+@pytest.mark.parametrize("media_type", formats.REQUEST_FORMATS)
+def test_request_bodies_round_trip(media_type):
+    assert formats.decode(media_type, formats.encode_columns(media_type, COLUMNS)) == COLUMNS
+
+
+def test_negotiation():
+    assert formats.request_format(None) == formats.JSON
+    assert formats.request_format("application/x-msgpack; charset=binary") == formats.MSGPACK
+    with pytest.raises(formats.FormatError) as e:
+        formats.request_format("text/csv")
+    assert e.value.status_code == 415
+    with pytest.raises(formats.FormatError) as e:
+        formats.decode(formats.JSON, b"{")
+    assert e.value.status_code == 400
+
+    supported, default = formats.BATCH_RESPONSE_FORMATS, formats.JSON
+    assert formats.response_format(None, supported, default) == formats.JSON
+    assert formats.response_format("text/html, */*;q=0.1", supported, default) == formats.JSON
+    assert formats.response_format(f"{formats.JSON};q=0.5, {formats.ARROW}", supported, default) == formats.ARROW
+    assert formats.response_format("application/json", formats.STREAM_RESPONSE_FORMATS,
+                                   formats.NDJSON) == formats.NDJSON
+    with pytest.raises(formats.FormatError) as e:
+        formats.response_format(f"text/html, {formats.MSGPACK};q=0", supported, default)
+    assert e.value.status_code == 406
+
+
+def test_batch_responses_carry_the_same_predictions():
+    rows = formats._loads(formats.encode_batch(formats.JSON, "v1", PROBABILITIES))
+    assert [p["risk_level"] for p in rows["predictions"]] == ["Low", "Medium", "High"]
+    assert [p["churn_prediction"] for p in rows["predictions"]] == ["No Churn", "Churn", "Churn"]
+    assert rows["summary"] == {"total_churn_risk": 2, "high_risk_customers": 1}
+
+    columns = formats._loads(formats.encode_batch(formats.COLUMNS_JSON, "v1", PROBABILITIES))
+    assert msgpack.unpackb(formats.encode_batch(formats.MSGPACK, "v1", PROBABILITIES)) == columns
+    assert columns["churn_probability"] == PROBABILITIES
+    assert [columns["risk_level_labels"][code] for code in columns["risk_level"]] == ["Low", "Medium", "High"]
+
+    table = pa.ipc.open_stream(formats.encode_batch(formats.ARROW, "v1", PROBABILITIES)).read_all()
+    assert table.schema.metadata == {b"model_version": b"v1"}
+    assert table.column("churn_prediction").to_pylist() == ["No Churn", "Churn", "Churn"]
+
+    only = formats._loads(formats.encode_batch(formats.JSON, "v1", PROBABILITIES, probabilities_only=True))
+    assert only == {"model_version": "v1", "total_customers": 3, "churn_probability": PROBABILITIES}
+
+
+@pytest.mark.parametrize("media_type", formats.STREAM_RESPONSE_FORMATS)
+def test_streamed_chunks_form_one_stream(media_type):
+    encoder = formats.ChunkEncoder(media_type, "v1")
+    body = encoder.encode(0, PROBABILITIES[:2]) + encoder.encode(2, PROBABILITIES[2:]) + encoder.close()
+
+    if media_type == formats.NDJSON:
+        lines = [formats._loads(line) for line in body.splitlines()]
+        probabilities = [line["churn_probability"] for line in lines]
+        assert [line["customer_id"] for line in lines] == [1, 2, 3]
+    elif media_type == formats.ARROW:
+        reader = pa.ipc.open_stream(body)
+        assert len(list(reader)) == 2  # one record batch per chunk
+        probabilities = pa.ipc.open_stream(body).read_all().column("churn_probability").to_pylist()
+    else:
+        chunks = list(msgpack.Unpacker(io.BytesIO(body)))
+        assert [chunk["start"] for chunk in chunks] == [0, 2]
+        probabilities = [p for chunk in chunks for p in chunk["churn_probability"]]
+    assert probabilities == PROBABILITIES
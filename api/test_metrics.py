@@ -0,0 +1,95 @@
+import time
+from typing import List
+
+import joblib
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from api.metrics import Metrics
+from api.profiler import SamplingProfiler
+from api.registry import ModelVersion, SELF_TEST_CUSTOMER
+from api.test_registry import MODEL_PATH
+
+
+class Item(BaseModel):
+    value: int
+
+
+def make_app(metrics):
+    app = FastAPI()
+    app.router.route_class = metrics.route_class()
+
+    @app.post("/one")
+    async def one(item: Item):
+        start = time.perf_counter()
+        metrics.observe_stage("work", start)
+        return {"value": item.value}
+
+    @app.post("/many")
+    def many(items: List[Item]):
+        metrics.observe_batch_size(len(items))
+        if not items:
+            raise HTTPException(status_code=400, detail="empty")
+        return {"n": len(items)}
+
+    return app
+
+
+def test_requests_errors_stages_and_batch_sizes_are_exported():
+    metrics = Metrics()
+    client = TestClient(make_app(metrics))
+    assert client.post("/one", json={"value": 1}).status_code == 200
+    assert client.post("/one", json={"value": "x"}).status_code == 422
+    assert client.post("/many", json=[{"value": 1}] * 30).status_code == 200
+    assert client.post("/many", json=[]).status_code == 400
+
+    assert metrics.requests["/one", "POST", 200] == 1
+    assert metrics.errors == {("/one", "POST", 422): 1, ("/many", "POST", 400): 1}
+    assert {stage for endpoint, stage in metrics.stages if endpoint == "/one"} == \
+        {"validation", "work", "serialization"}
+    assert metrics.stages["/one", "validation"].count == 2  # the 422 never reached the endpoint
+    assert metrics.batch_sizes["/many"].count == 2
+
+    text = metrics.render()
+    assert 'churn_requests_total{endpoint="/many",method="POST",status="400"} 1' in text
+    assert 'churn_batch_size_bucket{endpoint="/many",le="25"} 1' in text
+    assert 'churn_batch_size_bucket{endpoint="/many",le="+Inf"} 2' in text
+    assert 'churn_request_latency_seconds_count{endpoint="/one"} 2' in text
+
+
+def test_sklearn_fallback_runs_each_step_once_with_the_same_result():
+    pipeline = joblib.load(MODEL_PATH)
+    metrics = Metrics()
+    compiled = ModelVersion.load("compiled", str(MODEL_PATH), metrics=metrics)
+    fallback = ModelVersion("sklearn", str(MODEL_PATH), pipeline, None, str(MODEL_PATH), metrics)
+
+    label, probability = fallback.predict_one(SELF_TEST_CUSTOMER)
+    assert label == pipeline.predict(_frame())[0]
+    assert abs(probability - compiled.predict_one(SELF_TEST_CUSTOMER)[1]) < 1e-12
+    assert [name for name, _ in fallback._steps] == ["cleaner", "preprocessor"]
+    assert not metrics.stages  # outside a request nothing is recorded
+
+
+def test_profiler_collects_folded_stacks():
+    def busy_loop_for_profiler(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    profiler = SamplingProfiler(interval=0.001)
+    assert not profiler.running
+    profiler.start()
+    busy_loop_for_profiler(0.2)
+    profiler.stop()
+
+    lines = profiler.folded().splitlines()
+    assert profiler.samples > 0 and not profiler.running
+    assert any("busy_loop_for_profiler" in line.rsplit(" ", 1)[0] for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+
+
+def _frame():
+    import pandas as pd
+
+    return pd.DataFrame([SELF_TEST_CUSTOMER])
@@ -0,0 +1,91 @@
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from api.registry import ModelRegistry, SELF_TEST_CUSTOMER
+from src.decision import DecisionPolicy
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+
+
+@pytest.fixture
+def registry(tmp_path):
+    shutil.copy(MODEL_PATH, tmp_path / "churn_pipeline.pkl")
+    shutil.copy(MODEL_PATH, tmp_path / "v2.pkl")
+    registry = ModelRegistry(str(tmp_path), "churn_pipeline")
+    registry.load("churn_pipeline")
+    return registry
+
+
+def test_reload_swaps_atomically(registry):
+    old = registry.get()
+    registry.reload().join()
+    new = registry.get()
+
+    assert new is not old and new.token != old.token
+    # A request still holding the old version keeps working
+    assert old.predict_one(SELF_TEST_CUSTOMER) == new.predict_one(SELF_TEST_CUSTOMER)
+    assert registry.stats()["recent_swaps"][-1]["swap_us"] >= 0
+
+
+def test_named_versions_and_split(registry):
+    registry.load("v2")
+    assert registry.route("v2").name == "v2"
+
+    registry.set_routing({"churn_pipeline": 0, "v2": 100})
+    assert {registry.route().name for _ in range(20)} == {"v2"}
+
+    with pytest.raises(KeyError):
+        registry.set_routing({"missing": 100})
+    for split in ({"churn_pipeline": 0}, {"churn_pipeline": -10, "v2": 20}, {"v2": float("nan")}):
+        with pytest.raises(ValueError):
+            registry.set_routing(split)
+    assert {registry.route().name for _ in range(20)} == {"v2"}  # the last valid split still applies
+
+
+def test_broken_model_keeps_serving_old_version(registry, tmp_path):
+    old = registry.get()
+    (tmp_path / "churn_pipeline.pkl").write_bytes(b"not a pickle")
+
+    registry.reload().join()
+
+    assert registry.get() is old
+    assert "churn_pipeline" in registry.errors
+
+
+def test_watch_picks_up_new_files(registry, tmp_path):
+    registry.check_for_changes()  # registers v2.pkl
+    assert "v2" in registry.names()
+
+
+def test_versions_decide_with_their_own_thresholds(registry, tmp_path):
+    DecisionPolicy(0.2, [0.1, 0.3]).save(tmp_path / "v2.thresholds.json")
+    v2 = registry.load("v2")
+    default = registry.get()
+    assert v2.decision.threshold == 0.2 and default.decision.threshold == 0.5
+
+    _, probability = default.predict_one(SELF_TEST_CUSTOMER)
+    assert v2.decision.decide_one(probability) == (int(probability >= 0.2), "High" if probability >= 0.3 else
+                                                   "Medium" if probability >= 0.1 else "Low")
+    assert v2.predict_one(SELF_TEST_CUSTOMER)[0] == int(probability >= 0.2)
+
+
+def test_concurrent_shadow_scoring_counts_every_customer(registry):
+    registry.load("v2")
+    registry.set_routing(shadow="v2")
+    _, probability = registry.get().predict_one(SELF_TEST_CUSTOMER)
+    columns = {col: [value] * 10 for col, value in SELF_TEST_CUSTOMER.items()}
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda _: registry.score_shadow(columns, [probability] * 10), range(200)))
+    finally:
+        sys.setswitchinterval(interval)
+    stats = registry.stats()["shadow_stats"]
+    assert stats["requests"] == 2000 and stats["label_disagreements"] == 0
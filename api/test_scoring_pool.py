@@ -0,0 +1,133 @@
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.registry import ModelVersion, SELF_TEST_CUSTOMER
+from api.scoring_pool import ScoringPool
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+@pytest.fixture(scope="module")
+def version():
+    return ModelVersion.load("churn_pipeline", str(MODEL_PATH))
+
+
+@pytest.fixture
+def pool(version):
+    pool = ScoringPool([version], frontends=2, scorers=2, slots=2, slot_rows=100, timeout=10)
+    pool.start()
+    pool.attach(1)
+    yield pool
+    for pid in pool.pids:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+
+def test_batches_are_split_over_slots_and_scored_in_other_processes(pool, version):
+    customers = pd.read_csv(DATA_PATH).drop(columns=["customerID", "Churn"])
+    batch = version.validator.validate(customers.head(1000).to_dict("list"))
+    expected = version.score_batch(batch)
+
+    assert pool.accepts(version, batch)
+    np.testing.assert_allclose(pool.score(version, batch), expected, rtol=0, atol=1e-12)
+
+    # More chunks in flight than this front-end has slots, from several threads at once
+    parts = [batch.take(slice(start, start + 250)) for start in range(0, 1000, 250)]
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda part: pool.score(version, part), parts))
+    np.testing.assert_allclose(np.concatenate(results), expected, rtol=0, atol=1e-12)
+
+    stats = pool.stats()
+    assert stats["chunks"] + stats["chunks_scored_in_process"] == 10 + 12  # no free slot: scored in the thread
+    assert stats["free_slots"] == 2 and stats["lost_slots"] == 0 and stats["timeouts"] == 0
+
+
+def test_stuck_and_dead_scoring_processes_fall_back_and_are_replaced(version):
+    customers = pd.read_csv(DATA_PATH).drop(columns=["customerID", "Churn"])
+    batch = version.validator.validate(customers.head(300).to_dict("list"))
+    expected = version.score_batch(batch)
+    pool = ScoringPool([version], frontends=1, scorers=1, slots=2, slot_rows=100, timeout=0.2)
+    pool.start()
+    pool.attach(0)
+    try:
+        # Stuck: its chunks time out and are scored here; the slots come back once it is done
+        os.kill(pool.pids[0], signal.SIGSTOP)
+        os.waitpid(pool.pids[0], os.WUNTRACED)
+        np.testing.assert_allclose(pool.score(version, batch), expected, rtol=0, atol=1e-12)
+        assert pool.stats()["timeouts"] == 2 and pool.stats()["lost_slots"] == 2
+        assert not pool.accepts(version, batch)  # no free slot: scored in the front-end instead of waiting
+        os.kill(pool.pids[0], signal.SIGCONT)
+        deadline = time.monotonic() + 10
+        while pool.stats()["lost_slots"] and time.monotonic() < deadline:
+            pool.accepts(version, batch)
+            time.sleep(0.01)
+        assert pool.stats()["lost_slots"] == 0 and pool.stats()["free_slots"] == 2
+
+        # Dead with work queued: the replacement takes it over
+        pool.timeout = 10
+        dead = pool.pids[0]
+        os.kill(dead, signal.SIGSTOP)
+        os.waitpid(dead, os.WUNTRACED)
+        with ThreadPoolExecutor(1) as executor:
+            result = executor.submit(pool.score, version, batch.take(slice(0, 100)))
+            time.sleep(0.1)
+            os.kill(dead, signal.SIGKILL)
+            os.waitpid(dead, 0)
+            assert pool.replace(dead) != dead
+            np.testing.assert_allclose(result.result(), expected[:100], rtol=0, atol=1e-12)
+        assert pool.stats()["scoring_process_restarts"] == 1 and pool.stats()["timeouts"] == 2
+    finally:
+        for pid in pool.pids:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+
+def test_unknown_versions_are_scored_in_process(pool, version):
+    reloaded = ModelVersion.load("churn_pipeline", str(MODEL_PATH))  # new token, loaded after the fork
+    batch = reloaded.validator.validate([SELF_TEST_CUSTOMER])
+    assert not pool.accepts(reloaded, batch)
+    assert not pool.accepts(version, batch)  # validated against another version's categories
+    assert pool.stats()["scored_in_process"] == 2
+
+
+def test_predict_scores_on_the_pool_and_columns_it_cannot_hold_fall_back(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.app as app_module
+
+    version = app_module.registry.get()
+    pool = ScoringPool([version], frontends=1, scorers=1, slots=2, slot_rows=100, timeout=10)
+    pool.start()
+    pool.attach(0)
+    monkeypatch.setattr(app_module, "scoring_pool", pool)
+    monkeypatch.setattr(app_module, "cache", None)
+    client = TestClient(app_module.app)
+    try:
+        response = client.post("/predict", json=SELF_TEST_CUSTOMER)
+        assert response.status_code == 200
+        assert abs(response.json()["churn_probability"] - version.predict_one(SELF_TEST_CUSTOMER)[1]) < 1e-12
+        assert pool.stats()["chunks"] == 1
+
+        # Accepted by the Customer model, not by the typed arrays: scored in the front-end
+        for change in ({"Contract": "Weekly"}, {"tenure": -1}):
+            response = client.post("/predict", json={**SELF_TEST_CUSTOMER, **change})
+            assert response.status_code == 200, response.text
+        assert pool.stats()["chunks"] == 1 and pool.stats()["scored_in_process"] == 2
+
+        # With CHURN_PREDICT_STRICT=1 they are rejected like in a batch, before anything is scored
+        monkeypatch.setattr(app_module, "PREDICT_STRICT", True)
+        response = client.post("/predict", json={**SELF_TEST_CUSTOMER, "tenure": -1})
+        assert response.status_code == 422 and pool.stats()["scored_in_process"] == 2
+    finally:
+        for pid in pool.pids:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
@@ -0,0 +1,175 @@
+"""
+Model artifacts: load time and memory of an exported .model directory vs joblib.load of the pickle.
+
+For the served logistic pipeline and for tree pipelines fitted here (a
+RandomForest and a HistGradientBoosting model), each saved with joblib and
+exported with src.artifact:
+
+1. fresh interpreter per run: time to import what loading needs, time to load,
+   time to the first 1,000-customer prediction, and RSS afterwards
+2. N processes holding the same model at once: RSS and PSS per process. PSS
+   splits shared pages between the processes mapping them, so memory-mapped
+   arrays count once across all of them while unpickled ones count N times.
+
+    python benchmarks/bench_artifact.py --runs 3 --processes 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from benchmarks.bench_suite import load_customers  # noqa: E402
+
+MODEL_PATH = "models/churn_pipeline.pkl"
+DATA_PATH = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+PROBE = r"""
+import json, sys, time
+mode, path, customers_path, hold = sys.argv[1:5]
+start = time.perf_counter()
+if mode == "joblib":
+    import joblib
+    import pandas as pd
+    imported = time.perf_counter()
+    model = joblib.load(path)
+    loaded = time.perf_counter()
+    score = lambda rows: model.predict_proba(pd.DataFrame(rows))[:, 1]
+else:
+    from src.artifact import load_artifact
+    imported = time.perf_counter()
+    model = load_artifact(path)
+    loaded = time.perf_counter()
+    score = lambda rows: model.predict_proba({col: [row[col] for row in rows] for col in rows[0]})
+with open(customers_path) as f:
+    rows = json.load(f)
+score(rows)
+scored = time.perf_counter()
+
+rss_kb = 0
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "load_ms": (loaded - imported) * 1000,
+    "first_prediction_ms": (scored - start) * 1000,
+    "rss_mb": rss_kb / 1024,
+    "sklearn_imported": "sklearn" in sys.modules,
+}), flush=True)
+if hold == "1":
+    sys.stdin.readline()
+"""
+
+
+def build_models(workdir):
+    """{name: (pickle path, exported directory)}"""
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+
+    from src.artifact import export_pipeline
+    from src.preprocessing import create_preprocessing_pipeline
+
+    data = pd.read_csv(DATA_PATH)
+    customers, churn = data.drop(columns=["Churn"]), (data["Churn"] == "Yes").astype(int)
+    models = {"logistic (churn_pipeline.pkl)": MODEL_PATH}
+    for name, classifier in (("random forest, 300 trees", RandomForestClassifier(n_estimators=300, random_state=0)),
+                             ("hist gradient boosting", HistGradientBoostingClassifier(random_state=0))):
+        pipeline = Pipeline([("preprocessing", create_preprocessing_pipeline()), ("classifier", classifier)])
+        pipeline.fit(customers, churn)
+        path = os.path.join(workdir, name.split(",")[0].replace(" ", "_") + ".pkl")
+        joblib.dump(pipeline, path)
+        models[name] = path
+
+    built = {}
+    for name, path in models.items():
+        exported = os.path.join(workdir, os.path.basename(path).replace(".pkl", ".model"))
+        export_pipeline(joblib.load(path), exported, source_path=path)
+        built[name] = (path, exported)
+    return built
+
+
+def disk_mb(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+    return os.path.getsize(path) / 1e6
+
+
+def run_probe(mode, path, customers_path):
+    out = subprocess.run([sys.executable, "-c", PROBE, mode, path, customers_path, "0"],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def memory_mb(pid):
+    """(RSS, PSS) in MB from /proc"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1]) / 1024
+    return values["Rss:"], values["Pss:"]
+
+
+def bench_shared(mode, path, customers_path, processes):
+    """Start `processes` holders of the same model, return (mean RSS, mean PSS) once all are loaded"""
+    procs = [subprocess.Popen([sys.executable, "-c", PROBE, mode, path, customers_path, "1"], cwd=ROOT,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+             for _ in range(processes)]
+    try:
+        for proc in procs:
+            proc.stdout.readline()  # loaded and scored
+        memory = [memory_mb(proc.pid) for proc in procs]
+    finally:
+        for proc in procs:
+            proc.communicate("\n")
+    return np.mean([rss for rss, _ in memory]), np.mean([pss for _, pss in memory])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per mode (best is shown)")
+    parser.add_argument("--processes", type=int, default=4, help="processes holding the model at once")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="artifacts_") as workdir:
+        start = time.perf_counter()
+        models = build_models(workdir)
+        print(f"Fitted and exported the models in {time.perf_counter() - start:.1f}s")
+        customers_path = os.path.join(workdir, "customers.json")
+        with open(customers_path, "w") as f:
+            json.dump(load_customers()[:1000], f)
+
+        print(f"\n{'model / format':<46}{'disk MB':>8}{'import ms':>10}{'load ms':>9}{'1st pred ms':>12}"
+              f"{'RSS MB':>8}{'sklearn':>8}")
+        for name, (pickle_path, exported) in models.items():
+            for mode, path in (("joblib", pickle_path), ("artifact", exported)):
+                runs = [run_probe(mode, path, customers_path) for _ in range(args.runs)]
+                best = min(runs, key=lambda r: r["first_prediction_ms"])
+                label = f"{name}, {'joblib.load' if mode == 'joblib' else 'mmap artifact'}"
+                print(f"{label:<46}{disk_mb(path):>8.2f}{best['import_ms']:>10.0f}{best['load_ms']:>9.1f}"
+                      f"{best['first_prediction_ms']:>12.0f}{best['rss_mb']:>8.0f}{str(best['sklearn_imported']):>8}")
+
+        print(f"\n{args.processes} processes holding the model")
+        print(f"{'model / format':<46}{'RSS MB':>8}{'PSS MB':>8}")
+        for name, (pickle_path, exported) in models.items():
+            for mode, path in (("joblib", pickle_path), ("artifact", exported)):
+                rss, pss = bench_shared(mode, path, customers_path, args.processes)
+                label = f"{name}, {'joblib.load' if mode == 'joblib' else 'mmap artifact'}"
+                print(f"{label:<46}{rss:>8.0f}{pss:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Audit log overhead: /predict latency with the audit trail off, on, and on a slow disk.
+
+Drives the app in-process (httpx ASGI transport, no network) at a fixed
+request rate (open loop, so queueing in the client doesn't hide the overhead). "slow disk" adds a fixed delay to every batch the writer flushes, so
+the queue fills up and the drop policy kicks in; request latency should not move.
+The budget is the allowed p99 increase over "off".
+
+    python benchmarks/bench_audit.py --rate 500 --requests 10000 --repeats 3 --budget-ms 1
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+import api.app as app_module  # noqa: E402
+from api.audit import AuditLogger  # noqa: E402
+
+CUSTOMER = {
+    "gender": "Male", "SeniorCitizen": 0, "Partner": "Yes", "Dependents": "No",
+    "tenure": 5, "PhoneService": "Yes", "MultipleLines": "No",
+    "InternetService": "Fiber optic", "OnlineSecurity": "No", "OnlineBackup": "No",
+    "DeviceProtection": "No", "TechSupport": "No", "StreamingTV": "Yes",
+    "StreamingMovies": "Yes", "Contract": "Month-to-month", "PaperlessBilling": "Yes",
+    "PaymentMethod": "Electronic check", "MonthlyCharges": 89.50, "TotalCharges": ""
+}
+
+
+async def run_load(rate, total):
+    """Open loop: start a request every 1/rate seconds, whatever the earlier ones are doing"""
+    latencies = []
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i):
+            customer = dict(CUSTOMER, tenure=i % 72)
+            start = time.perf_counter()
+            response = await client.post("/predict", json=customer)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks = []
+        for i in range(total):
+            delay = start + i / rate - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - start
+
+    latencies = np.array(latencies) * 1000
+    return total / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def slow_disk(audit, delay):
+    write = audit._write
+
+    def slow_write(entries):
+        time.sleep(delay)
+        write(entries)
+    audit._write = slow_write
+    return audit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=500, help="requests per second")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=3, help="runs per mode (interleaved, median reported)")
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="allowed p99 increase")
+    parser.add_argument("--slow-disk-ms", type=float, default=250.0, help="delay per flushed batch")
+    parser.add_argument("--max-queue", type=int, default=1000)
+    args = parser.parse_args()
+
+    app_module.cache = None  # score every request
+    directory = tempfile.mkdtemp(prefix="churn_audit_")
+    modes = {
+        "off": lambda run: None,
+        "on": lambda run: AuditLogger(os.path.join(directory, f"on{run}"), max_queue=args.max_queue),
+        "slow disk": lambda run: slow_disk(AuditLogger(os.path.join(directory, f"slow{run}"),
+                                                       max_queue=args.max_queue), args.slow_disk_ms / 1000),
+    }
+
+    asyncio.run(run_load(args.rate, 500))  # warm-up
+    results = {mode: [] for mode in modes}
+    for run in range(args.repeats):
+        for mode, make_audit in modes.items():
+            audit = app_module.audit = make_audit(run)
+            throughput, p50, p99 = asyncio.run(run_load(args.rate, args.requests))
+            if audit is not None:
+                audit.close()
+            results[mode].append((throughput, p50, p99,
+                                  audit.written if audit is not None else 0,
+                                  audit.dropped if audit is not None else 0))
+
+    print(f"audit files in {directory}, {args.repeats} runs per mode")
+    print(f"{'mode':<11}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'p99 +ms':>9}{'written':>10}{'dropped':>9}  budget")
+    base_p99 = np.median([r[2] for r in results["off"]])
+    for mode, runs in results.items():
+        throughput, p50, p99, written, dropped = np.median(np.array(runs), axis=0)
+        verdict = "ok" if p99 - base_p99 <= args.budget_ms else "OVER"
+        print(f"{mode:<11}{throughput:>9.0f}{p50:>9.2f}{p99:>9.2f}{p99 - base_p99:>9.2f}"
+              f"{written:>10.0f}{dropped:>9.0f}  {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Bulk scoring throughput: rows/sec and peak memory vs. worker count and input size.
+
+Synthetic inputs are built by resampling rows of the Telco CSV (written in
+chunks, so even 100M-row files never sit in memory), then scored with
+`python -m src.bulk_score` in a fresh process per run. Peak RSS covers the
+scoring process and its pool workers.
+
+    python benchmarks/bench_bulk_scoring.py --rows 100000 1000000 --workers 1 2 4
+    python benchmarks/bench_bulk_scoring.py --rows 100000000 --format parquet --workers 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_PATH = os.path.join(ROOT, "data", "raw", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+WRITE_CHUNK = 1_000_000
+
+
+def make_input(rows, fmt, directory):
+    """Synthetic extract of `rows` customers (cached between runs)"""
+    path = os.path.join(directory, f"customers_{rows}.{fmt}")
+    if os.path.exists(path):
+        return path
+
+    base = pd.read_csv(DATA_PATH, dtype={'TotalCharges': str}, keep_default_na=False).drop(columns="Churn")
+    rng = np.random.default_rng(42)
+    writer = None
+    for start in range(0, rows, WRITE_CHUNK):
+        n = min(WRITE_CHUNK, rows - start)
+        chunk = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+        chunk["customerID"] = [f"SYN-{i:09d}" for i in range(start, start + n)]
+        if fmt == "csv":
+            chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    if writer is not None:
+        writer.close()
+    return path
+
+
+def run(input_path, output_path, workers, chunk_size):
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "src.bulk_score", input_path, output_path,
+                             "--workers", str(workers), "--chunk-size", str(chunk_size)],
+                            cwd=ROOT, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    if status != 0:
+        raise RuntimeError(f"bulk_score failed with status {status}")
+    return elapsed, usage.ru_maxrss / 1024  # ru_maxrss is in KB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--dir", default=None, help="where to keep synthetic inputs (default: temp dir)")
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="churn_bench_")
+    os.makedirs(directory, exist_ok=True)
+    print(f"cores available: {os.cpu_count()}, inputs in {directory}")
+    print(f"{'rows':>12}{'workers':>9}{'seconds':>10}{'rows/sec':>12}{'peak RSS MB':>13}")
+    for rows in args.rows:
+        input_path = make_input(rows, args.format, directory)
+        output_path = os.path.join(directory, f"scored_{rows}.{args.format}")
+        for workers in args.workers:
+            elapsed, peak_mb = run(input_path, output_path, workers, args.chunk_size)
+            print(f"{rows:>12,}{workers:>9}{elapsed:>10.1f}{rows / elapsed:>12,.0f}{peak_mb:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+DataCleaner.transform: time and peak memory, old vs new vs in-place.
+
+- legacy:       the original transform (copy, drop, to_numeric, astype(str))
+- copy=True:    current default (one copy, dtype-aware, categorical SeniorCitizen)
+- copy=False:   in-place mode (no full copy of the input)
+- +preprocess:  the whole create_preprocessing_pipeline transform, legacy vs new
+
+Peak memory is measured with tracemalloc (NumPy and pandas allocations are
+traced) in a second, untimed run, above what the input frame already holds.
+
+    python benchmarks/bench_cleaner.py --rows 7043 1000000 10000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.preprocessing import DataCleaner, create_preprocessing_pipeline  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+
+
+def legacy_transform(X):
+    """DataCleaner.transform before the in-place / dtype-aware rewrite"""
+    X = X.copy()
+    if 'customerID' in X.columns:
+        X = X.drop('customerID', axis=1)
+    X['TotalCharges'] = pd.to_numeric(X['TotalCharges'], errors='coerce')
+    X['TotalCharges'] = X['TotalCharges'].fillna(0)
+    X['SeniorCitizen'] = X['SeniorCitizen'].astype(str)
+    return X
+
+
+def make_frame(rows):
+    base = pd.read_csv(DATA_PATH).drop(columns="Churn")
+    idx = np.random.default_rng(0).integers(0, len(base), rows)
+    return base.iloc[idx].reset_index(drop=True)
+
+
+def measure(fn, make_input):
+    # Timed without tracemalloc (it slows allocations down), then traced for peak memory
+    X = make_input()
+    start = time.perf_counter()
+    fn(X)
+    elapsed = time.perf_counter() - start
+
+    X = make_input()
+    tracemalloc.start()
+    fn(X)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[7043, 1_000_000])
+    args = parser.parse_args()
+
+    pipeline = create_preprocessing_pipeline().fit(make_frame(7043))
+    preprocessor = pipeline.named_steps['preprocessor']
+
+    print(f"{'rows':>12}  {'mode':<22}{'ms':>10}{'peak MB':>10}")
+    for rows in args.rows:
+        frame = make_frame(rows)
+        modes = {
+            "legacy": (legacy_transform, frame.copy),
+            "copy=True": (DataCleaner().transform, frame.copy),
+            # fresh copy per run because the input is modified
+            "copy=False": (DataCleaner(copy=False).transform, frame.copy),
+            "legacy +preprocess": (lambda X: preprocessor.transform(legacy_transform(X)), frame.copy),
+            "copy=False +preprocess": (lambda X: preprocessor.transform(DataCleaner(copy=False).transform(X)),
+                                       frame.copy),
+        }
+        for mode, (fn, make_input) in modes.items():
+            ms, peak = measure(fn, make_input)
+            print(f"{rows:>12,}  {mode:<22}{ms:>10.1f}{peak:>10.1f}")
+        del frame
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Client overhead: requests.post per call vs the pooled ChurnClient / AsyncChurnClient.
+
+Starts a local stand-in server in a subprocess (uvicorn over real TCP; canned
+answers by default, so only the client side and the HTTP round trip are
+measured, or the real API with --real) and times the same customers through:
+
+- requests.post        a new connection per call (what the Streamlit app did)
+- ChurnClient.predict  one keep-alive connection, reused
+- async predict        AsyncChurnClient, --concurrency calls in flight
+- async batched        same, concurrent calls merged into /predict_batch (batch_window_ms)
+- predict_many         ChurnClient, /predict_batch calls of --batch-size
+
+Local HTTP has no TLS handshake, so the saving against a remote HTTPS API is larger.
+
+    python benchmarks/bench_client.py --calls 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api.client import AsyncChurnClient, ChurnClient  # noqa: E402
+
+CUSTOMER = {
+    "gender": "Male", "SeniorCitizen": 0, "Partner": "Yes", "Dependents": "No",
+    "tenure": 5, "PhoneService": "Yes", "MultipleLines": "No",
+    "InternetService": "Fiber optic", "OnlineSecurity": "No", "OnlineBackup": "No",
+    "DeviceProtection": "No", "TechSupport": "No", "StreamingTV": "Yes",
+    "StreamingMovies": "Yes", "Contract": "Month-to-month", "PaperlessBilling": "Yes",
+    "PaymentMethod": "Electronic check", "MonthlyCharges": 89.50, "TotalCharges": ""
+}
+
+
+# ========== STAND-IN SERVER ==========
+def stand_in_app():
+    from typing import List
+
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    answer = {"churn_prediction": "Churn", "churn_probability": 0.89, "risk_level": "High",
+              "model_version": "stand-in"}
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    @app.post("/predict")
+    def predict(customer: dict):
+        return answer
+
+    @app.post("/predict_batch")
+    def predict_batch(customers: List[dict]):
+        return {"model_version": "stand-in", "total_customers": len(customers), "predictions": [
+            {"customer_id": i + 1, "churn_prediction": "Churn", "churn_probability": 0.89, "risk_level": "High"}
+            for i in range(len(customers))]}
+
+    return app
+
+
+def serve(port, real):
+    import uvicorn
+
+    if real:
+        os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+        from api.app import app
+    else:
+        app = stand_in_app()
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(real):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    args = [sys.executable, __file__, "--serve", str(port)] + (["--real"] if real else [])
+    process = subprocess.Popen(args)
+    url = f"http://127.0.0.1:{port}"
+    with ChurnClient(url, retries=50, backoff=0.1) as client:
+        client.health()  # retried until the server is up
+    return process, url
+
+
+# ========== CLIENT MODES ==========
+def plain_requests(url, calls):
+    import requests
+
+    for _ in range(calls):
+        response = requests.post(f"{url}/predict", json=CUSTOMER, timeout=10)
+        response.raise_for_status()
+
+
+def pooled(url, calls):
+    with ChurnClient(url) as client:
+        for _ in range(calls):
+            client.predict(CUSTOMER)
+
+
+def async_calls(url, calls, concurrency, batch_window_ms=0.0):
+    async def run():
+        async with AsyncChurnClient(url, max_connections=concurrency, batch_window_ms=batch_window_ms) as client:
+            remaining = iter(range(calls))
+
+            async def worker():
+                for _ in remaining:
+                    await client.predict(CUSTOMER)
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            return client.batches_sent
+    return asyncio.run(run())
+
+
+def many(url, calls, batch_size):
+    with ChurnClient(url, batch_size=batch_size) as client:
+        assert len(client.predict_many([CUSTOMER] * calls)) == calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000, help="customers scored per mode")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-window-ms", type=float, default=2.0)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--real", action="store_true", help="serve the real API instead of canned answers")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.real)
+        return
+
+    process, url = start_server(args.real)
+    try:
+        modes = {
+            "requests.post": lambda: plain_requests(url, args.calls),
+            "ChurnClient.predict": lambda: pooled(url, args.calls),
+            f"async predict c={args.concurrency}": lambda: async_calls(url, args.calls, args.concurrency),
+            f"async batched c={args.concurrency}": lambda: async_calls(url, args.calls, args.concurrency,
+                                                                      args.batch_window_ms),
+            f"predict_many ({args.batch_size})": lambda: many(url, args.calls, args.batch_size),
+        }
+        print(f"{args.calls} customers per mode against {'the real API' if args.real else 'a stand-in'} at {url}")
+        print(f"{'mode':<28}{'total s':>9}{'ms/customer':>13}{'customers/s':>13}{'speedup':>9}")
+        base = None
+        for mode, run in modes.items():
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print(f"{mode:<28}{elapsed:>9.2f}{elapsed / args.calls * 1000:>13.3f}"
+                  f"{args.calls / elapsed:>13,.0f}{base / elapsed:>8.1f}x")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
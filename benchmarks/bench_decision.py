@@ -0,0 +1,121 @@
+"""
+Decision layer: per-request cost of turning a churn probability into a label and risk band.
+
+Before, a prediction ran the model twice (predict_proba for the probability,
+predict for the label at a fixed 0.5) and picked the risk band with an
+if-chain. Now the model is scored once and src.decision derives the label and
+the band together from the version's thresholds. Times, per customer:
+
+- sklearn pipeline      pipeline.predict_proba + pipeline.predict + if-chain
+                        vs pipeline.predict_proba + DecisionPolicy.decide_one
+- served sklearn path   ModelVersion without a compiled scorer: transform once, then
+                        classifier.predict_proba + classifier.predict vs predict_one
+- compiled scorer       the if-chain vs decide_one after the same probability
+- batches               per-row if-chain / (p > 0.5) + risk_codes vs DecisionPolicy.decide
+
+    python benchmarks/bench_decision.py --repeats 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_suite import load_customers  # noqa: E402
+
+MODEL_PATH = "models/churn_pipeline.pkl"
+
+
+def best_us(fn, repeats):
+    """Best of 5 rounds of `repeats` calls, microseconds per call"""
+    rounds = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn()
+        rounds.append((time.perf_counter() - start) / repeats)
+    return min(rounds) * 1e6
+
+
+def if_chain(probability):
+    """The risk band as /predict used to pick it"""
+    if probability >= 0.7:
+        return "High"
+    elif probability >= 0.4:
+        return "Medium"
+    return "Low"
+
+
+def row(label, before, after):
+    print(f"{label:<44}{before:>12.1f}{after:>12.1f}{before - after:>12.1f}{before / after:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=2000, help="calls per round for the fast paths")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    from api.registry import ModelVersion
+    from src.decision import DecisionPolicy
+    from src.scoring import risk_codes
+
+    policy = DecisionPolicy()
+    pipeline = joblib.load(MODEL_PATH)
+    customer = load_customers()[0]
+    frame = pd.DataFrame([customer])
+    slow = max(args.repeats // 20, 20)  # sklearn calls take milliseconds
+
+    print(f"{'per customer (us)':<44}{'before':>12}{'after':>12}{'saved':>12}{'speedup':>10}")
+
+    def pipeline_before():
+        probability = pipeline.predict_proba(frame)[0, 1]
+        label = pipeline.predict(frame)[0]
+        return label, probability, if_chain(probability)
+
+    def pipeline_after():
+        probability = pipeline.predict_proba(frame)[0, 1]
+        return (*policy.decide_one(probability), probability)
+
+    row("sklearn pipeline", best_us(pipeline_before, slow), best_us(pipeline_after, slow))
+
+    fallback = ModelVersion("sklearn", MODEL_PATH, pipeline, None, MODEL_PATH)
+
+    def fallback_before():
+        features = fallback._transform(pd.DataFrame([customer]))
+        probability = fallback._classifier.predict_proba(features)[0, 1]
+        label = fallback._classifier.predict(features)[0]
+        return label, probability, if_chain(probability)
+
+    def fallback_after():
+        label, probability = fallback.predict_one(customer)
+        return label, probability, policy.decide_one(probability)[1]
+
+    row("served sklearn path (ModelVersion)", best_us(fallback_before, slow), best_us(fallback_after, slow))
+
+    compiled = ModelVersion.load("compiled", MODEL_PATH)
+    _, probability = compiled.predict_one(customer)
+    row("compiled scorer: label + band only", best_us(lambda: (int(probability > 0.5), if_chain(probability)),
+                                                       args.repeats * 10),
+        best_us(lambda: policy.decide_one(probability), args.repeats * 10))
+
+    probabilities = np.random.default_rng(0).random(args.batch_size)
+    print(f"\n{f'{args.batch_size:,} customers (us per batch)':<44}{'before':>12}{'after':>12}{'saved':>12}"
+          f"{'speedup':>10}")
+    batch_repeats = max(args.repeats // 100, 10)
+    row("per-row if-chain + p > 0.5", best_us(lambda: [(int(p > 0.5), if_chain(p)) for p in probabilities.tolist()],
+                                              batch_repeats),
+        best_us(lambda: policy.decide(probabilities), batch_repeats))
+    row("(p > 0.5) + risk_codes", best_us(lambda: ((probabilities > 0.5).astype(np.int8), risk_codes(probabilities)),
+                                          batch_repeats),
+        best_us(lambda: policy.decide(probabilities), batch_repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Drift monitor cost: per-row update time, and /predict + /predict_batch latency with it off vs on.
+
+Part 1 times DriftMonitor.update() (one customer dict, as /predict does) and
+update_records() (as /predict_batch does) on their own, per row. Part 2 drives
+the app in-process (httpx ASGI transport, no network) with the monitor off and
+on, interleaved over several runs, and reports the median latency of each.
+
+    python benchmarks/bench_drift.py --requests 5000 --batch-size 100 --repeats 3
+"""
+import argparse
+import asyncio
+import csv
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+import api.app as app_module  # noqa: E402
+from api.drift import DriftMonitor  # noqa: E402
+
+DATA_PATH = os.path.join("data", "raw", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+REFERENCE_PATH = os.path.join("models", "drift_reference.json")
+
+
+def load_customers():
+    """Telco CSV rows as /predict request bodies"""
+    with open(DATA_PATH, newline="") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        del row["customerID"], row["Churn"]
+        row["SeniorCitizen"] = int(row["SeniorCitizen"])
+        row["tenure"] = int(row["tenure"])
+        row["MonthlyCharges"] = float(row["MonthlyCharges"])
+    return rows
+
+
+def time_updates(customers, batch_size, repeats=5):
+    """Best-of-repeats microseconds per row for update() and update_records()"""
+    monitor = DriftMonitor.load(REFERENCE_PATH)
+    single, batch = [], []
+    batches = [customers[i:i + batch_size] for i in range(0, len(customers), batch_size)]
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for customer in customers:
+            monitor.update(customer)
+        single.append((time.perf_counter() - start) / len(customers))
+
+        start = time.perf_counter()
+        for rows in batches:
+            monitor.update_records(rows)
+        batch.append((time.perf_counter() - start) / len(customers))
+    return min(single) * 1e6, min(batch) * 1e6
+
+
+async def run_load(customers, total, batch_size):
+    """Sequential requests: latency is the cost of one request, without queueing"""
+    single, batch = [], []
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(total):
+            start = time.perf_counter()
+            response = await client.post("/predict", json=customers[i % len(customers)])
+            single.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+        for i in range(0, total, batch_size):
+            body = [customers[j % len(customers)] for j in range(i, i + batch_size)]
+            start = time.perf_counter()
+            response = await client.post("/predict_batch", json=body)
+            batch.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+    single, batch = np.array(single) * 1000, np.array(batch) * 1000
+    return np.percentile(single, 50), np.percentile(single, 99), np.percentile(batch, 50), np.percentile(batch, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000, help="customers per run (each endpoint)")
+    parser.add_argument("--batch-size", type=int, default=100, help="customers per /predict_batch call")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per mode (interleaved, median reported)")
+    args = parser.parse_args()
+
+    customers = load_customers()
+    single_us, batch_us = time_updates(customers, args.batch_size)
+    print(f"update():          {single_us:6.2f} us/row")
+    print(f"update_records():  {batch_us:6.2f} us/row (batches of {args.batch_size})")
+
+    app_module.cache = None  # score every request
+    app_module.audit = None
+    modes = {"off": lambda: None, "on": lambda: DriftMonitor.load(REFERENCE_PATH)}
+    asyncio.run(run_load(customers, 500, args.batch_size))  # warm-up
+    results = {mode: [] for mode in modes}
+    for _ in range(args.repeats):
+        for mode, make_monitor in modes.items():
+            app_module.drift = make_monitor()
+            results[mode].append(asyncio.run(run_load(customers, args.requests, args.batch_size)))
+
+    print(f"\n{'mode':<6}{'predict p50':>13}{'p99':>8}{'batch p50':>11}{'p99':>8}  (ms, {args.repeats} runs)")
+    for mode, runs in results.items():
+        p50, p99, batch_p50, batch_p99 = np.median(np.array(runs), axis=0)
+        print(f"{mode:<6}{p50:>13.3f}{p99:>8.3f}{batch_p50:>11.3f}{batch_p99:>8.3f}")
+    off, on = (np.median(np.array(results[mode]), axis=0) for mode in ("off", "on"))
+    print(f"\nadded per /predict: {(on[0] - off[0]) * 1000:.0f} us (p50); "
+          f"per /predict_batch of {args.batch_size}: {(on[2] - off[2]) * 1000:.0f} us (p50)")
+
+
+if __name__ == "__main__":
+    main()
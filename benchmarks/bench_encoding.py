@@ -0,0 +1,82 @@
+"""
+Preprocessing encodings: feature-matrix footprint, training and inference time.
+
+- dense:  the default float64 one-hot matrix + LogisticRegression
+- sparse: the same columns as a CSR matrix + LogisticRegression
+- codes:  float32 numerics + int8 category codes + CategoryCodeLogisticRegression
+
+Inputs are the Telco CSV resampled to --rows customers.
+
+    python benchmarks/bench_encoding.py --rows 7043 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.linear_models import CategoryCodeLogisticRegression  # noqa: E402
+from src.preprocessing import create_preprocessing_pipeline  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+
+MODELS = {
+    "dense": LogisticRegression,
+    "sparse": LogisticRegression,
+    "codes": CategoryCodeLogisticRegression,
+}
+
+
+def make_data(rows):
+    base = pd.read_csv(DATA_PATH)
+    idx = np.random.default_rng(0).integers(0, len(base), rows)
+    frame = base.iloc[idx].reset_index(drop=True)
+    y = (frame.pop("Churn") == "Yes").astype(int)
+    return frame, y
+
+
+def footprint_mb(X):
+    if sparse.issparse(X):
+        nbytes = X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    elif isinstance(X, pd.DataFrame):
+        nbytes = X.memory_usage(index=False).sum()
+    else:
+        nbytes = X.nbytes
+    return nbytes / 1024 ** 2
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[7043, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}  {'encoding':<8}{'matrix MB':>11}{'encode ms':>11}{'fit ms':>10}"
+          f"{'predict ms':>12}{'AUC':>8}")
+    for rows in args.rows:
+        frame, y = make_data(rows)
+        for encoding, model_cls in MODELS.items():
+            pipeline = create_preprocessing_pipeline(encoding).fit(frame)
+            X, encode_ms = timed(pipeline.transform, frame)
+            model = model_cls(class_weight="balanced", max_iter=1000, random_state=42)
+            _, fit_ms = timed(model.fit, X, y)
+            probabilities, predict_ms = timed(model.predict_proba, X)
+            auc = roc_auc_score(y, probabilities[:, 1])
+            print(f"{rows:>10,}  {encoding:<8}{footprint_mb(X):>11.1f}{encode_ms:>11.0f}{fit_ms:>10.0f}"
+                  f"{predict_ms:>12.1f}{auc:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
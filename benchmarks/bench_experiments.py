@@ -0,0 +1,103 @@
+"""
+Experiment runner: serial compare_models vs compare_models_parallel.
+
+Both log every run (params, metrics, model) to a fresh SQLite tracking store
+in a temp directory. The serial baseline preprocesses once, as the notebook
+does, then calls compare_models. The parallel runner is timed twice: once
+with a cold feature cache and once with a warm one.
+
+    python benchmarks/bench_experiments.py --upsample 1 100 --jobs 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "notebooks"))
+
+import mlflow_tracking  # noqa: E402
+from src.preprocessing import create_preprocessing_pipeline  # noqa: E402
+
+DATA_PATH = os.path.join(ROOT, "data", "raw", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+
+
+def make_models():
+    return {
+        "Logistic_Regression": LogisticRegression(class_weight='balanced', max_iter=1000, random_state=42),
+        "Random_Forest": RandomForestClassifier(class_weight='balanced', n_estimators=100, max_depth=10,
+                                                random_state=42, n_jobs=-1),
+        "Extra_Trees": ExtraTreesClassifier(class_weight='balanced', n_estimators=100, max_depth=10,
+                                            random_state=42, n_jobs=-1),
+        "Hist_Gradient_Boosting": HistGradientBoostingClassifier(class_weight='balanced', random_state=42),
+    }
+
+
+def make_split(upsample):
+    data = pd.read_csv(DATA_PATH)
+    if upsample > 1:
+        idx = np.random.default_rng(0).integers(0, len(data), len(data) * upsample)
+        data = data.iloc[idx].reset_index(drop=True)
+    Y = (data.pop('Churn') == 'Yes').astype(int)
+    return train_test_split(data, Y, test_size=0.2, random_state=42, stratify=Y)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--upsample", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--jobs", type=int, default=None, help="pool size (default: all cores)")
+    parser.add_argument("--no-log-model", action="store_true", help="skip model artifacts in both runners")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="churn_experiments_")
+    os.chdir(workdir)
+    print(f"cores available: {os.cpu_count()}, tracking store and feature cache in {workdir}")
+
+    if args.no_log_model:
+        # compare_models always logs the model through track_experiment
+        mlflow_tracking.mlflow.sklearn.log_model = lambda *a, **k: None
+
+    rows = []
+    for upsample in args.upsample:
+        X_train, X_test, y_train, y_test = make_split(upsample)
+        mlflow_tracking.TRACKING_URI = f"sqlite:///{workdir}/mlflow_{upsample}x.db"
+
+        def serial():
+            preprocessor = create_preprocessing_pipeline()
+            X_train_processed = preprocessor.fit_transform(X_train)
+            X_test_processed = preprocessor.transform(X_test)
+            return mlflow_tracking.compare_models(make_models(), X_train_processed, X_test_processed,
+                                                  y_train, y_test)
+
+        def parallel():
+            return mlflow_tracking.compare_models_parallel(make_models(), X_train, X_test, y_train, y_test,
+                                                           preprocessor=create_preprocessing_pipeline(),
+                                                           n_jobs=args.jobs)
+
+        _, serial_s = timed(serial)
+        _, cold_s = timed(parallel)
+        _, warm_s = timed(parallel)
+        rows.append((len(X_train) + len(X_test), serial_s, cold_s, warm_s))
+
+    print(f"\n{'rows':>10}{'serial s':>10}{'parallel s':>12}{'speedup':>9}{'warm cache s':>14}{'speedup':>9}")
+    for n, serial_s, cold_s, warm_s in rows:
+        print(f"{n:>10,}{serial_s:>10.1f}{cold_s:>12.1f}{serial_s / cold_s:>8.2f}x"
+              f"{warm_s:>14.1f}{serial_s / warm_s:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Explanations and what-if sweeps: latency of /explain for large batches and /whatif vs one /predict per scenario.
+
+For each batch size (customers sampled from the Telco CSV) times:
+
+- Explainer.explain   contributions for validated typed arrays (transform + one matrix product)
+- /explain            whole requests in-process (httpx ASGI transport), JSON rows and columnar JSON
+
+then, for single customers, one /whatif call (every Contract x TechSupport x
+PaymentMethod scenario scored in one model call) against sending the same
+scenarios as one /predict call each, the way it had to be done before.
+
+    python benchmarks/bench_explain.py --batch-sizes 100 10000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_suite import load_customers  # noqa: E402
+
+
+def best_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+async def bench_explain(app, rows, repeats):
+    from api import formats
+
+    body = formats.dumps(rows)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for label, accept in (("/explain (JSON rows)", formats.JSON), ("/explain (columns)", formats.COLUMNS_JSON)):
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                response = await client.post("/explain", content=body,
+                                             headers={"content-type": formats.JSON, "accept": accept})
+                times.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+            print(f"{label:<34}{min(times) * 1000:>10.2f}{len(response.content):>14,}")
+
+
+async def bench_whatif(app, customers, repeats):
+    print(f"\n{'what-if (per customer)':<34}{'scenarios':>10}{'best ms':>10}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        sweep, separate = [], []
+        for customer in customers:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                response = await client.post("/whatif", json={"customer": customer})
+            sweep.append((time.perf_counter() - start) / repeats)
+            scenarios = [dict(customer, **s["changes"]) for s in response.json()["scenarios"]]
+
+            start = time.perf_counter()
+            for scenario in scenarios:
+                assert (await client.post("/predict", json=scenario)).status_code == 200
+            separate.append(time.perf_counter() - start)
+        print(f"{'one /whatif':<34}{len(scenarios):>10}{np.median(sweep) * 1000:>10.2f}")
+        print(f"{'one /predict per scenario':<34}{len(scenarios):>10}{np.median(separate) * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 10_000])
+    parser.add_argument("--repeats", type=int, default=10, help="best of N per measurement")
+    parser.add_argument("--whatif-customers", type=int, default=20)
+    args = parser.parse_args()
+
+    import api.app as app_module
+
+    app_module.cache = None  # every /predict scenario is scored, not served from the cache
+    app_module.audit = None
+    app_module.drift = None
+    version = app_module.registry.get()
+    customers = load_customers()
+
+    for n in args.batch_sizes:
+        rows = [customers[i % len(customers)] for i in range(n)]
+        batch = version.validator.validate(rows)
+        print(f"\n{n:,} customers ({args.repeats} runs, best)")
+        print(f"{'explanation':<34}{'ms':>10}{'bytes':>14}")
+        print(f"{'score_batch (probabilities only)':<34}{best_ms(lambda: version.score_batch(batch), args.repeats):>10.2f}")
+        print(f"{'explain_batch (contributions)':<34}{best_ms(lambda: version.explain_batch(batch), args.repeats):>10.2f}")
+        explanation = version.explain_batch(batch)
+        print(f"{'  + rows with top factors':<34}{best_ms(lambda: explanation.rows(3), args.repeats):>10.2f}")
+        asyncio.run(bench_explain(app_module.app, rows, args.repeats))
+
+    asyncio.run(bench_whatif(app_module.app, customers[:args.whatif_customers], args.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Wire formats for /predict_batch: payload size and (de)serialization time per format.
+
+Per batch size, for every request format (JSON rows, JSON columns, Arrow IPC,
+MessagePack) times the client encoding the body and the server decoding +
+validating it into columns, against the previous path (FastAPI parsing
+List[Customer] with pydantic, then .dict() per customer). For every response
+format times the server encoding it and the client decoding it, against the
+previous FastAPI default (jsonable_encoder + json.dumps of the row dicts).
+Then times whole /predict_batch calls in-process (httpx ASGI transport) per
+request/response format pair, model scoring included.
+
+    python benchmarks/bench_formats.py --batch-sizes 100 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import warnings
+
+import httpx
+import msgpack
+import numpy as np
+import pyarrow as pa
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_suite import load_customers  # noqa: E402
+
+
+def best_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def old_request(app_module, body):
+    """What FastAPI did for `customers: List[Customer]`, plus the endpoint's .dict() per customer"""
+    customers = app_module.CUSTOMER_LIST.validate_python(json.loads(body))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return [c.dict() for c in customers]
+
+
+def old_response(probabilities):
+    """The previous /predict_batch answer through FastAPI's default JSONResponse"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from src.scoring import risk_levels
+
+    predictions = np.where(probabilities > 0.5, "Churn", "No Churn")
+    risks = risk_levels(probabilities)
+    results = [{"customer_id": i + 1, "churn_prediction": pred, "churn_probability": prob, "risk_level": risk}
+               for i, (pred, prob, risk) in enumerate(zip(predictions.tolist(), probabilities.tolist(),
+                                                          risks.tolist()))]
+    content = {"predictions": results, "model_version": "churn_pipeline", "total_customers": len(results),
+               "summary": {"total_churn_risk": int((predictions == "Churn").sum()),
+                           "high_risk_customers": int((risks == "High").sum())}}
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def client_decode(media_type, body):
+    from api import formats
+
+    if media_type == formats.ARROW:
+        return pa.ipc.open_stream(body).read_all()
+    if media_type == formats.MSGPACK:
+        return msgpack.unpackb(body)
+    return formats._loads(body)
+
+
+def bench_serialization(app_module, rows, repeats):
+    from api import formats
+
+    customers = load_customers()
+    batch = [customers[i % len(customers)] for i in range(rows)]
+    columns = {col: [c[col] for c in batch] for col in batch[0]}
+    probabilities = app_module.registry.get().score_columns(columns)
+
+    print(f"\n{rows:,} customers: requests")
+    print(f"{'format':<52}{'bytes':>12}{'client enc ms':>15}{'server dec ms':>15}")
+    json_rows = json.dumps(batch).encode()
+    print(f"{'JSON rows (pydantic List[Customer])':<52}{len(json_rows):>12,}"
+          f"{best_ms(lambda: json.dumps(batch).encode(), repeats):>15.2f}"
+          f"{best_ms(lambda: old_request(app_module, json_rows), repeats):>15.2f}")
+    print(f"{'JSON rows':<52}{len(json_rows):>12,}{best_ms(lambda: formats.dumps(batch), repeats):>15.2f}"
+          f"{best_ms(lambda: app_module.parse_columns(formats.JSON, json_rows), repeats):>15.2f}")
+    for media_type in formats.REQUEST_FORMATS[1:]:
+        body = formats.encode_columns(media_type, columns)
+        print(f"{media_type:<52}{len(body):>12,}"
+              f"{best_ms(lambda: formats.encode_columns(media_type, columns), repeats):>15.2f}"
+              f"{best_ms(lambda: app_module.parse_columns(media_type, body), repeats):>15.2f}")
+
+    print(f"{rows:,} customers: responses")
+    print(f"{'format':<52}{'bytes':>12}{'server enc ms':>15}{'client dec ms':>15}")
+    body = old_response(probabilities)
+    print(f"{'JSON rows (jsonable_encoder+json)':<52}{len(body):>12,}"
+          f"{best_ms(lambda: old_response(probabilities), repeats):>15.2f}"
+          f"{best_ms(lambda: json.loads(body), repeats):>15.2f}")
+    for media_type in formats.BATCH_RESPONSE_FORMATS:
+        for probabilities_only in (False, True):
+            def encode():
+                return formats.encode_batch(media_type, "churn_pipeline", probabilities, probabilities_only)
+
+            body = encode()
+            label = media_type + (" (probabilities)" if probabilities_only else "")
+            print(f"{label:<52}{len(body):>12,}{best_ms(encode, repeats):>15.2f}"
+                  f"{best_ms(lambda: client_decode(media_type, body), repeats):>15.2f}")
+    return batch, columns
+
+
+async def bench_end_to_end(app, batch, columns, repeats):
+    from api import formats
+
+    pairs = [(formats.JSON, formats.JSON, formats.dumps(batch))]
+    pairs += [(media_type, media_type, formats.encode_columns(media_type, columns))
+              for media_type in formats.REQUEST_FORMATS[1:]]
+    print(f"{'end to end (request -> response)':<80}{'best ms':>10}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for content_type, accept, body in pairs:
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                response = await client.post("/predict_batch", content=body,
+                                             headers={"content-type": content_type, "accept": accept})
+                client_decode(accept, response.content)
+                times.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+            print(f"{content_type + ' -> ' + accept:<80}{min(times) * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 10_000])
+    parser.add_argument("--repeats", type=int, default=20, help="best of N per measurement")
+    args = parser.parse_args()
+
+    import api.app as app_module
+    app_module.cache = None  # measure parsing and encoding, not cache lookups
+    app_module.audit = None
+    app_module.drift = None
+
+    for rows in args.batch_sizes:
+        batch, columns = bench_serialization(app_module, rows, args.repeats)
+        asyncio.run(bench_end_to_end(app_module.app, batch, columns, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
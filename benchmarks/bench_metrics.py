@@ -0,0 +1,115 @@
+"""
+Instrumentation cost and where a /predict call spends its time.
+
+Drives the app in-process (httpx ASGI transport, no network), one request at a
+time, with metrics off (CHURN_METRICS=0), metrics on, and metrics on plus the
+sampling profiler running; modes are interleaved over several runs and the
+median p50/p99 reported. Then prints the per-stage breakdown recorded by
+GET /metrics for the compiled scorer and for the sklearn pipeline fallback.
+
+    python benchmarks/bench_metrics.py --requests 5000 --repeats 3
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+CUSTOMER = {
+    "gender": "Male", "SeniorCitizen": 0, "Partner": "Yes", "Dependents": "No",
+    "tenure": 5, "PhoneService": "Yes", "MultipleLines": "No",
+    "InternetService": "Fiber optic", "OnlineSecurity": "No", "OnlineBackup": "No",
+    "DeviceProtection": "No", "TechSupport": "No", "StreamingTV": "Yes",
+    "StreamingMovies": "Yes", "Contract": "Month-to-month", "PaperlessBilling": "Yes",
+    "PaymentMethod": "Electronic check", "MonthlyCharges": 89.50, "TotalCharges": ""
+}
+STAGE_ORDER = ("validation", "decode", "schema", "to_dict", "columns", "dataframe", "cleaner", "preprocessor",
+               "transform", "model", "model_predict_proba", "encode", "serialization")
+
+
+def load_app(metrics_enabled):
+    """Fresh api.app with CHURN_METRICS set (the route class is fixed at import time)"""
+    os.environ["CHURN_METRICS"] = "1" if metrics_enabled else "0"
+    import api.app as app_module
+    app_module = importlib.reload(app_module)
+    app_module.cache = None  # score every request
+    app_module.audit = None
+    app_module.drift = None
+    return app_module
+
+
+async def run_load(app, total, batch_size=0):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(total):
+            customer = dict(CUSTOMER, tenure=i % 72)
+            start = time.perf_counter()
+            if batch_size:
+                response = await client.post("/predict_batch", json=[customer] * batch_size)
+            else:
+                response = await client.post("/predict", json=customer)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def stage_breakdown(app_module, label, requests, batch_size):
+    app_module.metrics.stages.clear()
+    asyncio.run(run_load(app_module.app, requests))
+    asyncio.run(run_load(app_module.app, max(1, requests // 10), batch_size))
+    print(f"\n{label}: mean us per stage")
+    print(f"{'stage':<22}{'/predict':>10}{f'/predict_batch ({batch_size})':>24}")
+    for stage in STAGE_ORDER:
+        cells = []
+        for endpoint in ("/predict", "/predict_batch"):
+            histogram = app_module.metrics.stages.get((endpoint, stage))
+            cells.append(f"{histogram.sum / histogram.count * 1e6:.1f}" if histogram else "-")
+        if cells != ["-", "-"]:
+            print(f"{stage:<22}{cells[0]:>10}{cells[1]:>24}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=3, help="runs per mode (interleaved, median reported)")
+    parser.add_argument("--batch-size", type=int, default=100, help="customers per /predict_batch call")
+    parser.add_argument("--profiler-interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    apps = {"off": load_app(False), "on": load_app(True)}
+    modes = ["metrics off", "metrics on", "metrics + profiler"]
+    results = {mode: [] for mode in modes}
+    for app_module in apps.values():
+        asyncio.run(run_load(app_module.app, 500))  # warm-up
+    for _ in range(args.repeats):
+        for mode in modes:
+            app_module = apps["off"] if mode == "metrics off" else apps["on"]
+            if mode == "metrics + profiler":
+                app_module.profiler.start(args.profiler_interval_ms / 1000)
+            results[mode].append(asyncio.run(run_load(app_module.app, args.requests)))
+            app_module.profiler.stop()
+
+    print(f"{'mode':<20}{'p50 ms':>9}{'p99 ms':>9}{'p50 +us':>9}  ({args.repeats} runs, /predict)")
+    base = np.median(np.array(results["metrics off"]), axis=0)
+    for mode, runs in results.items():
+        p50, p99 = np.median(np.array(runs), axis=0)
+        print(f"{mode:<20}{p50:>9.3f}{p99:>9.3f}{(p50 - base[0]) * 1000:>9.0f}")
+
+    app_module = apps["on"]
+    stage_breakdown(app_module, "compiled scorer", args.requests, args.batch_size)
+    version = app_module.registry.get()
+    version.scorer = None  # force the sklearn pipeline path
+    stage_breakdown(app_module, "sklearn pipeline", max(1, args.requests // 5), args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
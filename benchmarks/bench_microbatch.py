@@ -0,0 +1,91 @@
+"""
+Load test: /predict with and without micro-batching.
+
+Drives the app in-process (httpx ASGI transport, no network) with N concurrent
+clients and prints throughput and p50/p99 latency for each mode.
+
+    python benchmarks/bench_microbatch.py --concurrency 1 16 64 --requests 2000
+    python benchmarks/bench_microbatch.py --sklearn   # score with the sklearn pipeline
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+import api.app as app_module  # noqa: E402
+from api.batching import MicroBatcher  # noqa: E402
+
+CUSTOMER = {
+    "gender": "Male", "SeniorCitizen": 0, "Partner": "Yes", "Dependents": "No",
+    "tenure": 5, "PhoneService": "Yes", "MultipleLines": "No",
+    "InternetService": "Fiber optic", "OnlineSecurity": "No", "OnlineBackup": "No",
+    "DeviceProtection": "No", "TechSupport": "No", "StreamingTV": "Yes",
+    "StreamingMovies": "Yes", "Contract": "Month-to-month", "PaperlessBilling": "Yes",
+    "PaymentMethod": "Electronic check", "MonthlyCharges": 89.50, "TotalCharges": ""
+}
+
+
+async def run_load(concurrency, total):
+    latencies = []
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await client.post("/predict", json=CUSTOMER)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "throughput": total / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--sklearn", action="store_true", help="disable the compiled scorer")
+    args = parser.parse_args()
+
+    if args.sklearn:
+        app_module.registry.get().scorer = None
+    app_module.cache = None  # every request is the same customer
+
+    modes = {
+        "direct": None,
+        "microbatch": MicroBatcher(app_module.predict_many, args.max_batch_size, args.max_wait_ms),
+    }
+
+    print(f"{'mode':<12}{'concurrency':>12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'mean batch':>12}")
+    for concurrency in args.concurrency:
+        for mode, batcher in modes.items():
+            app_module.batcher = batcher
+            if batcher is not None:
+                batcher.batches = batcher.items = 0
+            result = asyncio.run(run_load(concurrency, args.requests))
+            mean_batch = batcher.stats()["mean_batch_size"] if batcher is not None else 1.0
+            print(f"{mode:<12}{concurrency:>12}{result['throughput']:>10.0f}"
+                  f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{mean_batch:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Online updates: throughput and how closely ROC-AUC tracks a full refit.
+
+1. Throughput: OnlineChurnModel.partial_fit rows/sec at several mini-batch
+   sizes, on a stream resampled from the Telco CSV.
+2. Tracking: an initial LogisticRegression is trained on the first
+   --initial rows of the train split (standing in for the saved model), then
+   the rest of the split arrives in mini-batches. At each checkpoint, the
+   held-out ROC-AUC of the online model is compared with a full refit
+   (create_preprocessing_pipeline + LogisticRegression) on every row seen so far.
+
+    python benchmarks/bench_online.py --rows 200000 --batch-sizes 100 1000 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.online import OnlineChurnModel, labels  # noqa: E402
+from src.preprocessing import create_preprocessing_pipeline  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+
+
+def full_fit(X, y):
+    pipeline = Pipeline([('preprocessing', create_preprocessing_pipeline()),
+                         ('classifier', LogisticRegression(class_weight='balanced', max_iter=1000))])
+    return pipeline.fit(X, y)
+
+
+def throughput(data, y, rows, batch_sizes):
+    idx = np.random.default_rng(0).integers(0, len(data), rows)
+    stream, stream_y = data.iloc[idx].reset_index(drop=True), y[idx]
+    initial = full_fit(data, y)
+
+    print(f"{'batch size':>11}{'rows':>11}{'seconds':>9}{'rows/sec':>12}")
+    for batch_size in batch_sizes:
+        model = OnlineChurnModel.from_pipeline(initial)
+        start = time.perf_counter()
+        for i in range(0, rows, batch_size):
+            model.partial_fit(stream.iloc[i:i + batch_size], stream_y[i:i + batch_size])
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>11,}{rows:>11,}{elapsed:>9.2f}{rows / elapsed:>12,.0f}")
+
+
+def tracking(data, y, initial_rows, batch_size, checkpoints):
+    X_train, X_test, y_train, y_test = train_test_split(data, y, test_size=0.2, random_state=42, stratify=y)
+    model = OnlineChurnModel.from_pipeline(full_fit(X_train.iloc[:initial_rows], y_train[:initial_rows]))
+    start_auc = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+    print(f"\ninitial model on {initial_rows:,} rows: test ROC-AUC {start_auc:.4f}")
+
+    marks = np.linspace(initial_rows, len(X_train), checkpoints + 1, dtype=int)[1:]
+    print(f"{'rows seen':>10}{'online AUC':>12}{'refit AUC':>11}{'gap':>8}{'update ms':>11}{'refit ms':>10}")
+    seen = initial_rows
+    for mark in marks:
+        update_start = time.perf_counter()
+        for i in range(seen, mark, batch_size):
+            end = min(i + batch_size, mark)
+            model.partial_fit(X_train.iloc[i:end], y_train[i:end])
+        update_ms = (time.perf_counter() - update_start) * 1000
+        seen = mark
+
+        refit_start = time.perf_counter()
+        refit = full_fit(X_train.iloc[:seen], y_train[:seen])
+        refit_ms = (time.perf_counter() - refit_start) * 1000
+
+        online_auc = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+        refit_auc = roc_auc_score(y_test, refit.predict_proba(X_test)[:, 1])
+        print(f"{seen:>10,}{online_auc:>12.4f}{refit_auc:>11.4f}{online_auc - refit_auc:>8.4f}"
+              f"{update_ms:>11.0f}{refit_ms:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000, help="stream length for the throughput test")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--initial", type=int, default=1000, help="rows behind the initial model")
+    parser.add_argument("--tracking-batch-size", type=int, default=200)
+    parser.add_argument("--checkpoints", type=int, default=5)
+    args = parser.parse_args()
+
+    data = pd.read_csv(DATA_PATH)
+    y = labels(data.pop("Churn"))
+    throughput(data, y, args.rows, args.batch_sizes)
+    tracking(data, y, args.initial, args.tracking_batch_size, args.checkpoints)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Probe latency: /livez, /readyz and /health.
+
+Times each probe two ways:
+- handler: the endpoint function alone (what a probe costs the server)
+- asgi:    a full in-process HTTP round trip through the app (no network)
+
+    python benchmarks/bench_probes.py --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+import api.app as app_module  # noqa: E402
+
+PROBES = {
+    "/livez": app_module.liveness_check,
+    "/readyz": app_module.readiness_check,
+    "/health": app_module.health_check,
+}
+
+
+def summarize(latencies):
+    latencies = np.array(latencies) * 1000
+    return float(np.percentile(latencies, 50)), float(np.percentile(latencies, 99))
+
+
+async def bench(n):
+    results = {}
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path, handler in PROBES.items():
+            handler_times, asgi_times = [], []
+            for _ in range(n):
+                start = time.perf_counter()
+                await handler()
+                handler_times.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                response = await client.get(path)
+                asgi_times.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+            results[path] = summarize(handler_times) + summarize(asgi_times)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args.requests))
+
+    print(f"{'probe':<10}{'handler p50':>14}{'handler p99':>14}{'asgi p50':>12}{'asgi p99':>12}   (ms)")
+    for path, (h50, h99, a50, a99) in results.items():
+        print(f"{path:<10}{h50:>14.4f}{h99:>14.4f}{a50:>12.3f}{a99:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Multi-core scaling: throughput of api.serve from 1 to N cores, with and without scoring processes.
+
+For each core count k the server is started restricted to k CPUs (sched_setaffinity)
+in two modes:
+
+- workers         python -m api.serve --workers k               (every worker scores its own requests)
+- scoring procs   python -m api.serve --workers k --scorers k   (workers parse and validate, CPU-pinned
+                                                                 scoring processes score, api.scoring_pool)
+
+and driven over TCP by load-generator processes (pinned to the CPUs the server
+doesn't use, when there are any) for a fixed time, once with single /predict
+calls and once with /predict_batch calls. The prediction cache is off so every
+customer is scored.
+
+    python benchmarks/bench_scaling.py --max-cores 4 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from benchmarks.bench_suite import load_customers  # noqa: E402
+
+WORKLOADS = ("predict", "predict_batch")
+
+
+def load(url, workload, seconds, concurrency, batch_size):
+    """One load-generator process: prints the number of requests and customers it got answers for, and errors"""
+    customers = load_customers()
+
+    async def run():
+        requests = scored = errors = 0
+        deadline = time.perf_counter() + seconds
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+            async def user(i):
+                nonlocal requests, scored, errors
+                while time.perf_counter() < deadline:
+                    try:
+                        if workload == "predict":
+                            response = await client.post("/predict", json=customers[i % len(customers)])
+                            n = 1
+                        else:
+                            start = i * batch_size % len(customers)
+                            batch = customers[start:start + batch_size]
+                            response = await client.post("/predict_batch", params={"probabilities_only": "true"},
+                                                         json=batch)
+                            n = len(batch)
+                        response.raise_for_status()
+                    except httpx.HTTPError:
+                        errors += 1
+                        continue
+                    finally:
+                        i += concurrency
+                    requests += 1
+                    scored += n
+            await asyncio.gather(*(user(i) for i in range(concurrency)))
+        return requests, scored, errors
+
+    requests, scored, errors = asyncio.run(run())
+    print(json.dumps({"requests": requests, "customers": scored, "errors": errors}), flush=True)
+
+
+def start_server(cores, scorers, port, cpus):
+    args = [sys.executable, "-m", "api.serve", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(cores), "--scorers", str(scorers), "--log-level", "warning"]
+    env = {**os.environ, "CHURN_FAST_START": "1", "CHURN_CACHE_MAX_ENTRIES": "0"}
+    server_cpus = set(cpus[:cores])
+    proc = subprocess.Popen(args, cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                            preexec_fn=lambda: os.sched_setaffinity(0, server_cpus))
+    start = time.perf_counter()
+    while True:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1)
+            return proc
+        except OSError:
+            if time.perf_counter() - start > 60 or proc.poll() is not None:
+                proc.terminate()
+                raise RuntimeError("server did not start")
+            time.sleep(0.1)
+
+
+def drive(url, workload, args, client_cpus):
+    """Run the load-generator processes at once, return (requests/s, customers/s, errors)"""
+    command = [sys.executable, __file__, "--load", url, workload]
+    options = ["--seconds", str(args.seconds), "--concurrency", str(args.concurrency),
+               "--batch-size", str(args.batch_size)]
+    procs = [subprocess.Popen(command + options, cwd=ROOT, stdout=subprocess.PIPE, text=True,
+                              preexec_fn=lambda: os.sched_setaffinity(0, client_cpus))
+             for _ in range(args.clients)]
+    results = [json.loads(proc.communicate()[0].strip().splitlines()[-1]) for proc in procs]
+    return (sum(r["requests"] for r in results) / args.seconds,
+            sum(r["customers"] for r in results) / args.seconds,
+            sum(r["errors"] for r in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-cores", type=int, default=len(os.sched_getaffinity(0)))
+    parser.add_argument("--seconds", type=float, default=10, help="load per measurement")
+    parser.add_argument("--clients", type=int, default=2, help="load-generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="connections per load generator")
+    parser.add_argument("--batch-size", type=int, default=500, help="customers per /predict_batch call")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--load", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.load:
+        load(args.load[0], args.load[1], args.seconds, args.concurrency, args.batch_size)
+        return
+
+    cpus = sorted(os.sched_getaffinity(0))
+    print(f"{len(cpus)} CPU(s) available, {args.clients} load generators x {args.concurrency} connections, "
+          f"{args.seconds:.0f}s per measurement")
+    print(f"{'cores':>5}  {'mode':<15}{'workload':<15}{'req/s':>10}{'customers/s':>13}{'vs 1 core':>11}{'errors':>8}")
+    baseline = {}
+    for cores in range(1, min(args.max_cores, len(cpus)) + 1):
+        # Load generators on the CPUs the server doesn't use (shared with it if there are none left)
+        client_cpus = set(cpus[cores:]) or set(cpus)
+        for mode, scorers in (("workers", 0), ("scoring procs", cores)):
+            proc = start_server(cores, scorers, args.port, cpus)
+            try:
+                for workload in WORKLOADS:
+                    rps, cps, errors = drive(f"http://127.0.0.1:{args.port}", workload, args, client_cpus)
+                    speedup = cps / baseline.setdefault((mode, workload), cps)
+                    print(f"{cores:>5}  {mode:<15}{workload:<15}{rps:>10.0f}{cps:>13.0f}{speedup:>10.2f}x{errors:>8}")
+            finally:
+                proc.terminate()
+                proc.wait()
+
+
+if __name__ == "__main__":
+    main()
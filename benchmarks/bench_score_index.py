@@ -0,0 +1,175 @@
+"""
+Score index: build time, size on disk and lookup latency for a large synthetic customer base.
+
+Synthetic customers are Telco CSV rows sampled with replacement under fresh
+customerIDs. The benchmark:
+
+1. scores them in chunks (typed arrays through ModelVersion.score_batch),
+2. builds the index (dedupe, hash table, top-K order) and reports its size,
+3. times ScoreIndex.lookup for hits and misses in a fresh process (cold
+   memory-map, then warm) as p50 / p99,
+4. times GET /customers/{id}/risk, /customers/top and /customers/risk_bands
+   in-process (httpx ASGI transport) against POST /predict for the same customer.
+
+    python benchmarks/bench_score_index.py --customers 10000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_suite import load_customers  # noqa: E402
+
+VERSION = "churn_pipeline"
+MODEL_PATH = "models/churn_pipeline.pkl"
+
+LOOKUP_SCRIPT = r"""
+import json, random, sys, time
+import numpy as np
+from src.score_index import ScoreIndex
+
+path, customers, samples = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+start = time.perf_counter()
+index = ScoreIndex(path)
+open_ms = (time.perf_counter() - start) * 1000
+rng = random.Random(0)
+results = {"open_ms": open_ms}
+for name, make in (("hit (cold)", lambda: "C%09d" % rng.randrange(customers)),
+                   ("hit (warm)", lambda: "C%09d" % rng.randrange(customers)),
+                   ("miss", lambda: "X%09d" % rng.randrange(customers))):
+    keys = [make() for _ in range(samples)]
+    times = []
+    for key in keys:
+        t = time.perf_counter_ns()
+        index.lookup(key)
+        times.append(time.perf_counter_ns() - t)
+    results[name] = times
+print(json.dumps({k: v if k == "open_ms" else
+                  [float(np.percentile(v, 50)) / 1000, float(np.percentile(v, 99)) / 1000] for k, v in results.items()}))
+"""
+
+
+def synthetic_ids(start, stop):
+    """'C000000042'-style customerIDs as fixed-width bytes"""
+    digits = np.arange(start, stop, dtype=np.int64)
+    ids = np.empty((stop - start, 10), dtype=np.uint8)
+    ids[:, 0] = ord("C")
+    for position in range(9, 0, -1):
+        ids[:, position] = ord("0") + digits % 10
+        digits //= 10
+    return ids.view("S10").ravel()
+
+
+def score_synthetic(version, customers, chunk_size):
+    base = version.validator.validate(load_customers())
+    rng = np.random.default_rng(0)
+    ids, probabilities = [], []
+    for start in range(0, customers, chunk_size):
+        stop = min(start + chunk_size, customers)
+        batch = base.take(rng.integers(0, len(base), stop - start))
+        probabilities.append(version.score_batch(batch))
+        ids.append(synthetic_ids(start, stop))
+    return np.concatenate(ids), np.concatenate(probabilities)
+
+
+def directory_mb(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+
+
+def rss_mb(field="VmRSS"):
+    """Resident MB (RssFile: mapped file pages, shared through the page cache)"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def bench_api(app, customers, requests):
+    rng = random.Random(1)
+    body = load_customers()[0]
+    cases = {
+        "GET /customers/{id}/risk": lambda: ("GET", f"/customers/C{rng.randrange(customers):09d}/risk", None),
+        "GET /customers/{id}/risk (404)": lambda: ("GET", f"/customers/X{rng.randrange(customers):09d}/risk", None),
+        "GET /customers/top?k=100": lambda: ("GET", "/customers/top?k=100", None),
+        "GET /customers/risk_bands": lambda: ("GET", "/customers/risk_bands", None),
+        "POST /predict (model call)": lambda: ("POST", "/predict", body),
+    }
+    print(f"\n{'endpoint (ASGI, in-process)':<34}{'p50 ms':>10}{'p99 ms':>10}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, make in cases.items():
+            times = []
+            for _ in range(requests):
+                method, url, json_body = make()
+                start = time.perf_counter()
+                response = await client.request(method, url, json=json_body)
+                times.append(time.perf_counter() - start)
+                assert response.status_code in (200, 404), response.text
+            print(f"{name:<34}{np.percentile(times, 50) * 1000:>10.3f}{np.percentile(times, 99) * 1000:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--customers", type=int, default=10_000_000)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--lookups", type=int, default=100_000, help="lookups per latency sample")
+    parser.add_argument("--requests", type=int, default=2000, help="API requests per endpoint")
+    args = parser.parse_args()
+
+    import api.app as app_module
+    from src.score_index import IndexCatalog, build_index
+
+    app_module.cache = None
+    app_module.audit = None
+    app_module.drift = None
+    version = app_module.registry.get()
+
+    root = tempfile.mkdtemp(prefix="score_index_")
+    try:
+        start = time.perf_counter()
+        ids, probabilities = score_synthetic(version, args.customers, args.chunk_size)
+        scoring = time.perf_counter() - start
+        print(f"{args.customers:,} customers")
+        print(f"{'scoring (chunked, in memory)':<34}{scoring:>9.1f}s{args.customers / scoring:>14,.0f} rows/s")
+
+        path = os.path.join(root, VERSION)
+        start = time.perf_counter()
+        manifest = build_index(path, ids, probabilities, VERSION, model_path=MODEL_PATH)
+        build = time.perf_counter() - start
+        print(f"{'index build':<34}{build:>9.1f}s{args.customers / build:>14,.0f} rows/s")
+        size = directory_mb(path)
+        print(f"{'index size':<34}{size:>9.1f} MB ({size * 1e6 / args.customers:.1f} B/customer)")
+        print(f"{'risk bands':<34} {manifest['risk_band_counts']}")
+        del ids, probabilities
+
+        output = subprocess.run([sys.executable, "-c", LOOKUP_SCRIPT, path, str(args.customers), str(args.lookups)],
+                                capture_output=True, text=True, check=True).stdout
+        latencies = json.loads(output)
+        print(f"\n{'ScoreIndex.lookup (fresh process)':<34}{'p50 us':>10}{'p99 us':>10}")
+        print(f"{'open (mmap)':<34}{latencies.pop('open_ms'):>9.2f}ms")
+        for name, (p50, p99) in latencies.items():
+            print(f"{name:<34}{p50:>10.2f}{p99:>10.2f}")
+
+        app_module.score_indexes = IndexCatalog(root)
+        before = rss_mb(), rss_mb("RssFile")
+        asyncio.run(bench_api(app_module.app, args.customers, args.requests))
+        print(f"\nAPI process RSS {rss_mb():.0f} MB: {rss_mb() - before[0]:+.0f} MB while serving the index, "
+              f"{rss_mb('RssFile') - before[1]:+.0f} MB of it mapped index pages")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Cold start: import time, time to first prediction and memory per worker.
+
+1. Single process, for the default (joblib pipeline) and CHURN_FAST_START=1
+   (exported, memory-mapped model) modes: time to import api.app, time to the first
+   prediction, and RSS afterwards. Each run is a fresh interpreter.
+2. Prefork server (api.serve) with N workers: RSS and PSS of each worker.
+   PSS splits shared pages between the processes sharing them, so a lower
+   PSS than RSS means the model/import memory is shared copy-on-write.
+
+    python -m src.artifact export models/churn_pipeline.pkl   # build models/churn_pipeline.model first
+    python benchmarks/bench_startup.py --runs 3 --workers 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PROBE = r"""
+import json, time
+start = time.perf_counter()
+import api.app as app_module
+imported = time.perf_counter()
+app_module.registry.get().predict_one(app_module.SELF_TEST_CUSTOMER)
+first = time.perf_counter()
+
+rss_kb = 0
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+import sys
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_prediction_ms": (first - start) * 1000,
+    "rss_mb": rss_kb / 1024,
+    "sklearn_imported": "sklearn" in sys.modules,
+    "pandas_imported": "pandas" in sys.modules,
+}))
+"""
+
+MODES = {
+    "joblib pipeline": {"CHURN_FAST_START": "0"},
+    "fast start": {"CHURN_FAST_START": "1"},
+}
+
+
+def run_probe(env):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def memory_mb(pid):
+    """(RSS, PSS) in MB from /proc"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1]) / 1024
+    return values["Rss:"], values["Pss:"]
+
+
+def bench_prefork(env, workers, port):
+    proc = subprocess.Popen([sys.executable, "-m", "api.serve", "--workers", str(workers),
+                             "--port", str(port), "--host", "127.0.0.1", "--log-level", "warning"],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    try:
+        start = time.perf_counter()
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/livez", timeout=1)
+                break
+            except OSError:
+                if time.perf_counter() - start > 60:
+                    raise RuntimeError("server did not start")
+                time.sleep(0.05)
+        ready_ms = (time.perf_counter() - start) * 1000
+
+        with open(f"/proc/{proc.pid}/task/{proc.pid}/children") as f:
+            children = [int(pid) for pid in f.read().split()]
+        return ready_ms, memory_mb(proc.pid), [memory_mb(pid) for pid in children]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'mode':<18}{'import ms':>11}{'1st pred ms':>13}{'process ms':>12}{'RSS MB':>9}  sklearn/pandas")
+    for mode, extra in MODES.items():
+        env = {**os.environ, **extra}
+        runs = [run_probe(env) for _ in range(args.runs)]
+        best = min(runs, key=lambda r: r["first_prediction_ms"])
+        print(f"{mode:<18}{best['import_ms']:>11.0f}{best['first_prediction_ms']:>13.0f}"
+              f"{best['process_ms']:>12.0f}{best['rss_mb']:>9.1f}  "
+              f"{best['sklearn_imported']}/{best['pandas_imported']}")
+
+    print(f"\nPrefork server, {args.workers} workers")
+    print(f"{'mode':<18}{'ready ms':>10}{'parent RSS':>12}{'worker RSS':>12}{'worker PSS':>12}")
+    for mode, extra in MODES.items():
+        env = {**os.environ, **extra}
+        ready_ms, (parent_rss, _), workers = bench_prefork(env, args.workers, args.port)
+        worker_rss = sum(rss for rss, _ in workers) / len(workers)
+        worker_pss = sum(pss for _, pss in workers) / len(workers)
+        print(f"{mode:<18}{ready_ms:>10.0f}{parent_rss:>12.1f}{worker_rss:>12.1f}{worker_pss:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
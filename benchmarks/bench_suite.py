@@ -0,0 +1,277 @@
+"""
+Benchmark suite: micro-benchmarks + in-process API load test, saved as JSON for comparing commits.
+
+run      times DataCleaner.transform, the fitted preprocessing transform, the model
+         call and the compiled scorer at several batch sizes, then drives /predict
+         and /predict_batch in-process (httpx ASGI transport, no network) at several
+         concurrency levels: throughput, p50/p95/p99 latency and process RSS.
+         Results go to benchmarks/results/<commit>.json (or --output).
+compare  prints the change per benchmark between two result files and exits
+         with status 1 if anything got slower than --threshold.
+
+    python benchmarks/bench_suite.py run
+    python benchmarks/bench_suite.py run --quick --compare benchmarks/results/abc1234.json
+    python benchmarks/bench_suite.py compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+DATA_PATH = os.path.join(ROOT, "data", "raw", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+MODEL_PATH = os.path.join(ROOT, "models", "churn_pipeline.pkl")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Which number decides "faster / slower" for each kind of result
+COMPARED_METRICS = {
+    "micro": [("min_ms", "lower")],  # least affected by noise from other processes
+    "load": [("throughput_rps", "higher"), ("p99_ms", "lower")],
+}
+
+
+# ========== DATA ==========
+def make_frame(rows):
+    """`rows` customers sampled from the Telco CSV (raw columns, as the pipeline sees them)"""
+    base = pd.read_csv(DATA_PATH).drop(columns="Churn")
+    idx = np.random.default_rng(0).integers(0, len(base), rows)
+    return base.iloc[idx].reset_index(drop=True)
+
+
+def load_customers():
+    """Telco CSV rows as /predict request bodies"""
+    data = pd.read_csv(DATA_PATH, dtype={"TotalCharges": str}, keep_default_na=False)
+    return data.drop(columns=["customerID", "Churn"]).to_dict("records")
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+# ========== MICRO-BENCHMARKS ==========
+def time_call(fn, min_seconds, min_runs=5):
+    """Run fn until min_seconds have passed (and at least min_runs times); per-call seconds"""
+    times = []
+    total = 0.0
+    while total < min_seconds or len(times) < min_runs:
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        total += times[-1]
+    return np.array(times)
+
+
+def run_micro(batch_sizes, min_seconds):
+    import joblib
+
+    from src.scoring import CompiledScorer
+
+    pipeline = joblib.load(MODEL_PATH)
+    preprocessing = pipeline.named_steps['preprocessing']
+    cleaner = preprocessing.named_steps['cleaner']
+    classifier = pipeline.named_steps['classifier']
+    scorer = CompiledScorer.from_pipeline(pipeline)
+
+    results = {}
+    for rows in batch_sizes:
+        frame = make_frame(rows)
+        features = preprocessing.transform(frame)
+        columns = {col: frame[col].tolist() for col in frame.columns}
+        cases = {
+            "cleaner": lambda: cleaner.transform(frame),
+            "preprocessing": lambda: preprocessing.transform(frame),
+            "model": lambda: classifier.predict_proba(features),
+            "pipeline": lambda: pipeline.predict_proba(frame),
+            "compiled_scorer": lambda: scorer.predict_proba(columns),
+        }
+        for name, fn in cases.items():
+            times = time_call(fn, min_seconds)
+            median = float(np.median(times))
+            results[f"micro/{name}/{rows}"] = {
+                "kind": "micro", "rows": rows, "runs": len(times),
+                "median_ms": median * 1000, "min_ms": float(times.min()) * 1000,
+                "rows_per_s": rows / median
+            }
+            print(f"  {name:<16}{rows:>8,} rows  {median * 1000:>10.3f} ms  {rows / median:>14,.0f} rows/s")
+    return results
+
+
+# ========== LOAD TEST ==========
+async def drive(app, path, bodies, concurrency, total):
+    """Closed loop: `concurrency` clients send `total` requests between them"""
+    import httpx
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(total))
+
+        async def worker():
+            for i in remaining:
+                start = time.perf_counter()
+                response = await client.post(path, json=bodies[i % len(bodies)])
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return total / elapsed, np.array(latencies) * 1000
+
+
+def run_load(concurrency_levels, requests, batch_size):
+    os.chdir(ROOT)
+    import api.app as app_module
+
+    # Measure the scoring path, not the optional components
+    app_module.cache = None
+    app_module.audit = None
+    app_module.drift = None
+
+    customers = load_customers()
+    batches = [customers[i:i + batch_size] for i in range(0, len(customers) - batch_size + 1, batch_size)]
+    scenarios = {
+        "predict": ("/predict", customers, 1, requests),
+        f"predict_batch_{batch_size}": ("/predict_batch", batches, batch_size, max(1, requests // 10)),
+    }
+
+    results = {}
+    for name, (path, bodies, rows_per_request, total) in scenarios.items():
+        asyncio.run(drive(app_module.app, path, bodies, 1, min(total, 50)))  # warm-up
+        for concurrency in concurrency_levels:
+            throughput, latencies = asyncio.run(drive(app_module.app, path, bodies, concurrency, total))
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            results[f"load/{name}/c{concurrency}"] = {
+                "kind": "load", "endpoint": path, "concurrency": concurrency, "requests": total,
+                "rows_per_request": rows_per_request, "throughput_rps": throughput,
+                "rows_per_s": throughput * rows_per_request,
+                "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+                "rss_mb": rss_mb(), "peak_rss_mb": peak_rss_mb()
+            }
+            print(f"  {name:<20} c={concurrency:<4}{throughput:>9.0f} req/s  p50 {p50:7.2f}  p95 {p95:7.2f}  "
+                  f"p99 {p99:7.2f} ms  RSS {rss_mb():6.0f} MB")
+    return results
+
+
+# ========== RESULTS ==========
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, bool(dirty)
+
+
+def environment():
+    import sklearn
+
+    commit, dirty = git_commit()
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__
+    }
+
+
+def compare(base, new, threshold):
+    """Print the change per benchmark; returns the keys that regressed by more than threshold"""
+    print(f"base: {base['environment']['commit']}  new: {new['environment']['commit']}  "
+          f"(threshold {threshold:.0%})")
+    if base["environment"]["cpu_count"] != new["environment"]["cpu_count"]:
+        print("warning: the two runs had different core counts")
+
+    regressions = []
+    print(f"{'benchmark':<36}{'metric':<16}{'base':>12}{'new':>12}{'change':>9}")
+    for key in sorted(base["results"].keys() & new["results"].keys()):
+        old, current = base["results"][key], new["results"][key]
+        for metric, better in COMPARED_METRICS[old["kind"]]:
+            change = current[metric] / old[metric] - 1
+            worse = change > threshold if better == "lower" else change < -threshold
+            if worse:
+                regressions.append(f"{key} {metric}")
+            print(f"{key:<36}{metric:<16}{old[metric]:>12.3f}{current[metric]:>12.3f}{change:>+8.1%}"
+                  f"{'  REGRESSION' if worse else ''}")
+    for key in sorted(base["results"].keys() ^ new["results"].keys()):
+        print(f"{key:<36}only in {'base' if key in base['results'] else 'new'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite and save the results")
+    run.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    run.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    run.add_argument("--requests", type=int, default=2000, help="/predict requests per level (/10 for batches)")
+    run.add_argument("--batch-size", type=int, default=100, help="customers per /predict_batch request")
+    run.add_argument("--min-seconds", type=float, default=0.5, help="time spent per micro-benchmark")
+    run.add_argument("--quick", action="store_true", help="fewer requests and shorter timings (smoke run)")
+    run.add_argument("--skip-load", action="store_true")
+    run.add_argument("--output", help="default: benchmarks/results/<commit>.json")
+    run.add_argument("--compare", metavar="BASE_JSON", help="compare with an earlier result file")
+    run.add_argument("--threshold", type=float, default=0.10)
+
+    diff = commands.add_parser("compare", help="compare two result files")
+    diff.add_argument("base")
+    diff.add_argument("new")
+    diff.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.base) as f, open(args.new) as g:
+            regressions = compare(json.load(f), json.load(g), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    if args.quick:
+        args.requests, args.min_seconds = min(args.requests, 300), min(args.min_seconds, 0.1)
+
+    env = environment()
+    print(f"commit {env['commit']}{' (dirty)' if env['dirty'] else ''}, {env['cpu_count']} cores")
+    print("micro-benchmarks")
+    results = run_micro(args.batch_sizes, args.min_seconds)
+    if not args.skip_load:
+        print("load test")
+        results.update(run_load(args.concurrency, args.requests, args.batch_size))
+
+    report = {"environment": env, "settings": {k: v for k, v in vars(args).items() if k != "command"},
+              "results": results}
+    output = args.output or os.path.join(RESULTS_DIR, f"{env['commit']}{'-dirty' if env['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"results -> {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
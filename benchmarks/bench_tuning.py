@@ -0,0 +1,98 @@
+"""
+Hyperparameter search: exhaustive grid vs successive halving.
+
+- grid:    GridSearchCV over Pipeline(preprocessing, model) for every model in
+           tuning.DEFAULT_SEARCH_SPACE (preprocessing is refit for every
+           candidate and fold), all cores
+- halving: tuning.successive_halving_search (one cached preprocessor per fold,
+           successive halving + early stopping, every trial logged to MLflow,
+           winner refit and logged with track_experiment), all cores
+
+Both use the same 5 stratified folds of the notebook's 80/20 train split.
+MLflow runs go to a temporary SQLite store.
+
+    python benchmarks/bench_tuning.py --upsample 1 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "notebooks"))
+
+import mlflow_tracking  # noqa: E402
+import tuning  # noqa: E402
+from src.preprocessing import create_preprocessing_pipeline  # noqa: E402
+
+DATA_PATH = os.path.join(ROOT, "data", "raw", "WA_Fn-UseC_-Telco-Customer-Churn.csv")
+
+
+def make_split(upsample):
+    data = pd.read_csv(DATA_PATH)
+    if upsample > 1:
+        idx = np.random.default_rng(0).integers(0, len(data), len(data) * upsample)
+        data = data.iloc[idx].reset_index(drop=True)
+    Y = (data.pop('Churn') == 'Yes').astype(int)
+    return train_test_split(data, Y, test_size=0.2, random_state=42, stratify=Y)
+
+
+def exhaustive_grid(X_train, y_train):
+    best = (-1.0, None, None)
+    fits = 0
+    for name, (model, grid) in tuning.DEFAULT_SEARCH_SPACE.items():
+        pipeline = Pipeline([('preprocessing', create_preprocessing_pipeline()), ('classifier', model)])
+        search = GridSearchCV(pipeline, {f"classifier__{k}": v for k, v in grid.items()}, scoring='roc_auc',
+                              cv=StratifiedKFold(5, shuffle=True, random_state=42), n_jobs=-1, refit=False)
+        search.fit(X_train, y_train)
+        fits += len(search.cv_results_['params']) * 5
+        if search.best_score_ > best[0]:
+            best = (search.best_score_, name, search.best_params_)
+    return best, fits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--upsample", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="churn_tuning_")
+    os.chdir(workdir)
+    print(f"cores available: {os.cpu_count()}, tracking store and fold cache in {workdir}")
+
+    rows = []
+    for upsample in args.upsample:
+        X_train, X_test, y_train, y_test = make_split(upsample)
+        mlflow_tracking.TRACKING_URI = f"sqlite:///{workdir}/mlflow_{upsample}x.db"
+
+        start = time.perf_counter()
+        (grid_score, grid_model, grid_params), grid_fits = exhaustive_grid(X_train, y_train)
+        grid_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        best, metrics, trials = tuning.successive_halving_search(X_train, y_train, X_test, y_test)
+        halving_s = time.perf_counter() - start
+        halving_fits = int(trials['folds_run'].sum())
+
+        final = trials[trials.rung == trials.rung.max()]
+        halving_score = final['cv_roc_auc'].max()
+        print(f"\n grid best:    {grid_model} {grid_params} CV ROC-AUC {grid_score:.4f}")
+        print(f" halving best: {type(best.named_steps['classifier']).__name__} CV ROC-AUC {halving_score:.4f}, "
+              f"test ROC-AUC {metrics['roc_auc']:.4f}, {int(trials['stopped_early'].sum())} trials stopped early")
+        rows.append((len(X_train), grid_s, grid_fits, grid_score, halving_s, halving_fits, halving_score))
+
+    print(f"\n{'train rows':>11}{'grid s':>9}{'fits':>7}{'AUC':>8}{'halving s':>11}{'fits':>7}{'AUC':>8}{'speedup':>9}")
+    for n, grid_s, grid_fits, grid_auc, halving_s, halving_fits, halving_auc in rows:
+        print(f"{n:>11,}{grid_s:>9.1f}{grid_fits:>7}{grid_auc:>8.4f}{halving_s:>11.1f}{halving_fits:>7}"
+              f"{halving_auc:>8.4f}{grid_s / halving_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
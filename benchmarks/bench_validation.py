@@ -0,0 +1,132 @@
+"""
+Bulk validation: column-wise BulkValidator vs per-row pydantic, in customers per second.
+
+For each batch size (customers sampled from the Telco CSV, as JSON-decoded
+rows and columns) times:
+
+- pydantic rows + .dict()   the old /predict_batch: List[Customer], then .dict() per customer
+- pydantic rows             TypeAdapter(List[Customer]) into columns (CHURN_BULK_VALIDATION=0)
+- pydantic columns          CustomerColumns (/predict_batch/columns, CHURN_BULK_VALIDATION=0)
+- bulk rows / bulk columns  BulkValidator.validate -> typed arrays
+- bulk, 1% invalid          same, with every 100th customer carrying an unknown category
+
+then the scoring that follows: score_columns on the validated columns vs
+score_batch on the typed arrays (no per-value category lookups), and whole
+/predict_batch calls in-process with bulk validation on and off.
+
+    python benchmarks/bench_validation.py --batch-sizes 100 10000 100000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import warnings
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.chdir(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_suite import load_customers  # noqa: E402
+
+
+def best_seconds(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def pydantic_rows_dict(app_module, rows):
+    customers = app_module.CUSTOMER_LIST.validate_python(rows)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return [c.dict() for c in customers]
+
+
+def pydantic_rows(app_module, rows):
+    customers = app_module.CUSTOMER_LIST.validate_python(rows)
+    return {col: [getattr(c, col) for c in customers] for col in app_module.FEATURES}
+
+
+def expect_error(validator, payload):
+    from src.validation import BulkValidationError
+
+    try:
+        validator.validate(payload)
+    except BulkValidationError as e:
+        return e
+    raise AssertionError("batch should not have validated")
+
+
+async def post_batches(app, body, repeats):
+    times = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            response = await client.post("/predict_batch?probabilities_only=true", content=body,
+                                         headers={"content-type": "application/json"})
+            times.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=10, help="best of N per measurement")
+    args = parser.parse_args()
+
+    import api.app as app_module
+    from api import formats
+
+    app_module.cache = None
+    app_module.audit = None
+    app_module.drift = None
+    version = app_module.registry.get()
+    validator = version.validator
+    customers = load_customers()
+
+    for n in args.batch_sizes:
+        rows = [customers[i % len(customers)] for i in range(n)]
+        columns = {col: [row[col] for row in rows] for col in rows[0]}
+        invalid = [dict(row, PaymentMethod="Cash") if i % 100 == 0 else row for i, row in enumerate(rows)]
+        repeats = max(1, args.repeats if n <= 10_000 else args.repeats // 5)
+
+        cases = {
+            "pydantic rows + .dict()": lambda: pydantic_rows_dict(app_module, rows),
+            "pydantic rows": lambda: pydantic_rows(app_module, rows),
+            "pydantic columns": lambda: app_module.CustomerColumns.model_validate(columns),
+            "bulk rows": lambda: validator.validate(rows),
+            "bulk columns": lambda: validator.validate(columns),
+            "bulk rows, 1% invalid": lambda: expect_error(validator, invalid),
+        }
+        print(f"\n{n:,} customers ({repeats} runs, best)")
+        print(f"{'validation':<28}{'ms':>10}{'customers/s':>14}{'speedup':>9}")
+        base = None
+        for name, fn in cases.items():
+            seconds = best_seconds(fn, repeats)
+            base = base or seconds
+            print(f"{name:<28}{seconds * 1000:>10.2f}{n / seconds:>14,.0f}{base / seconds:>8.1f}x")
+
+        batch = validator.validate(columns)
+        plain = pydantic_rows(app_module, rows)
+        np.testing.assert_array_equal(version.score_batch(batch), version.score_columns(plain))
+        print(f"{'scoring':<28}{'ms':>10}")
+        print(f"{'score_columns (lists)':<28}{best_seconds(lambda: version.score_columns(plain), repeats) * 1000:>10.2f}")
+        print(f"{'score_batch (typed arrays)':<28}{best_seconds(lambda: version.score_batch(batch), repeats) * 1000:>10.2f}")
+
+        body = formats.dumps(rows)
+        print(f"{'/predict_batch (JSON rows)':<28}{'ms':>10}")
+        for enabled in (False, True):
+            app_module.BULK_VALIDATION = enabled
+            seconds = asyncio.run(post_batches(app_module.app, body, repeats))
+            print(f"{'bulk validation ' + ('on' if enabled else 'off'):<28}{seconds * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Keeps the repo root on sys.path so tests can import `src.*` and `api.*`
+# (and joblib can unpickle src.preprocessing.DataCleaner) under plain `pytest`.
@@ -3,6 +3,16 @@ import mlflow           # Main MLflow library - "Experiment Tracker"
 import mlflow.sklearn   # Special module for sklearn models
 from sklearn.metrics import roc_auc_score, recall_score, precision_score
 import pandas as pd
+import numpy as np
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Where runs are stored (the 'mlflow ui --backend-store-uri' to point at)
+TRACKING_URI = "sqlite:///mlflow.db"
 
 # ========== MAIN TRACKING FUNCTION ==========
 def track_experiment(model, model_name, X_train, X_test, Y_train, Y_test, params):
@@ -18,8 +28,8 @@ def track_experiment(model, model_name, X_train, X_test, Y_train, Y_test, params
     - params: Dictionary of model settings (e.g., {'max_iter': 1000})
     """
     
- ========== ADD THIS INSIDE HERE TOO JUST TO MAKE SURE IT SAVES ==========
-    mlflow.set_tracking_uri("sqlite:///mlflow.db")
+    # ========== ADD THIS INSIDE HERE TOO JUST TO MAKE SURE IT SAVES ==========
+    mlflow.set_tracking_uri(TRACKING_URI)
     
     #  START tracking a new "experiment run"
     # Everything inside this block gets logged to MLflow
@@ -37,20 +47,9 @@ def track_experiment(model, model_name, X_train, X_test, Y_train, Y_test, params
         model.fit(X_train, Y_train)
         
 
-     # ========== STEP 3: MAKE PREDICTIONS ==========
-        # Get predictions from test set
-        Y_pred = model.predict(X_test)  # Binary predictions (0 or 1)
-        Y_proba = model.predict_proba(X_test)[:, 1]  # Probabilities (0.0 to 1.0)
-        
-
-        # ========== STEP 4: CALCULATE METRICS ==========
-        # Calculate how GOOD the model is
-        metrics = {
-            'roc_auc': roc_auc_score(Y_test, Y_proba),      # Overall skill (0-1)
-            'recall': recall_score(Y_test, Y_pred),         # % of churners caught
-            'precision': precision_score(Y_test, Y_pred),   # % of flags that were correct
-            'accuracy': (Y_pred == Y_test).mean()           # % of all correct predictions
-        }
+     # ========== STEP 3 + 4: PREDICT AND CALCULATE METRICS ==========
+        # Calculate how GOOD the model is (test set is scored once)
+        metrics = score_model(model, X_test, Y_test)
         # the important "GRADES" for your model
 
 
@@ -77,6 +76,21 @@ def track_experiment(model, model_name, X_train, X_test, Y_train, Y_test, params
 
 
 
+def score_model(model, X_test, Y_test):
+    """
+    Metrics from ONE predict_proba pass over the test set
+    (for a binary classifier, predict() is just probability > 0.5)
+    """
+    Y_proba = model.predict_proba(X_test)[:, 1]  # Probabilities (0.0 to 1.0)
+    Y_pred = model.classes_[(Y_proba > 0.5).astype(int)]  # Binary predictions (0 or 1)
+    return {
+        'roc_auc': roc_auc_score(Y_test, Y_proba),      # Overall skill (0-1)
+        'recall': recall_score(Y_test, Y_pred),         # % of churners caught
+        'precision': precision_score(Y_test, Y_pred),   # % of flags that were correct
+        'accuracy': (Y_pred == np.asarray(Y_test)).mean()  # % of all correct predictions
+    }
+
+
 # ========== BONUS: SIMPLE COMPARISON FUNCTION ==========
 def compare_models(models_dict, X_train, X_test, y_train, y_test):
     """
@@ -131,6 +145,160 @@ def compare_models(models_dict, X_train, X_test, y_train, y_test):
 
 
 
+# ========== PARALLEL COMPARISON (BIG DATA / MANY MODELS) ==========
+DEFAULT_CACHE_DIR = "feature_cache"
+
+
+def _fingerprint(*objects):
+    """Content hash of data frames / arrays / anything with a stable repr"""
+    digest = hashlib.sha256()
+    for obj in objects:
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(obj, index=False).values.tobytes())
+            digest.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        elif isinstance(obj, np.ndarray):
+            digest.update(np.ascontiguousarray(obj).tobytes())
+            digest.update(repr((obj.dtype, obj.shape)).encode())
+        elif hasattr(obj, 'get_params'):
+            # every nested setting (a plain repr of a long pipeline is abbreviated)
+            digest.update(repr(sorted(obj.get_params(deep=True).items(), key=lambda kv: kv[0])).encode())
+        else:
+            digest.update(repr(obj).encode())
+    return digest.hexdigest()[:16]
+
+
+def cache_features(X_train, X_test, y_train, y_test, preprocessor=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Preprocess ONCE and save the train/test matrices as .npy files
+    - preprocessor: fitted on X_train only (no leakage); None = X is already processed
+    - Cached by content: the same data + preprocessor settings reuse the files
+      (on a cache hit the preprocessor is still fitted, but nothing is transformed or written)
+    Returns {'X_train': path, 'X_test': path, 'y_train': path, 'y_test': path}
+    """
+    key = _fingerprint(X_train, X_test, y_train, y_test, preprocessor)
+    folder = os.path.join(cache_dir, key)
+    paths = {part: os.path.join(folder, f"{part}.npy") for part in ('X_train', 'X_test', 'y_train', 'y_test')}
+    if all(os.path.exists(path) for path in paths.values()):
+        if preprocessor is not None:
+            preprocessor.fit(X_train)  # callers may reuse it, e.g. to build the serving pipeline
+        return paths
+
+    if preprocessor is not None:
+        X_train = preprocessor.fit_transform(X_train)
+        X_test = preprocessor.transform(X_test)
+
+    os.makedirs(folder, exist_ok=True)
+    arrays = {'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test}
+    for part, array in arrays.items():
+        if hasattr(array, 'toarray'):  # sparse output -> dense file that can be memory-mapped
+            array = array.toarray()
+        # Write under a temp name first so a crash never leaves half a matrix in the cache
+        tmp_path = paths[part] + ".tmp.npy"
+        np.save(tmp_path, np.asarray(array))
+        os.replace(tmp_path, paths[part])
+    return paths
+
+
+def _fit_and_score(name, model, paths, model_dir=None):
+    """
+    Worker: memory-map the cached matrices, fit, score and (optionally) save the
+    MLflow model files. Nothing here touches the tracking database.
+    """
+    X_train, X_test, y_train, y_test = (np.load(paths[part], mmap_mode='r')
+                                        for part in ('X_train', 'X_test', 'y_train', 'y_test'))
+    # The pool already uses every core; a model using all of them too would oversubscribe
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    metrics = score_model(model, X_test, y_test)
+
+    # The slow part of log_model (pip requirements inference) runs here, in parallel
+    local_model_path = None
+    if model_dir is not None:
+        local_model_path = os.path.join(model_dir, name)
+        mlflow.sklearn.save_model(model, local_model_path)
+    return name, model, metrics, fit_seconds, local_model_path
+
+
+def _log_run(client, name, params, metrics, local_model_path=None):
+    """One run = params + metrics in a single log_batch call (+ the saved model files)"""
+    from mlflow.entities import Metric, Param
+
+    with mlflow.start_run(run_name=name) as run:
+        timestamp = int(time.time() * 1000)
+        client.log_batch(
+            run.info.run_id,
+            metrics=[Metric(key, float(value), timestamp, 0) for key, value in metrics.items()],
+            params=[Param(key, str(value)) for key, value in params.items()]
+        )
+        if local_model_path is not None:
+            # Same layout as mlflow.sklearn.log_model(model, name): runs:/<run_id>/<name>
+            client.log_artifacts(run.info.run_id, local_model_path, artifact_path=name)
+
+
+def compare_models_parallel(models_dict, X_train, X_test, y_train, y_test, preprocessor=None,
+                            n_jobs=None, cache_dir=DEFAULT_CACHE_DIR, log_model=True):
+    """
+    Same results as compare_models, built for big data / many models:
+    - Preprocessing runs ONCE; the train/test matrices are cached on disk and
+      memory-mapped by every worker (no copy of the data per process)
+    - Model fits run in parallel on a process pool (n_jobs processes, default: all cores)
+    - Only THIS process writes to MLflow, one batched call per run, so the
+      workers never fight over the SQLite lock
+
+    Returns (comparison_df, fitted_models)
+    """
+    print(" COMPARING MODELS WITH MLFLOW (parallel)")
+    print("="*50)
+    if not models_dict:
+        print(" No models to compare")
+        return pd.DataFrame(), {}
+
+    start = time.perf_counter()
+    paths = cache_features(X_train, X_test, y_train, y_test, preprocessor, cache_dir)
+    print(f" Features ready in {time.perf_counter() - start:.1f}s ({os.path.dirname(paths['X_train'])})")
+
+    from mlflow.tracking import MlflowClient
+
+    mlflow.set_tracking_uri(TRACKING_URI)
+    client = MlflowClient(TRACKING_URI)
+
+    results = {}
+    fitted = {}
+    n_jobs = n_jobs or os.cpu_count() or 1
+    model_dir = tempfile.mkdtemp(prefix="mlflow_models_") if log_model else None
+    try:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(models_dict))) as pool:
+            futures = [pool.submit(_fit_and_score, name, model, paths, model_dir)
+                       for name, model in models_dict.items()]
+            # Runs are logged here, one at a time, as the fits finish
+            for future in as_completed(futures):
+                name, model, metrics, fit_seconds, local_model_path = future.result()
+                params = {
+                    'model_type': type(model).__name__,
+                    'model_name': name
+                }
+                _log_run(client, name, params, metrics, local_model_path)
+                print(f" {name}: ROC-AUC = {metrics['roc_auc']:.3f} (fit {fit_seconds:.1f}s)")
+                results[name] = metrics
+                fitted[name] = model
+    finally:
+        if model_dir is not None:
+            shutil.rmtree(model_dir, ignore_errors=True)
+
+    comparison_df = pd.DataFrame(results).T.sort_values('roc_auc', ascending=False)
+    print("\nRanked by ROC-AUC (higher is better):")
+    print(comparison_df[['roc_auc', 'recall', 'precision']].round(3))
+    print(f"\n WINNER: {comparison_df.index[0]} (ROC-AUC: {comparison_df.iloc[0]['roc_auc']:.3f})")
+    print(f" Total time: {time.perf_counter() - start:.1f}s")
+    return comparison_df, fitted
+
+
+
+
 # ========== HOW TO VIEW RESULTS ==========
 def show_mlflow_instructions():
     """
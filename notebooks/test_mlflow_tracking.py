@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+import mlflow_tracking
+from src.preprocessing import create_preprocessing_pipeline
+
+DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+@pytest.fixture(scope="module")
+def split():
+    data = pd.read_csv(DATA_PATH).head(600)
+    y = (data.pop("Churn") == "Yes").astype(int)
+    return train_test_split(data, y, test_size=0.25, random_state=0, stratify=y)
+
+
+def two_models():
+    return {"lr": LogisticRegression(max_iter=1000), "tree": DecisionTreeClassifier(max_depth=3, random_state=0)}
+
+
+@pytest.fixture
+def tracking_uri(tmp_path, monkeypatch):
+    """A throwaway tracking database (and ./mlruns artifact store) under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    uri = f"sqlite:///{tmp_path}/mlflow.db"
+    monkeypatch.setattr(mlflow_tracking, "TRACKING_URI", uri)
+    return uri
+
+
+def test_a_cache_hit_reuses_the_features_and_still_fits_the_preprocessor(split, tmp_path):
+    X_train, X_test, y_train, y_test = split
+    cache_dir = str(tmp_path / "cache")
+    paths = mlflow_tracking.cache_features(X_train, X_test, y_train, y_test, create_preprocessing_pipeline(),
+                                           cache_dir)
+    written = {part: os.stat(path).st_mtime_ns for part, path in paths.items()}
+
+    preprocessor = create_preprocessing_pipeline()
+    assert mlflow_tracking.cache_features(X_train, X_test, y_train, y_test, preprocessor, cache_dir) == paths
+    assert {part: os.stat(path).st_mtime_ns for part, path in paths.items()} == written  # nothing rewritten
+    np.testing.assert_array_equal(preprocessor.transform(X_test), np.load(paths["X_test"]))
+
+    # Other preprocessor settings are another cache entry
+    other = mlflow_tracking.cache_features(X_train, X_test, y_train, y_test,
+                                           create_preprocessing_pipeline(encoding="sparse"), cache_dir)
+    assert other["X_train"] != paths["X_train"]
+
+
+def test_parallel_and_serial_runs_log_the_same_metrics(split, tmp_path, tracking_uri):
+    from mlflow.tracking import MlflowClient
+
+    X_train, X_test, y_train, y_test = split
+    preprocessor = create_preprocessing_pipeline()
+    serial = mlflow_tracking.compare_models(two_models(), preprocessor.fit_transform(X_train),
+                                            preprocessor.transform(X_test), y_train, y_test)
+    parallel, fitted = mlflow_tracking.compare_models_parallel(
+        two_models(), X_train, X_test, y_train, y_test, preprocessor=create_preprocessing_pipeline(), n_jobs=2,
+        cache_dir=str(tmp_path / "cache"), log_model=False)
+
+    assert sorted(fitted) == ["lr", "tree"]
+    pd.testing.assert_frame_equal(parallel.sort_index(), serial.sort_index(), check_exact=False, rtol=1e-12)
+
+    logged = {}
+    for run in MlflowClient(tracking_uri).search_runs(["0"]):
+        logged.setdefault(run.info.run_name, []).append(run.data.metrics)
+    assert sorted(logged) == ["lr", "tree"]
+    for name, (first, second) in logged.items():
+        assert first.keys() == {"roc_auc", "recall", "precision", "accuracy"}
+        assert first == pytest.approx(second, rel=1e-12), name
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sklearn.dummy import DummyClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+import mlflow_tracking
+import tuning
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+# 9 candidates; the constant model can't beat the others on any fold
+SEARCH_SPACE = {
+    'LogisticRegression': (LogisticRegression(max_iter=1000), {'C': [0.01, 0.1, 1.0, 10.0]}),
+    'DecisionTree': (DecisionTreeClassifier(random_state=0), {'max_depth': [2, 4, 6, None]}),
+    'Constant': (DummyClassifier(strategy='prior'), {}),
+}
+
+
+def test_each_rung_keeps_the_best_third_and_weak_candidates_stop_early(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(mlflow_tracking, "TRACKING_URI", f"sqlite:///{tmp_path}/mlflow.db")
+    data = pd.read_csv(DATA_PATH).head(1500)
+    y = (data.pop("Churn") == "Yes").astype(int)
+    X_train, X_test, y_train, y_test = train_test_split(data, y, test_size=0.2, random_state=0, stratify=y)
+
+    best, metrics, trials = tuning.successive_halving_search(
+        X_train, y_train, X_test, y_test, search_space=SEARCH_SPACE, cv=3, eta=3, min_samples=50,
+        early_stop_margin=0.0, n_jobs=2, cache_dir=str(tmp_path / "cache"))
+
+    # 9 -> 3 -> 1 candidates, on 3x more rows each rung, the last one on the full folds
+    rungs = [trials[trials.rung == rung] for rung in range(3)]
+    assert [len(rung) for rung in rungs] == [9, 3, 1] and trials.rung.max() == 2
+    budgets = [rung.n_samples.iloc[0] for rung in rungs]
+    assert budgets[1] == pytest.approx(budgets[0] * 3, abs=3) and budgets[2] == pytest.approx(budgets[1] * 3, abs=3)
+
+    # Survivors: the best 1/eta of the rung, candidates that stopped early ranked below the rest
+    for rung, next_rung in zip(rungs, rungs[1:]):
+        ranked = rung.assign(full=~rung.stopped_early).sort_values(["full", "cv_roc_auc"], ascending=False)
+        assert set(next_rung.candidate) == set(ranked.candidate[:len(next_rung)])
+
+    # The constant model stops after its first fold and doesn't survive the first rung
+    constant = trials[trials.model == "Constant"]
+    assert len(constant) == 1 and constant.stopped_early.iloc[0] and constant.folds_run.iloc[0] == 1
+    assert (rungs[0].stopped_early == (rungs[0].folds_run < 3)).all()
+    assert not rungs[-1].stopped_early.any()
+
+    winner = rungs[-1].iloc[0]
+    assert best.named_steps["classifier"].get_params().items() >= winner.params.items()
+    assert 0.5 < metrics["roc_auc"] <= 1
+
+
+def test_imports_as_a_package_from_the_repo_root():
+    # No notebooks/ on sys.path, as in `python -c "import notebooks.tuning"` from the repo root
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    subprocess.run([sys.executable, "-c", "import notebooks.tuning"], cwd=ROOT, env=env, check=True)
@@ -0,0 +1,208 @@
+# ========== IMPORTS ==========
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mlflow
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.pipeline import Pipeline
+
+# Needs the repo root on sys.path (for src): either import it as notebooks.tuning from the
+# repo root, or from a notebook in notebooks/ after adding the root (like 03_modeling.ipynb)
+try:
+    import mlflow_tracking  # notebooks/ on sys.path: notebooks, benchmarks
+except ModuleNotFoundError:
+    from notebooks import mlflow_tracking
+from src.preprocessing import create_preprocessing_pipeline
+
+# ========== WHAT TO SEARCH ==========
+# {name: (base model, param grid)} - every grid combination is one candidate
+DEFAULT_SEARCH_SPACE = {
+    'LogisticRegression': (
+        LogisticRegression(class_weight='balanced', max_iter=1000, random_state=42),
+        {'C': [0.01, 0.03, 0.1, 0.3, 1.0, 3.0]}
+    ),
+    'RandomForest': (
+        RandomForestClassifier(class_weight='balanced', random_state=42),
+        {'n_estimators': [100, 300], 'max_depth': [6, 10, 14, None], 'min_samples_leaf': [1, 5, 20]}
+    ),
+    'HistGradientBoosting': (
+        # early_stopping: each fit stops adding trees once its validation score stalls
+        HistGradientBoostingClassifier(class_weight='balanced', early_stopping=True, random_state=42),
+        {'learning_rate': [0.03, 0.1], 'max_leaf_nodes': [15, 31, 63], 'l2_regularization': [0.0, 1.0]}
+    ),
+}
+
+
+def make_candidates(search_space):
+    """Flatten the search space into a list of (model name, base model, params)"""
+    return [(name, model, params)
+            for name, (model, grid) in search_space.items()
+            for params in ParameterGrid(grid)]
+
+
+# ========== ONE TRIAL (runs in a worker process) ==========
+def _evaluate(candidate_id, model, params, paths, n_samples, random_state):
+    """
+    Fit one candidate on one CV fold, using the first n_samples rows of a fixed
+    shuffle of the fold's training set, and return its validation ROC-AUC.
+    The fold's matrices were preprocessed once and are memory-mapped here.
+    """
+    X_train, X_val, y_train, y_val = (np.load(paths[part], mmap_mode='r')
+                                      for part in ('X_train', 'X_test', 'y_train', 'y_test'))
+    rows = np.random.default_rng(random_state).permutation(len(y_train))[:n_samples]
+    rows.sort()
+
+    model = clone(model).set_params(**params)
+    # The pool already uses every core
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+
+    start = time.perf_counter()
+    model.fit(X_train[rows], y_train[rows])
+    score = roc_auc_score(y_val, model.predict_proba(X_val)[:, 1])
+    return candidate_id, score, time.perf_counter() - start
+
+
+# ========== SUCCESSIVE HALVING ==========
+def successive_halving_search(X_train, y_train, X_test, y_test, search_space=DEFAULT_SEARCH_SPACE,
+                              cv=5, eta=3, min_samples=500, early_stop_margin=0.02,
+                              n_jobs=None, cache_dir=mlflow_tracking.DEFAULT_CACHE_DIR, random_state=42,
+                              run_name='successive_halving'):
+    """
+    Find the best model + settings without training every candidate on all the data
+
+    How it works:
+    - Each CV fold gets ONE fitted preprocessor (create_preprocessing_pipeline),
+      cached on disk and shared by every candidate (nothing is refit per candidate)
+    - Rung 1: every candidate is trained on a small sample of each fold
+    - Each next rung keeps the best 1/eta candidates and gives them eta x more rows,
+      until the survivors are trained on the full folds
+    - Early stopping inside a rung: after each fold, a candidate whose running mean
+      ROC-AUC is more than early_stop_margin below the cut-off skips its remaining folds
+    - Fits run on a process pool (all cores by default); every trial is logged to
+      MLflow as a child run of one search run
+    - The winner is refit on the full training set and logged with track_experiment
+
+    Returns (best pipeline, test metrics, trials DataFrame)
+    """
+    print(" SUCCESSIVE HALVING SEARCH")
+    print("="*50)
+    start = time.perf_counter()
+
+    candidates = make_candidates(search_space)
+    y_train = np.asarray(y_train)
+
+    # ========== STEP 1: PREPROCESS EACH FOLD ONCE ==========
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state).split(X_train, y_train)
+    fold_paths = [
+        mlflow_tracking.cache_features(X_train.iloc[train_idx], X_train.iloc[val_idx],
+                                       y_train[train_idx], y_train[val_idx],
+                                       create_preprocessing_pipeline(), cache_dir)
+        for train_idx, val_idx in folds
+    ]
+    fold_rows = min(len(np.load(paths['y_train'], mmap_mode='r')) for paths in fold_paths)
+    print(f" {cv} fold preprocessors ready in {time.perf_counter() - start:.1f}s")
+
+    # ========== STEP 2: PLAN THE RUNGS ==========
+    # Enough rungs to get down to ~1 candidate, starting from >= min_samples rows
+    n_rungs = max(1, min(math.floor(math.log(len(candidates), eta)) + 1,
+                         math.floor(math.log(fold_rows / min_samples, eta)) + 1))
+    budgets = [int(fold_rows / eta ** (n_rungs - 1 - rung)) for rung in range(n_rungs)]
+    print(f" {len(candidates)} candidates, rungs of {budgets} rows per fold")
+
+    from mlflow.tracking import MlflowClient
+
+    mlflow.set_tracking_uri(mlflow_tracking.TRACKING_URI)
+    client = MlflowClient(mlflow_tracking.TRACKING_URI)
+    trials = []
+    active = list(range(len(candidates)))
+
+    with mlflow.start_run(run_name=run_name) as search_run, \
+            ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1) as pool:
+        for rung, n_samples in enumerate(budgets):
+            last_rung = rung == len(budgets) - 1
+            keep = len(active) if last_rung else max(1, len(active) // eta)
+            scores = {c: [] for c in active}
+            fit_seconds = {c: 0.0 for c in active}
+            running = list(active)
+
+            # ========== STEP 3: FOLD BY FOLD, WITH EARLY STOPPING ==========
+            for fold, paths in enumerate(fold_paths):
+                futures = [pool.submit(_evaluate, c, candidates[c][1], candidates[c][2], paths,
+                                       n_samples, random_state + fold) for c in running]
+                for future in futures:
+                    c, score, seconds = future.result()
+                    scores[c].append(score)
+                    fit_seconds[c] += seconds
+
+                if not last_rung and fold < len(fold_paths) - 1 and len(running) > keep:
+                    means = sorted((np.mean(scores[c]) for c in running), reverse=True)
+                    cutoff = means[keep - 1] - early_stop_margin
+                    running = [c for c in running if np.mean(scores[c]) >= cutoff]
+
+            # ========== STEP 4: LOG THE RUNG'S TRIALS ==========
+            for c in active:
+                name, _, params = candidates[c]
+                trial = {
+                    'candidate': c, 'model': name, 'params': params, 'rung': rung,
+                    'n_samples': n_samples, 'folds_run': len(scores[c]),
+                    'stopped_early': len(scores[c]) < len(fold_paths),
+                    'cv_roc_auc': float(np.mean(scores[c])), 'fit_seconds': fit_seconds[c]
+                }
+                trials.append(trial)
+                _log_trial(client, search_run, trial)
+
+            # ========== STEP 5: KEEP THE BEST 1/eta ==========
+            # Candidates that stopped early rank below every candidate that ran all folds
+            ranked = sorted(active, key=lambda c: (len(scores[c]) == len(fold_paths), np.mean(scores[c])),
+                            reverse=True)
+            active = ranked[:keep]
+            best = ranked[0]
+            print(f" Rung {rung + 1}: {len(ranked)} candidates on {n_samples:,} rows, "
+                  f"best {candidates[best][0]} {candidates[best][2]} "
+                  f"(CV ROC-AUC {np.mean(scores[best]):.3f})")
+
+        mlflow.log_params({'n_candidates': len(candidates), 'cv': cv, 'eta': eta, 'rungs': len(budgets)})
+        mlflow.log_metric('search_seconds', time.perf_counter() - start)
+
+    # ========== STEP 6: REFIT THE WINNER AND TRACK IT ==========
+    name, model, params = candidates[best]
+    preprocessor = create_preprocessing_pipeline()
+    X_train_processed = preprocessor.fit_transform(X_train)
+    X_test_processed = preprocessor.transform(X_test)
+    model = clone(model).set_params(**params)
+    model, metrics = mlflow_tracking.track_experiment(model, f"{name}_tuned", X_train_processed, X_test_processed,
+                                                      y_train, y_test, {'model': name, **params})
+    print(f"\n BEST: {name} {params} - total search time {time.perf_counter() - start:.1f}s")
+
+    best_pipeline = Pipeline(steps=[('preprocessing', preprocessor), ('classifier', model)])
+    return best_pipeline, metrics, pd.DataFrame(trials)
+
+
+def _log_trial(client, search_run, trial):
+    """One child run per (candidate, rung), written in a single log_batch call"""
+    from mlflow.entities import Metric, Param
+    from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+
+    run = client.create_run(search_run.info.experiment_id,
+                            run_name=f"{trial['model']}_rung{trial['rung'] + 1}_c{trial['candidate']}",
+                            tags={MLFLOW_PARENT_RUN_ID: search_run.info.run_id})
+    timestamp = int(time.time() * 1000)
+    params = {'model': trial['model'], 'rung': trial['rung'], 'n_samples': trial['n_samples'],
+              'stopped_early': trial['stopped_early'], **trial['params']}
+    client.log_batch(
+        run.info.run_id,
+        metrics=[Metric('cv_roc_auc', trial['cv_roc_auc'], timestamp, 0),
+                 Metric('folds_run', trial['folds_run'], timestamp, 0),
+                 Metric('fit_seconds', trial['fit_seconds'], timestamp, 0)],
+        params=[Param(key, str(value)) for key, value in params.items()]
+    )
+    client.set_terminated(run.info.run_id)
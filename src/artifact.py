@@ -0,0 +1,367 @@
+"""
+Model artifacts as a versioned manifest plus raw NumPy arrays, instead of pickles.
+
+A joblib pickle has to be fully unpickled by every process, needs the exact
+sklearn version that wrote it and breaks when a pickled class (e.g.
+src.preprocessing.DataCleaner) moves. An exported model is a directory:
+
+    <name>.model/
+        manifest.json              schema version, source file + sha256, feature layout,
+                                   model type, and dtype/shape of every array
+        scaler_mean.npy            StandardScaler statistics (numeric columns)
+        scaler_scale.npy
+        vocabulary.npy             all one-hot categories, fixed-width unicode
+        vocabulary_offsets.npy     where each categorical column's categories start
+        vocabulary_features.npy    output column of each category (-1: dropped baseline)
+        classes.npy
+        coef.npy                   linear models (LogisticRegression, SGD log_loss)
+        tree_*.npy                 tree models (DecisionTree / RandomForest / ExtraTrees,
+                                   HistGradientBoosting): every tree's nodes concatenated
+
+Loading memory-maps the arrays read-only, so it takes milliseconds, imports
+neither sklearn nor pandas, and every process serving the same file shares one
+physical copy through the page cache.
+
+    python -m src.artifact export models/churn_pipeline.pkl      # -> models/churn_pipeline.model/
+    python -m src.artifact export notebooks/mlruns/0/models/<id>/artifacts/model.pkl \\
+        --preprocessing models/churn_pipeline.pkl --output models/<name>.model
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+from scipy.special import expit
+
+from src.scoring import CompiledScorer, _sha256
+
+# Bump when the manifest or the array layout changes
+SCHEMA_VERSION = 1
+ARTIFACT_SUFFIX = ".model"
+MANIFEST = "manifest.json"
+
+def artifact_path(model_path):
+    """models/churn_pipeline.pkl -> models/churn_pipeline.model"""
+    return os.path.splitext(model_path)[0] + ARTIFACT_SUFFIX
+
+
+def is_artifact(path):
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+# ========== TREE MODELS ==========
+class TreeEnsemble:
+    """
+    Decision trees as flat node arrays, all trees concatenated (children are absolute
+    node numbers; a leaf is its own left and right child). combine='mean' averages leaf probabilities (random
+    forests); combine='logit_sum' adds leaf values to `baseline` (gradient boosting).
+    """
+
+    def __init__(self, roots, feature, threshold, left, right, value, missing_left,
+                 combine, baseline=0.0, float32_inputs=False, max_depth=None):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.missing_left = missing_left
+        self.combine = combine
+        self.baseline = float(baseline)
+        # sklearn's DecisionTree* compare float32 copies of the features with float64 thresholds
+        self.float32_inputs = float32_inputs
+        self.max_depth = max_depth
+        self.any_missing_left = bool(np.any(missing_left))
+
+    def leaf_values(self, X):
+        """Value of the leaf every row ends in, per tree: (rows, trees)"""
+        if self.float32_inputs:
+            X = X.astype(np.float32)
+        n, n_trees = len(X), len(self.roots)
+        flat = np.ascontiguousarray(X).ravel()
+        # One (row, tree) path per entry; paths that reached a leaf drop out of `active`
+        nodes = np.tile(np.asarray(self.roots, dtype=np.intp), n)
+        row_start = np.repeat(np.arange(n, dtype=np.intp) * X.shape[1], n_trees)
+        active = np.arange(n * n_trees)
+        while active.size:
+            current = nodes[active]
+            values = flat[row_start[active] + self.feature[current]]
+            go_left = values <= self.threshold[current]
+            if self.any_missing_left:
+                go_left |= np.isnan(values) & self.missing_left[current]
+            following = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = following
+            active = active[following != current]  # leaves point to themselves
+        return self.value[nodes].reshape(n, n_trees)
+
+    def predict_proba(self, X):
+        """Churn probability per row of a feature matrix (same summation order as sklearn)"""
+        values = self.leaf_values(X)
+        if self.combine == 'mean':
+            total = np.zeros(len(X))
+            for t in range(values.shape[1]):
+                total += values[:, t]
+            return total / values.shape[1]
+        total = np.full(len(X), self.baseline)
+        for t in range(values.shape[1]):
+            total += values[:, t]
+        return expit(total)
+
+    # ========== FROM SKLEARN ==========
+    @classmethod
+    def from_estimator(cls, model):
+        """Flatten a fitted binary DecisionTree / RandomForest / ExtraTrees / HistGradientBoosting classifier"""
+        from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+        from sklearn.tree import DecisionTreeClassifier
+
+        if len(getattr(model, 'classes_', ())) != 2:
+            raise TypeError(f"Expected a binary classifier, got {type(model).__name__}")
+        if isinstance(model, DecisionTreeClassifier):
+            return cls._from_sklearn_trees([model])
+        if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+            return cls._from_sklearn_trees(model.estimators_)
+        if isinstance(model, HistGradientBoostingClassifier):
+            return cls._from_hist_gradient_boosting(model)
+        raise TypeError(f"Cannot export {type(model).__name__}: expected a linear or tree model")
+
+    @classmethod
+    def _from_sklearn_trees(cls, estimators):
+        parts, depth = [], 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1)
+            totals[totals == 0.0] = 1.0
+            leaf = tree.children_left == -1
+            parts.append((tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                          counts[:, 1] / totals, np.zeros(tree.node_count, dtype=bool), leaf))
+            depth = max(depth, tree.max_depth)
+        return cls._concatenate(parts, 'mean', 0.0, True, depth)
+
+    @classmethod
+    def _from_hist_gradient_boosting(cls, model):
+        parts, depth = [], 0
+        for (predictor,) in model._predictors:
+            nodes = predictor.nodes
+            if nodes['is_categorical'].any():
+                raise TypeError("HistGradientBoosting with categorical splits cannot be exported")
+            leaf = nodes['is_leaf'].astype(bool)
+            parts.append((nodes['feature_idx'], nodes['num_threshold'], nodes['left'], nodes['right'],
+                          nodes['value'], nodes['missing_go_to_left'].astype(bool), leaf))
+            depth = max(depth, int(nodes['depth'].max()))
+        baseline = float(np.ravel(model._baseline_prediction)[0])
+        return cls._concatenate(parts, 'logit_sum', baseline, False, depth)
+
+    @classmethod
+    def _concatenate(cls, parts, combine, baseline, float32_inputs, max_depth):
+        roots, features, thresholds, lefts, rights, values, missing = [], [], [], [], [], [], []
+        offset = 0
+        for feature, threshold, left, right, value, missing_left, leaf in parts:
+            roots.append(offset)
+            features.append(np.where(leaf, 0, feature).astype(np.int32))
+            thresholds.append(np.asarray(threshold, dtype=np.float64))
+            ids = np.arange(offset, offset + len(leaf))
+            lefts.append(np.where(leaf, ids, np.asarray(left, dtype=np.int64) + offset).astype(np.int32))
+            rights.append(np.where(leaf, ids, np.asarray(right, dtype=np.int64) + offset).astype(np.int32))
+            values.append(np.asarray(value, dtype=np.float64))
+            missing.append(missing_left)
+            offset += len(leaf)
+        return cls(np.array(roots, dtype=np.int32), np.concatenate(features), np.concatenate(thresholds),
+                   np.concatenate(lefts), np.concatenate(rights), np.concatenate(values), np.concatenate(missing),
+                   combine, baseline, float32_inputs, max_depth)
+
+    def arrays(self):
+        return {"tree_roots": self.roots, "tree_feature": self.feature, "tree_threshold": self.threshold,
+                "tree_left": self.left, "tree_right": self.right, "tree_value": self.value,
+                "tree_missing_left": self.missing_left}
+
+
+class TreeScorer(CompiledScorer):
+    """CompiledScorer whose model is a TreeEnsemble instead of a coefficient vector"""
+
+    linear = False
+
+    def __init__(self, num_cols, mean, scale, cat_tables, trees, classes, feature_names):
+        # No coefficients: every method that used them is overridden below
+        super().__init__(num_cols, mean, scale, cat_tables, np.zeros(len(feature_names)), 0.0,
+                         classes, feature_names)
+        self.trees = trees
+
+    def decision_one(self, record):
+        p = self.predict_proba_one(record)
+        return float(np.log(p / (1 - p))) if 0 < p < 1 else float(np.sign(p - 0.5) * np.inf)
+
+    def predict_proba_one(self, record):
+        return float(self.trees.predict_proba(self.transform_one(record)[None, :])[0])
+
+    def predict_features_one(self, x):
+        probability = float(self.trees.predict_proba(x[None, :])[0])
+        return self.classes[int(probability > 0.5)], probability
+
+    def decision_function(self, columns):
+        p = self.predict_proba(columns)
+        with np.errstate(divide='ignore'):
+            return np.log(p) - np.log1p(-p)
+
+    def predict_proba_features(self, X):
+        return self.trees.predict_proba(X)
+
+
+# ========== EXPORT ==========
+def export_pipeline(model, path, source_path=None, preprocessing=None):
+    """
+    Write a fitted Pipeline(DataCleaner, ColumnTransformer, model) as an artifact
+    directory at `path` (replaced atomically if it exists). A bare classifier trained
+    on the ColumnTransformer output (e.g. an MLflow run's model.pkl) is exported with
+    the cleaner and preprocessor of the `preprocessing` pipeline. Returns the manifest.
+    """
+    import sklearn
+
+    from src.scoring import compile_preprocessing
+
+    if preprocessing is not None:
+        num_cols, means, scales, cat_tables, feature_names, _ = compile_preprocessing(preprocessing)
+    else:
+        num_cols, means, scales, cat_tables, feature_names, model = compile_preprocessing(model)
+    n_features = getattr(model, 'n_features_in_', len(feature_names))
+    if n_features != len(feature_names):
+        raise TypeError(f"Model expects {n_features} features, the preprocessing produces {len(feature_names)}")
+
+    vocabulary, offsets, features = [], [0], []
+    for col, table, _ in cat_tables:
+        if not all(isinstance(category, str) for category in table):
+            raise TypeError(f"Categories of '{col}' must be strings to be exported")
+        vocabulary.extend(table)
+        features.extend(table.values())
+        offsets.append(len(vocabulary))
+    arrays = {
+        "scaler_mean": np.asarray(means, dtype=np.float64),
+        "scaler_scale": np.asarray(scales, dtype=np.float64),
+        "vocabulary": np.array(vocabulary, dtype=str),
+        "vocabulary_offsets": np.array(offsets, dtype=np.int64),
+        "vocabulary_features": np.array(features, dtype=np.int64),
+        "classes": _plain(np.asarray(model.classes_)),
+    }
+
+    if hasattr(model, 'coef_'):
+        if model.coef_.shape[0] != 1 or getattr(model, 'loss', 'log_loss') != 'log_loss':
+            raise TypeError(f"Linear models must be binary logistic models, got {type(model).__name__}")
+        arrays["coef"] = np.asarray(model.coef_[0], dtype=np.float64)
+        model_meta = {"type": "linear", "intercept": float(model.intercept_[0])}
+    else:
+        trees = TreeEnsemble.from_estimator(model)
+        arrays.update(trees.arrays())
+        model_meta = {"type": "trees", "combine": trees.combine, "baseline": trees.baseline,
+                      "float32_inputs": trees.float32_inputs, "max_depth": trees.max_depth,
+                      "n_trees": int(len(trees.roots))}
+    model_meta["estimator"] = type(model).__name__
+
+    manifest = {
+        "format": "churn-model",
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "source": os.path.abspath(source_path) if source_path else None,
+        "source_sha256": _sha256(source_path) if source_path else None,
+        "exported_with": {"sklearn": sklearn.__version__, "numpy": np.__version__},
+        "preprocessing": {
+            "num_cols": list(num_cols),
+            "categorical": [{"column": col, "strict": bool(strict)} for col, _, strict in cat_tables],
+            "feature_names": [str(name) for name in feature_names],
+        },
+        "model": model_meta,
+        "arrays": {name: {"file": f"{name}.npy", "dtype": array.dtype.str, "shape": list(array.shape)}
+                   for name, array in arrays.items()},
+    }
+
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    # Swap in: processes that still have the old arrays mapped keep reading them
+    old = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+# ========== LOAD (no sklearn needed) ==========
+def load_artifact(path, mmap=True):
+    """CompiledScorer (linear) or TreeScorer for an exported directory, arrays memory-mapped"""
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != "churn-model" or manifest.get("schema_version") != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported model artifact {manifest.get('format')!r} "
+                         f"schema {manifest.get('schema_version')} (expected {SCHEMA_VERSION})")
+
+    arrays = {}
+    for name, spec in manifest["arrays"].items():
+        array = np.load(os.path.join(path, spec["file"]), mmap_mode='r' if mmap else None, allow_pickle=False)
+        if array.dtype.str != spec["dtype"] or list(array.shape) != spec["shape"]:
+            raise ValueError(f"{spec['file']} is {array.dtype.str} {list(array.shape)}, "
+                             f"the manifest says {spec['dtype']} {spec['shape']}")
+        arrays[name] = array
+
+    layout = manifest["preprocessing"]
+    offsets = arrays["vocabulary_offsets"].tolist()
+    vocabulary = arrays["vocabulary"].tolist()
+    features = arrays["vocabulary_features"].tolist()
+    cat_tables = [
+        (spec["column"], dict(zip(vocabulary[start:end], features[start:end])), spec["strict"])
+        for spec, start, end in zip(layout["categorical"], offsets, offsets[1:])
+    ]
+    common = (layout["num_cols"], arrays["scaler_mean"], arrays["scaler_scale"], cat_tables)
+
+    model = manifest["model"]
+    if model["type"] == "linear":
+        return CompiledScorer(*common, arrays["coef"], model["intercept"], arrays["classes"],
+                              layout["feature_names"])
+    if model["type"] == "trees":
+        trees = TreeEnsemble(arrays["tree_roots"], arrays["tree_feature"], arrays["tree_threshold"],
+                             arrays["tree_left"], arrays["tree_right"], arrays["tree_value"],
+                             arrays["tree_missing_left"], model["combine"], model["baseline"],
+                             model["float32_inputs"], model["max_depth"])
+        return TreeScorer(*common, trees, arrays["classes"], layout["feature_names"])
+    raise ValueError(f"Unknown model type {model['type']!r} in {path}")
+
+
+def _plain(array):
+    """Object arrays (e.g. string class labels) as fixed-width unicode, loadable without pickle"""
+    return array.astype(str) if array.dtype == object else array
+
+
+# ========== CLI ==========
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export fitted churn pipelines as memory-mappable artifacts")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="pickled pipeline (or MLflow model.pkl) -> <name>.model/")
+    export.add_argument("model", nargs="+", help="joblib / cloudpickle files")
+    export.add_argument("--output", help="artifact directory (default: next to the model, .model suffix)")
+    export.add_argument("--preprocessing", help="pipeline whose cleaner + preprocessor a bare classifier uses")
+    args = parser.parse_args(argv)
+
+    import joblib
+
+    if args.output and len(args.model) > 1:
+        parser.error("--output only works with a single model")
+    preprocessing = joblib.load(args.preprocessing) if args.preprocessing else None
+    for model_path in args.model:
+        start = time.perf_counter()
+        output = args.output or artifact_path(model_path)
+        manifest = export_pipeline(joblib.load(model_path), output, source_path=model_path,
+                                   preprocessing=preprocessing)
+        size = sum(os.path.getsize(os.path.join(output, f)) for f in os.listdir(output))
+        print(f"Exported {manifest['model']['estimator']} ({manifest['model']['type']}) to {output} "
+              f"({size / 1024:.0f} KB, {time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
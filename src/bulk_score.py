@@ -0,0 +1,188 @@
+"""
+churn-score: bulk scoring of a customer extract with the saved pipeline.
+
+Reads CSV or Parquet in fixed-size chunks (never the whole file), scores the
+chunks across a process pool and writes customerID + churn probability,
+prediction and risk level to Parquet or CSV. At most `2 x workers` chunks are
+in flight, so peak memory is bounded by the chunk size, not the input size.
+
+    python -m src.bulk_score data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv scored.parquet --workers 4
+
+Parquet input/output needs pyarrow (pip install pyarrow); CSV works without it.
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.artifact import is_artifact, load_artifact
+from src.decision import DecisionPolicy
+from src.scoring import RISK_LABELS, CompiledScorer
+
+DEFAULT_MODEL = "models/churn_pipeline.pkl"
+DEFAULT_CHUNK_SIZE = 100_000
+ID_COL = 'customerID'
+CHURN_LABELS = np.array(['No Churn', 'Churn'])
+
+# Loaded once per worker process
+_model = None
+_decision = None
+
+
+# ========== MODEL ==========
+def load_model(model_path):
+    """Scorer for an exported .model directory, a .npz artifact or a compilable pipeline, else the pipeline itself"""
+    if is_artifact(model_path):
+        return load_artifact(model_path)
+    if model_path.endswith('.npz'):
+        return CompiledScorer.load(model_path)
+
+    import joblib
+
+    pipeline = joblib.load(model_path)
+    try:
+        return CompiledScorer.from_pipeline(pipeline)
+    except TypeError as e:
+        print(f"Compiled scorer unavailable, using sklearn pipeline: {e}")
+        return pipeline
+
+
+def _init_worker(model_path):
+    global _model, _decision
+    if _model is None:  # already inherited when the pool forks
+        _model = load_model(model_path)
+        _decision = DecisionPolicy.for_model(model_path)
+
+
+def score_chunk(chunk):
+    """Score one DataFrame chunk -> DataFrame of results (same row order)"""
+    if isinstance(_model, CompiledScorer):
+        probabilities = _model.predict_proba(chunk)
+    else:
+        probabilities = _model.predict_proba(chunk)[:, 1]
+
+    # Label and risk band from the model's thresholds file (src.decision), in one pass
+    labels, risks = _decision.decide(probabilities)
+    results = pd.DataFrame({
+        'churn_probability': probabilities,
+        'churn_prediction': CHURN_LABELS[labels],
+        'risk_level': RISK_LABELS[risks]
+    })
+    if ID_COL in chunk:
+        results.insert(0, ID_COL, np.asarray(chunk[ID_COL]))
+    return results
+
+
+# ========== INPUT / OUTPUT ==========
+def _is_parquet(path):
+    return path.endswith(('.parquet', '.pq'))
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit("Parquet input/output needs pyarrow: pip install pyarrow")
+
+
+def iter_chunks(path, chunk_size):
+    """Yield the input file as DataFrames of at most chunk_size rows"""
+    if _is_parquet(path):
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        # TotalCharges stays a string, blanks are handled by the scorer like DataCleaner does
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype={'TotalCharges': str},
+                               keep_default_na=False)
+
+
+class ResultWriter:
+    """Append result chunks to a Parquet or CSV file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self._writer = None
+        self._first = True
+        if self.parquet:
+            _require_pyarrow()
+
+    def write(self, results):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(results, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            results.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# ========== DRIVER ==========
+def score_chunks(input_path, model_path=DEFAULT_MODEL, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield score_chunk() results for input_path, in input order"""
+    workers = workers or os.cpu_count() or 1
+    # Load once in the parent so forked workers inherit it (spawned ones load it themselves)
+    _init_worker(model_path)
+    if workers == 1:
+        for chunk in iter_chunks(input_path, chunk_size):
+            yield score_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+        pending = deque()
+        for chunk in iter_chunks(input_path, chunk_size):
+            pending.append(pool.submit(score_chunk, chunk))
+            # Bound memory: never more than 2 chunks per worker in flight
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def score_file(input_path, output_path, model_path=DEFAULT_MODEL, workers=None,
+               chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score input_path into output_path; returns the number of rows scored"""
+    writer = ResultWriter(output_path)
+    rows = 0
+    try:
+        for results in score_chunks(input_path, model_path, workers, chunk_size):
+            writer.write(results)
+            rows += len(results)
+        return rows
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="churn-score", description="Bulk churn scoring for CSV / Parquet files")
+    parser.add_argument("input", help="CSV or Parquet customer extract")
+    parser.add_argument("output", help="output file (.parquet or .csv)")
+    parser.add_argument("--model", default=DEFAULT_MODEL,
+                        help="saved pipeline (.pkl), exported model (.model) or scorer (.npz)")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = score_file(args.input, args.output, args.model, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows:,} customers in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/sec) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
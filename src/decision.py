@@ -0,0 +1,244 @@
+"""
+Decision layer: churn probabilities -> label and risk band, in one pass.
+
+A model version is served with one DecisionPolicy: the probability from which
+a customer is labelled "Churn" and the edges of the risk bands. Both come from
+ONE np.searchsorted over the merged edges (bisect for a single customer), so
+the model is scored once, there is no per-customer if-chain, and the label and
+the band of a customer can never be decided by different comparisons.
+
+Each model version reads its policy from `<model>.thresholds.json` next to the
+model file. Without one the defaults apply: "Churn" from 0.5, risk bands
+< 0.4 Low, 0.4-0.7 Medium, >= 0.7 High. `tune` writes the file with the
+label threshold that minimises the expected cost of wrong labels on the
+training data, and reports the same for every model logged in the MLflow runs:
+
+    python -m src.decision tune models/churn_pipeline.pkl --false-negative-cost 5 --false-positive-cost 1
+"""
+import argparse
+import bisect
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+
+from src.scoring import RISK_LABELS, RISK_THRESHOLDS
+
+LABEL_THRESHOLD = 0.5
+THRESHOLDS_SUFFIX = ".thresholds.json"
+
+DEFAULT_DATA = "data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv"
+DEFAULT_MLFLOW_DB = "notebooks/mlflow.db"
+
+
+def thresholds_path(model_path):
+    """models/v2.pkl (or v2.model/, v2.npz) -> models/v2.thresholds.json"""
+    return os.path.splitext(str(model_path).rstrip("/"))[0] + THRESHOLDS_SUFFIX
+
+
+class DecisionPolicy:
+    """Label threshold + risk band edges of one model version"""
+
+    def __init__(self, threshold=LABEL_THRESHOLD, risk_thresholds=RISK_THRESHOLDS, source=None):
+        risk_thresholds = [float(t) for t in risk_thresholds]
+        if len(risk_thresholds) != len(RISK_LABELS) - 1 or risk_thresholds != sorted(risk_thresholds):
+            raise ValueError(f"Expected {len(RISK_LABELS) - 1} increasing risk thresholds, got {risk_thresholds}")
+        if not all(0.0 <= t <= 1.0 for t in [threshold, *risk_thresholds]):
+            raise ValueError(f"Thresholds must be probabilities, got {threshold} and {risk_thresholds}")
+        self.threshold = float(threshold)
+        self.risk_thresholds = risk_thresholds
+        self.source = source  # how the thresholds were chosen (see tune)
+
+        # Bin i of the merged edges holds probabilities in [edges[i - 1], edges[i]);
+        # every bin has one label and one risk band
+        self.edges = np.unique([self.threshold, *self.risk_thresholds])
+        lower = np.r_[-np.inf, self.edges]
+        self.bin_labels = (lower >= self.threshold).astype(np.int8)
+        self.bin_risks = np.searchsorted(self.risk_thresholds, lower, side='right').astype(np.int8)
+        # Plain lists for the one-customer path (no NumPy call per request)
+        self._edges = self.edges.tolist()
+        self._labels = self.bin_labels.tolist()
+        self._risks = RISK_LABELS[self.bin_risks].tolist()
+
+    # ========== DECISIONS ==========
+    def decide(self, probabilities):
+        """(labels 0/1, risk band codes 0 Low / 1 Medium / 2 High) as int8 arrays"""
+        bins = np.searchsorted(self.edges, probabilities, side='right')
+        return self.bin_labels[bins], self.bin_risks[bins]
+
+    def decide_one(self, probability):
+        """(label 0/1, risk level) for one churn probability"""
+        i = bisect.bisect_right(self._edges, probability)
+        return self._labels[i], self._risks[i]
+
+    def labels(self, probabilities):
+        return self.bin_labels[np.searchsorted(self.edges, probabilities, side='right')]
+
+    def risk_codes(self, probabilities):
+        return self.bin_risks[np.searchsorted(self.edges, probabilities, side='right')]
+
+    def risk_levels(self, probabilities):
+        return RISK_LABELS[self.risk_codes(probabilities)]
+
+    # ========== FILES ==========
+    def to_dict(self):
+        return {"threshold": self.threshold, "risk_thresholds": self.risk_thresholds, "source": self.source}
+
+    def save(self, path):
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        try:
+            return cls(data.get("threshold", LABEL_THRESHOLD), data.get("risk_thresholds", RISK_THRESHOLDS),
+                       data.get("source"))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid thresholds in {path}: {e}")
+
+    @classmethod
+    def for_model(cls, model_path):
+        """The policy saved next to model_path, or the defaults"""
+        path = thresholds_path(model_path)
+        return cls.load(path) if os.path.exists(path) else cls()
+
+
+DEFAULT_POLICY = DecisionPolicy()
+
+
+# ========== TUNING ==========
+def optimal_threshold(y_true, probabilities, false_negative_cost, false_positive_cost):
+    """
+    Label threshold with the lowest false_negative_cost * FN + false_positive_cost * FP,
+    and that cost. Every distinct probability is tried as a cut: one sort and two cumulative sums.
+    """
+    order = np.argsort(-np.asarray(probabilities), kind='stable')
+    p, churned = np.asarray(probabilities)[order], np.asarray(y_true, dtype=bool)[order]
+    # Labelling the first k + 1 customers "Churn" (only where the probability changes)
+    cut = np.r_[p[1:] < p[:-1], True]
+    false_positives = np.cumsum(~churned)[cut]
+    false_negatives = churned.sum() - np.cumsum(churned)[cut]
+    costs = false_negative_cost * false_negatives + false_positive_cost * false_positives
+    nobody = false_negative_cost * churned.sum()  # no customer labelled "Churn"
+    if not len(costs) or nobody < costs.min():
+        return min(float(np.nextafter(p[0], np.inf)) if len(p) else 1.0, 1.0), float(nobody)
+    best = int(np.argmin(costs))
+    return float(p[cut][best]), float(costs[best])
+
+
+def label_cost(y_true, probabilities, threshold, false_negative_cost, false_positive_cost):
+    """Cost of the labels a threshold gives, and their recall and precision"""
+    churned = np.asarray(y_true, dtype=bool)
+    flagged = np.asarray(probabilities) >= threshold
+    true_positives = int((flagged & churned).sum())
+    cost = false_negative_cost * (churned & ~flagged).sum() + false_positive_cost * (flagged & ~churned).sum()
+    return (float(cost), true_positives / max(int(churned.sum()), 1),
+            true_positives / max(int(flagged.sum()), 1))
+
+
+def mlflow_models(db_path):
+    """
+    (run name, run id, ROC-AUC, model.pkl path) of every active model logged in an MLflow
+    tracking database. Read with sqlite3 (no mlflow import, any schema version that has
+    logged models), with artifacts looked up in the mlruns directory next to the database,
+    since the logged artifact locations point at the machine the runs were made on.
+    """
+    mlruns = os.path.join(os.path.dirname(db_path), "mlruns")
+    with closing(sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)) as db:
+        rows = db.execute(
+            "SELECT m.model_id, m.experiment_id, COALESCE(r.name, m.name), m.source_run_id, "
+            "(SELECT value FROM latest_metrics WHERE run_uuid = m.source_run_id AND key = 'roc_auc') "
+            "FROM logged_models m LEFT JOIN runs r ON r.run_uuid = m.source_run_id "
+            "WHERE m.lifecycle_stage = 'active' ORDER BY m.creation_timestamp_ms"
+        ).fetchall()
+    models = []
+    for model_id, experiment_id, name, run_id, roc_auc in rows:
+        path = os.path.join(mlruns, str(experiment_id), "models", model_id, "artifacts", "model.pkl")
+        if os.path.exists(path):
+            models.append((name, run_id, roc_auc, path))
+    return models
+
+
+def tune(args):
+    import joblib
+    import pandas as pd
+
+    from src.bulk_score import load_model
+
+    data = pd.read_csv(args.data, dtype={'TotalCharges': str}, keep_default_na=False)
+    churned = (data.pop("Churn") == "Yes").to_numpy()
+    costs = (args.false_negative_cost, args.false_positive_cost)
+
+    def report(label, roc_auc, probabilities):
+        threshold, cost = optimal_threshold(churned, probabilities, *costs)
+        default_cost, _, _ = label_cost(churned, probabilities, LABEL_THRESHOLD, *costs)
+        _, recall, precision = label_cost(churned, probabilities, threshold, *costs)
+        auc = f"{roc_auc:.3f}" if roc_auc is not None else "-"
+        print(f"{label:<44}{auc:>8}{threshold:>11.3f}{cost / len(churned):>10.3f}"
+              f"{default_cost / len(churned):>10.3f}{recall:>8.2f}{precision:>10.2f}")
+        return threshold, cost, default_cost
+
+    print(f"Cost per customer: {args.false_negative_cost} per missed churner, "
+          f"{args.false_positive_cost} per customer wrongly flagged ({len(churned):,} customers, {args.data})")
+    print(f"{'model':<44}{'ROC-AUC':>8}{'threshold':>11}{'cost':>10}{'at 0.5':>10}{'recall':>8}{'precision':>10}")
+    for path in args.models:
+        model = load_model(path)
+        probabilities = model.predict_proba(data)
+        if probabilities.ndim == 2:  # sklearn pipeline
+            probabilities = probabilities[:, 1]
+        threshold, cost, default_cost = report(path, None, probabilities)
+        if not args.dry_run:
+            DecisionPolicy(threshold, args.risk_thresholds, source={
+                "method": "min expected cost of labels",
+                "false_negative_cost": args.false_negative_cost,
+                "false_positive_cost": args.false_positive_cost,
+                "data": args.data,
+                "rows": len(churned),
+                "cost_per_customer": cost / len(churned),
+                "cost_per_customer_at_0.5": default_cost / len(churned),
+                "tuned_at": datetime.now().isoformat()
+            }).save(thresholds_path(path))
+
+    if args.mlflow_db and os.path.exists(args.mlflow_db):
+        # Run models are bare classifiers on the ColumnTransformer output
+        features = joblib.load(args.preprocessing).named_steps["preprocessing"].transform(data)
+        for name, run_id, roc_auc, path in mlflow_models(args.mlflow_db):
+            probabilities = joblib.load(path).predict_proba(features)[:, 1]
+            report(f"MLflow {name} ({run_id[:8]})", roc_auc, probabilities)
+
+    if not args.dry_run:
+        for path in args.models:
+            print(f"Wrote {thresholds_path(path)}")
+
+
+# ========== CLI ==========
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-model-version label and risk thresholds")
+    commands = parser.add_subparsers(dest="command", required=True)
+    tuning = commands.add_parser("tune", help="cost-optimal label threshold on the training data -> "
+                                              "<model>.thresholds.json; reports the MLflow runs' models too")
+    tuning.add_argument("models", nargs="*", default=["models/churn_pipeline.pkl"],
+                        help="served model files (.pkl, .model or .npz)")
+    tuning.add_argument("--data", default=DEFAULT_DATA, help="labelled customers (CSV with a Churn column)")
+    tuning.add_argument("--false-negative-cost", type=float, default=5.0, help="cost of missing a churner")
+    tuning.add_argument("--false-positive-cost", type=float, default=1.0,
+                        help="cost of flagging a customer who stays (e.g. a wasted retention offer)")
+    tuning.add_argument("--risk-thresholds", type=float, nargs=2, default=RISK_THRESHOLDS.tolist(),
+                        help="Medium and High risk band edges to save with the threshold")
+    tuning.add_argument("--mlflow-db", default=DEFAULT_MLFLOW_DB, help="MLflow tracking database (empty: skip)")
+    tuning.add_argument("--preprocessing", default="models/churn_pipeline.pkl",
+                        help="pipeline whose preprocessing the MLflow runs' classifiers were trained on")
+    tuning.add_argument("--dry-run", action="store_true", help="report only, write no thresholds file")
+    args = parser.parse_args(argv)
+    tune(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Per-feature explanations and what-if grids for churn scores.
+
+For the (compiled) logistic models the log-odds of churn are
+
+    intercept + sum over output columns j of coef_j * x_j
+
+where x is the ColumnTransformer output. Summing coef_j * x_j over the output
+columns that come from one input feature gives that feature's exact share of
+the log-odds: numeric features relative to the training mean (they are
+standardized), categories relative to the column's all-zero baseline (the
+category dropped by drop='if_binary', or none at all). So for every customer
+
+    intercept + sum(contributions) == log-odds of churn
+
+with no sampling or background data, and a whole batch is one matrix product.
+
+A what-if grid is every combination of alternative category values for one
+customer (e.g. each Contract x TechSupport x PaymentMethod), built as one
+column-oriented batch so it is scored in a single model call.
+"""
+import itertools
+
+import numpy as np
+from scipy.special import expit
+
+from src.decision import DEFAULT_POLICY
+
+DEFAULT_WHATIF_FEATURES = ('Contract', 'TechSupport', 'PaymentMethod')
+MAX_WHATIF_SCENARIOS = 4096
+
+# Service columns that only make sense together with their service:
+# column -> (service column, value meaning "no service", the column's value then)
+SERVICE_DEPENDENCIES = {
+    **{col: ('InternetService', 'No', 'No internet service')
+       for col in ('OnlineSecurity', 'OnlineBackup', 'DeviceProtection', 'TechSupport',
+                   'StreamingTV', 'StreamingMovies')},
+    'MultipleLines': ('PhoneService', 'No', 'No phone service'),
+}
+
+
+class Explanation:
+    """Contributions (n customers x features, log-odds) and churn probabilities of a batch"""
+
+    def __init__(self, features, base_value, contributions, probabilities, decision=DEFAULT_POLICY):
+        self.features = features
+        self.base_value = base_value
+        self.contributions = contributions
+        self.probabilities = probabilities
+        self.decision = decision  # risk bands of rows()
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def top_factors(self, k):
+        """Per customer, up to k features that raise the churn risk most (largest first)"""
+        if k <= 0 or not len(self):
+            return [[] for _ in range(len(self))]
+        k = min(k, len(self.features))
+        order = np.argsort(-self.contributions, axis=1, kind='stable')[:, :k]
+        # Largest first, so the ones above zero are a prefix of each row
+        raising = (np.take_along_axis(self.contributions, order, axis=1) > 0).sum(axis=1)
+        names = np.array(self.features, dtype=object)[order]
+        return [row[:count] for row, count in zip(names.tolist(), raising.tolist())]
+
+    def rows(self, top=3):
+        """One dict per customer (the JSON layout of POST /explain)"""
+        risks = self.decision.risk_levels(self.probabilities).tolist()
+        return [
+            {"customer_id": i + 1, "churn_probability": probability, "risk_level": risk,
+             "contributions": dict(zip(self.features, values)), "top_factors": factors}
+            for i, (probability, risk, values, factors) in enumerate(zip(
+                self.probabilities.tolist(), risks, self.contributions.tolist(), self.top_factors(top)))
+        ]
+
+    def columns(self):
+        """One list per feature (the columnar layout of POST /explain)"""
+        return {feature: self.contributions[:, j].tolist() for j, feature in enumerate(self.features)}
+
+
+class Explainer:
+    """Closed-form contributions for a CompiledScorer (binary logistic model)"""
+
+    def __init__(self, scorer, decision=DEFAULT_POLICY):
+        self.scorer = scorer
+        self.decision = decision
+        self.features = list(scorer.num_cols) + [col for col, _, _ in scorer.cat_tables]
+        # X @ weights sums coef_j * x_j per input feature: one column per feature,
+        # coef_j in the row of every output column j that feature produces
+        self.weights = np.zeros((scorer.n_features, len(self.features)))
+        for i in range(len(scorer.num_cols)):
+            self.weights[i, i] = scorer.coef[i]
+        for group, (_, table, _) in enumerate(scorer.cat_tables, start=len(scorer.num_cols)):
+            for feature in table.values():
+                if feature >= 0:
+                    self.weights[feature, group] = scorer.coef[feature]
+
+    @property
+    def base_value(self):
+        return self.scorer.intercept
+
+    def explain(self, X):
+        """Explanation for a transform() / transform_codes() feature matrix"""
+        contributions = X @ self.weights
+        probabilities = expit(contributions.sum(axis=1) + self.scorer.intercept)
+        return Explanation(self.features, self.scorer.intercept, contributions, probabilities, self.decision)
+
+
+# ========== WHAT-IF ==========
+def whatif_grid(customer, candidates, max_scenarios=MAX_WHATIF_SCENARIOS):
+    """
+    Every combination of `candidates` ({column: [values]}) applied to one customer dict,
+    leaving out combinations where a service column disagrees with its service
+    (e.g. TechSupport 'Yes' without internet). Returns
+    (columns with the unchanged customer as row 0 and the scenarios after it,
+     [{column: new value} per scenario]).
+    Raises ValueError if the grid would have more than max_scenarios combinations.
+    """
+    varied = list(candidates)
+    size = int(np.prod([len(candidates[col]) for col in varied])) if varied else 0
+    if size > max_scenarios:
+        raise ValueError(f"{size} what-if combinations, at most {max_scenarios} are allowed")
+
+    scenarios = []
+    for values in itertools.product(*(candidates[col] for col in varied)):
+        scenario = dict(customer, **dict(zip(varied, values)))
+        if scenario != customer and _consistent(scenario, varied):
+            scenarios.append(scenario)
+    rows = [customer] + scenarios
+    columns = {col: [row[col] for row in rows] for col in customer}
+    changes = [{col: scenario[col] for col in varied if scenario[col] != customer[col]} for scenario in scenarios]
+    return columns, changes
+
+
+def _consistent(customer, varied):
+    """Service columns agree with their service wherever the scenario changed either one"""
+    for col, (service, no_service, placeholder) in SERVICE_DEPENDENCIES.items():
+        if (col in varied or service in varied) and col in customer and service in customer:
+            if (customer[col] == placeholder) != (customer[service] == no_service):
+                return False
+    return True
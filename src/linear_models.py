@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.special import expit
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.linear_model import LogisticRegression
+
+
+class CategoryCodeLogisticRegression(BaseEstimator, ClassifierMixin):
+    """
+    Logistic regression on the 'codes' output of create_preprocessing_pipeline.
+
+    Float columns are used as they are; each integer column holds category codes
+    and gets its own coefficient table. Fitting expands the codes to a sparse
+    one-hot matrix (so the fitted model is the same as the one-hot version);
+    scoring just indexes the tables: decision = X_num @ w + sum(table[code]) + b.
+    Code -1 (category unseen in training) contributes 0, like handle_unknown='ignore'.
+    """
+
+    def __init__(self, C=1.0, class_weight=None, max_iter=100, random_state=None, solver='lbfgs'):
+        self.C = C
+        self.class_weight = class_weight
+        self.max_iter = max_iter
+        self.random_state = random_state
+        self.solver = solver
+
+    def _split(self, X):
+        """(float matrix, int code matrix) in the column order seen in fit"""
+        if not isinstance(X, pd.DataFrame):
+            raise TypeError("Expected the DataFrame produced by create_preprocessing_pipeline(encoding='codes')")
+        return (X[self.numeric_columns_].to_numpy(dtype=np.float64),
+                X[self.code_columns_].to_numpy(dtype=np.intp))
+
+    def _one_hot(self, codes):
+        """Sparse one-hot expansion of the code columns (unknown -1 -> all zeros)"""
+        n = codes.shape[0]
+        offsets = np.concatenate([[0], np.cumsum(self.n_levels_)[:-1]])
+        known = codes >= 0
+        rows = np.broadcast_to(np.arange(n)[:, None], codes.shape)[known]
+        cols = (codes + offsets)[known]
+        return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, int(sum(self.n_levels_))))
+
+    def fit(self, X, y, sample_weight=None):
+        if not isinstance(X, pd.DataFrame):
+            raise TypeError("Expected the DataFrame produced by create_preprocessing_pipeline(encoding='codes')")
+        self.code_columns_ = [c for c in X.columns if X[c].dtype.kind in 'iu']
+        self.numeric_columns_ = [c for c in X.columns if c not in self.code_columns_]
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+
+        numeric, codes = self._split(X)
+        self.n_levels_ = [int(codes[:, j].max()) + 1 for j in range(codes.shape[1])]
+        design = sparse.hstack([sparse.csr_matrix(numeric), self._one_hot(codes)]).tocsr()
+
+        model = LogisticRegression(C=self.C, class_weight=self.class_weight, max_iter=self.max_iter,
+                                   random_state=self.random_state, solver=self.solver)
+        model.fit(design, y, sample_weight=sample_weight)
+        if len(model.classes_) != 2:
+            raise ValueError(f"Only binary targets are supported, got {len(model.classes_)} classes")
+
+        # Same parameters as the one-hot model, plus per-column lookup tables
+        self.classes_ = model.classes_
+        self.coef_ = model.coef_
+        self.intercept_ = model.intercept_
+        self.n_iter_ = model.n_iter_
+
+        weights = model.coef_[0]
+        k = len(self.numeric_columns_)
+        self.numeric_coef_ = weights[:k]
+        # All code tables in one flat array, plus a trailing 0 that unknown codes index
+        self.table_ = np.append(weights[k:], 0.0)
+        self.offsets_ = np.concatenate([[0], np.cumsum(self.n_levels_)[:-1]]).astype(np.intp)
+        return self
+
+    def decision_function(self, X):
+        numeric, codes = self._split(X)
+        # Codes outside the training range (incl. -1) count as unknown
+        known = (codes >= 0) & (codes < np.asarray(self.n_levels_))
+        index = np.where(known, codes + self.offsets_, len(self.table_) - 1)
+        return numeric @ self.numeric_coef_ + self.table_[index].sum(axis=1) + self.intercept_[0]
+
+    def predict_proba(self, X):
+        p = expit(self.decision_function(X))
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
@@ -0,0 +1,168 @@
+"""
+Incremental (online) training from newly labelled customers.
+
+Starts from the saved pipeline (or a reference frame) and consumes labelled
+mini-batches without a full retrain:
+- StandardScaler statistics are updated with partial_fit
+- the classifier is an SGD logistic regression (loss='log_loss'), warm-started
+  from the saved LogisticRegression's coefficients
+- OneHotEncoder categories never change: the feature layout stays the same,
+  unseen categories are ignored, so the compiled scorer keeps working
+
+save() writes a regular Pipeline(preprocessing, classifier) pickle (and its
+compiled .npz) atomically, so the API picks the new weights up through POST
+/admin/reload or CHURN_MODEL_WATCH_SECONDS.
+
+    python -m src.online labelled.csv --output models/churn_online.pkl --batch-size 1000
+"""
+import argparse
+import copy
+import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+
+from src.bulk_score import iter_chunks
+from src.preprocessing import create_preprocessing_pipeline
+from src.scoring import CompiledScorer
+
+DEFAULT_MODEL = "models/churn_pipeline.pkl"
+DEFAULT_OUTPUT = "models/churn_online.pkl"
+TARGET_COL = 'Churn'
+
+
+class OnlineChurnModel:
+    """Preprocessing + SGD logistic regression that can be updated one mini-batch at a time"""
+
+    def __init__(self, preprocessing, classifier, class_weight=None):
+        self.preprocessing = preprocessing
+        self.classifier = classifier
+        # 'balanced' is recomputed from every label seen so far (SGD's own
+        # class_weight='balanced' is not supported by partial_fit)
+        self.class_weight = class_weight
+        self.class_counts = np.zeros(2)
+        self.rows_seen = 0
+
+    # ========== CONSTRUCTION ==========
+    @classmethod
+    def from_pipeline(cls, pipeline, eta0=0.01, alpha=1e-4, random_state=42):
+        """Continue from a fitted Pipeline(preprocessing, LogisticRegression/SGDClassifier)"""
+        preprocessing = copy.deepcopy(pipeline.named_steps['preprocessing'])
+        source = pipeline.named_steps['classifier']
+
+        classifier = _make_sgd(eta0, alpha, random_state)
+        # Warm start: partial_fit keeps updating existing coefficients
+        classifier.classes_ = source.classes_
+        classifier.coef_ = np.array(source.coef_, dtype=np.float64)
+        classifier.intercept_ = np.array(source.intercept_, dtype=np.float64)
+        classifier.n_features_in_ = source.coef_.shape[1]
+
+        class_weight = getattr(source, 'class_weight', None)
+        return cls(preprocessing, classifier, class_weight)
+
+    @classmethod
+    def from_frame(cls, X, class_weight=None, eta0=0.01, alpha=1e-4, random_state=42):
+        """Start from scratch; X (unlabelled is fine) fixes the categories and initial scaling"""
+        preprocessing = create_preprocessing_pipeline().fit(X)
+        return cls(preprocessing, _make_sgd(eta0, alpha, random_state), class_weight)
+
+    # ========== UPDATES ==========
+    @property
+    def scaler(self):
+        return self.preprocessing.named_steps['preprocessor'].named_transformers_['num'].named_steps['scaler']
+
+    def partial_fit(self, X, y):
+        """Update scaler statistics and model weights with one labelled mini-batch"""
+        y = np.asarray(y)
+        cleaned = self.preprocessing.named_steps['cleaner'].transform(X)
+        self.scaler.partial_fit(cleaned[list(self.scaler.feature_names_in_)])
+        features = self.preprocessing.named_steps['preprocessor'].transform(cleaned)
+
+        self.class_counts += np.bincount(y, minlength=2)[:2]
+        self.rows_seen += len(y)
+        self.classifier.partial_fit(features, y, classes=np.array([0, 1]),
+                                    sample_weight=self._sample_weight(y))
+        return self
+
+    def _sample_weight(self, y):
+        if self.class_weight is None:
+            return None
+        if self.class_weight == 'balanced':
+            counts = np.maximum(self.class_counts, 1)
+            weights = counts.sum() / (2 * counts)
+        else:
+            weights = np.array([self.class_weight.get(0, 1.0), self.class_weight.get(1, 1.0)])
+        return weights[y]
+
+    def predict_proba(self, X):
+        return self.classifier.predict_proba(self.preprocessing.transform(X))
+
+    # ========== EXPORT ==========
+    def to_pipeline(self):
+        """Same layout as models/churn_pipeline.pkl (shares state with this model)"""
+        return Pipeline(steps=[
+            ('preprocessing', self.preprocessing),
+            ('classifier', self.classifier)
+        ])
+
+    def save(self, path):
+        """
+        Write the pipeline to `path` and the compiled scorer next to it (.npz),
+        each through a temp file + rename, so a watcher never loads half a file
+        """
+        pipeline = self.to_pipeline()
+        tmp_path = path + ".tmp"
+        joblib.dump(pipeline, tmp_path)
+        os.replace(tmp_path, path)
+
+        # Written after the .pkl so it is newer and CHURN_FAST_START uses it
+        scorer_path = os.path.splitext(path)[0] + ".npz"
+        CompiledScorer.from_pipeline(pipeline).save(scorer_path + ".tmp", source_path=path)
+        os.replace(scorer_path + ".tmp", scorer_path)
+
+
+def _make_sgd(eta0, alpha, random_state):
+    # A constant step keeps warm-started weights stable ('optimal' starts with huge steps)
+    return SGDClassifier(loss='log_loss', learning_rate='constant', eta0=eta0, alpha=alpha,
+                         random_state=random_state)
+
+
+def labels(values):
+    """'Yes'/'No' (as in the Telco CSV) or 1/0 -> int array"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'biu':
+        return values.astype(int)
+    return (values == 'Yes').astype(int)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update the churn model from newly labelled customers")
+    parser.add_argument("input", help="CSV or Parquet with the usual customer columns + Churn (Yes/No or 1/0)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="pipeline to start from")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the updated pipeline")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per update")
+    parser.add_argument("--save-every", type=int, default=0,
+                        help="also save after every N rows, so the API can pick up progress (0: only at the end)")
+    parser.add_argument("--eta0", type=float, default=0.01, help="SGD learning rate")
+    args = parser.parse_args(argv)
+
+    model = OnlineChurnModel.from_pipeline(joblib.load(args.model), eta0=args.eta0)
+    start = time.perf_counter()
+    last_save = 0
+    for chunk in iter_chunks(args.input, args.batch_size):
+        model.partial_fit(chunk.drop(columns=TARGET_COL), labels(chunk[TARGET_COL]))
+        if args.save_every and model.rows_seen - last_save >= args.save_every:
+            model.save(args.output)
+            last_save = model.rows_seen
+    elapsed = time.perf_counter() - start
+
+    model.save(args.output)
+    print(f"Updated on {model.rows_seen:,} customers in {elapsed:.1f}s "
+          f"({model.rows_seen / elapsed:,.0f} rows/sec) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,21 @@ import pandas as pd
 import numpy as np
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder, FunctionTransformer
 from sklearn.compose import ColumnTransformer
 
 class DataCleaner(BaseEstimator, TransformerMixin):
-    """Clean raw dataframe before encoding"""
+    """Clean raw dataframe before encoding
     
-    def __init__(self):
+    copy=True  (default) works on a copy, the caller's dataframe is untouched.
+    copy=False cleans the caller's dataframe IN PLACE (no full copy of the data):
+               customerID is deleted from it and TotalCharges/SeniorCitizen are replaced.
+    Both produce exactly the same encoded output downstream.
+    """
+    
+    def __init__(self, copy=True):
+        self.copy = copy
+        
         # Define binary and multi-category columns
         self.binary_cols = ['gender', 'Partner', 'Dependents', 
                            'PhoneService', 'PaperlessBilling']
@@ -20,32 +28,60 @@ class DataCleaner(BaseEstimator, TransformerMixin):
                               'Contract', 'PaymentMethod']
         
         self.num_cols = ['tenure', 'MonthlyCharges', 'TotalCharges', 'SeniorCitizen']
+    
+    def __setstate__(self, state):
+        # Pipelines pickled before `copy` existed (e.g. models/churn_pipeline.pkl)
+        state.setdefault('copy', True)
+        super().__setstate__(state)
         
     def fit(self, X, y=None):
         return self    # Just learns column names/structure
     
     def transform(self, X): #Applies the cleaning rules
-        X = X.copy()
-        
         # 1. Drop customerID (not needed for modeling)
-        if 'customerID' in X.columns:
-            X = X.drop('customerID', axis=1)
+        if self.copy:
+            # drop() already returns a new frame, so only copy when there's nothing to drop
+            X = X.drop('customerID', axis=1) if 'customerID' in X.columns else X.copy()
+        elif 'customerID' in X.columns:
+            del X['customerID']
         
-        # 2. Convert TotalCharges to numeric
-        X['TotalCharges'] = pd.to_numeric(X['TotalCharges'], errors='coerce')  #Converts TotalCharges to numeric
-        X['TotalCharges'] = X['TotalCharges'].fillna(0)  #fill in blanks with 0
+        # 2. Convert TotalCharges to numeric (skipped when it already is numeric)
+        total = X['TotalCharges']
+        if total.dtype.kind not in 'biuf':
+            total = pd.to_numeric(total, errors='coerce')  #Converts TotalCharges to numeric
+        if total.hasnans:
+            total = total.fillna(0)  #fill in blanks with 0
+        X['TotalCharges'] = total
         
-        # 3. Convert SeniorCitizen from int64 to object(strings) for consistent encoding
-        # (We'll treat it as categorical even though it's 0/1)
-        X['SeniorCitizen'] = X['SeniorCitizen'].astype(str)
+        # 3. Convert SeniorCitizen from int64 to a categorical with string labels ('0'/'1')
+        # (We'll treat it as categorical even though it's 0/1.)
+        # Only the distinct labels become strings; rows hold small integer codes, and
+        # OneHotEncoder sees the same '0'/'1' values as with astype(str).
+        X['SeniorCitizen'] = X['SeniorCitizen'].astype('category').cat.rename_categories(str)
         
         return X
 
 
 
 
-def create_preprocessing_pipeline():
-    """Build the complete preprocessing pipeline"""
+def _to_float32(X):
+    return X.astype(np.float32)
+
+
+def create_preprocessing_pipeline(encoding='dense'):
+    """Build the complete preprocessing pipeline
+    
+    encoding:
+    - 'dense'  (default) float64 matrix, one-hot columns for every category
+    - 'sparse' same columns as 'dense', but a scipy CSR matrix (most one-hot cells are 0);
+               LogisticRegression consumes it directly
+    - 'codes'  a DataFrame of float32 numerics + 0/1 binary columns and ONE int8
+               category code per multi-category column (-1 = unknown); feed it to
+               CategoryCodeLogisticRegression (src/linear_models.py), which indexes
+               its coefficient tables with the codes instead of one-hot encoding
+    """
+    if encoding not in ('dense', 'sparse', 'codes'):
+        raise ValueError(f"encoding must be 'dense', 'sparse' or 'codes', got {encoding!r}")
     
     # Define column groups (must match DataCleaner)
     binary_cols = ['gender', 'Partner', 'Dependents', 
@@ -59,20 +95,35 @@ def create_preprocessing_pipeline():
     
     num_cols = ['tenure', 'MonthlyCharges', 'TotalCharges']
     
-    # Binary encoding: Yes/No → 1/0
-    binary_transformer = Pipeline(steps=[
-        ('binary_encoder', OneHotEncoder(drop='if_binary', sparse_output=False))
-    ])
-    
-    # Multi-category encoding: One-hot
-    categorical_transformer = Pipeline(steps=[
-        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
-    ])
+    sparse = encoding == 'sparse'
     
-    # Numeric scaling: Standardization
-    numeric_transformer = Pipeline(steps=[
-        ('scaler', StandardScaler())
-    ])
+    if encoding == 'codes':
+        # Compact dtypes: float32 numerics and binaries, int8 codes for the rest
+        binary_transformer = Pipeline(steps=[
+            ('binary_encoder', OneHotEncoder(drop='if_binary', sparse_output=False, dtype=np.float32))
+        ])
+        categorical_transformer = Pipeline(steps=[
+            ('ordinal', OrdinalEncoder(dtype=np.int8, handle_unknown='use_encoded_value', unknown_value=-1))
+        ])
+        numeric_transformer = Pipeline(steps=[
+            ('scaler', StandardScaler()),
+            ('float32', FunctionTransformer(_to_float32, feature_names_out='one-to-one'))
+        ])
+    else:
+        # Binary encoding: Yes/No → 1/0
+        binary_transformer = Pipeline(steps=[
+            ('binary_encoder', OneHotEncoder(drop='if_binary', sparse_output=sparse))
+        ])
+        
+        # Multi-category encoding: One-hot
+        categorical_transformer = Pipeline(steps=[
+            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=sparse))
+        ])
+        
+        # Numeric scaling: Standardization
+        numeric_transformer = Pipeline(steps=[
+            ('scaler', StandardScaler())
+        ])
     
     # Combine everything
     preprocessor = ColumnTransformer(
@@ -81,8 +132,12 @@ def create_preprocessing_pipeline():
             ('binary', binary_transformer, binary_cols),
             ('cat', categorical_transformer, multi_cat_cols)
         ],
-        remainder='drop'  # Drop any columns not specified
+        remainder='drop',  # Drop any columns not specified
+        sparse_threshold=1.0 if sparse else 0.0  # 'sparse' always returns CSR
     )
+    if encoding == 'codes':
+        # Keep each column's own dtype instead of upcasting everything to one array
+        preprocessor.set_output(transform='pandas')
     
     # FULL PIPELINE: Clean → Encode/Scale
     full_pipeline = Pipeline(steps=[
@@ -0,0 +1,334 @@
+"""
+Precomputed churn scores for a known customer base, looked up by customerID.
+
+The whole base is scored once in bulk (src.bulk_score) and written as a
+directory of .npy arrays that the API memory-maps, so answering "what's the
+risk for customer X" reads a few pages instead of running the model:
+
+    <index dir>/<model version>  -> symlink to the current build, <model version>.<build time>/
+        manifest.json      format version, model file + sha256, rows, band counts
+        ids.npy            customerIDs, fixed-width bytes (row order of the input)
+        probabilities.npy  float32 churn probability per row
+        risk_codes.npy     int8 risk band per row (0 Low, 1 Medium, 2 High)
+        by_risk.npy        row numbers, highest probability first (top-K)
+        slots.npy          open-addressing hash table: FNV-1a(id) -> row (O(1) lookup)
+
+    python -m src.score_index data/raw/WA_Fn-UseC_-Telco-Customer-Churn.csv --model models/churn_pipeline.pkl
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+
+from src.decision import DEFAULT_POLICY, DecisionPolicy
+from src.scoring import RISK_LABELS
+
+# Bump when the index layout changes
+INDEX_FORMAT_VERSION = 1
+DEFAULT_INDEX_DIR = "models/score_index"
+
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_EMPTY = -1
+
+
+def fnv1a(keys):
+    """64-bit FNV-1a of each fixed-width bytes key (an 'S<w>' array), vectorized over the keys"""
+    raw = np.ascontiguousarray(keys).view(np.uint8).reshape(len(keys), keys.dtype.itemsize)
+    h = np.full(len(keys), _FNV_OFFSET, dtype=np.uint64)
+    prime = np.uint64(_FNV_PRIME)
+    for column in raw.T:
+        h ^= column
+        h *= prime  # wraps modulo 2**64, like the scalar version
+    return h
+
+
+def _fnv1a_one(key):
+    h = _FNV_OFFSET
+    for byte in key:
+        h = ((h ^ byte) * _FNV_PRIME) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+
+# ========== BUILD ==========
+def build_index(path, ids, probabilities, model_version, model_path=None, source=None, decision=DEFAULT_POLICY):
+    """
+    Write an index for `ids` (customerIDs) and their churn probabilities to `path`
+    (a symlink to the build, swapped atomically if it exists), with risk bands from
+    `decision`. Later duplicates of an ID win. Returns the manifest.
+    """
+    start = time.perf_counter()
+    ids = np.asarray(ids)
+    if ids.dtype.kind != 'S':
+        ids = np.char.encode(ids.astype(str), 'utf-8')
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    if len(ids) != len(probabilities):
+        raise ValueError(f"{len(ids)} ids but {len(probabilities)} probabilities")
+
+    # Keep the last row of each customerID
+    _, last = np.unique(ids[::-1], return_index=True)
+    if len(last) < len(ids):
+        keep = np.sort(len(ids) - 1 - last)
+        duplicates = len(ids) - len(keep)
+        ids, probabilities = ids[keep], probabilities[keep]
+    else:
+        duplicates = 0
+
+    codes = decision.risk_codes(probabilities)
+    by_risk = np.argsort(-probabilities, kind='stable').astype(np.int32 if len(ids) < 2 ** 31 else np.int64)
+    slots = _hash_table(ids)
+
+    tmp = f"{path}.{time.time_ns()}"
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "ids.npy"), ids)
+    np.save(os.path.join(tmp, "probabilities.npy"), probabilities.astype(np.float32))
+    np.save(os.path.join(tmp, "risk_codes.npy"), codes)
+    np.save(os.path.join(tmp, "by_risk.npy"), by_risk)
+    np.save(os.path.join(tmp, "slots.npy"), slots)
+    manifest = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "model_version": model_version,
+        "model_path": model_path,
+        "model_sha256": file_sha256(model_path) if model_path else None,
+        "source": source,
+        "rows": int(len(ids)),
+        "duplicate_ids": int(duplicates),
+        "label_threshold": decision.threshold,
+        "risk_thresholds": decision.risk_thresholds,
+        "risk_band_counts": dict(zip(RISK_LABELS.tolist(), np.bincount(codes, minlength=3).tolist())),
+        "built_at": datetime.now().isoformat(),
+        "build_seconds": round(time.perf_counter() - start, 3)
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    # Swap in with one rename of a symlink, so `path` always holds the old index or the new one.
+    # Readers that still have the old files mapped keep reading them.
+    old = None
+    if os.path.islink(path):
+        old = os.path.join(os.path.dirname(path), os.readlink(path))
+    elif os.path.isdir(path):
+        # Written before indexes were symlinked: moved aside (missing until the link replaces it) this once
+        old = f"{path}.old-{os.getpid()}"
+        os.rename(path, old)
+    link = f"{path}.link-{os.getpid()}"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(tmp), link)
+    os.replace(link, path)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def _hash_table(ids):
+    """Linear-probing table of row numbers, at most half full, filled a probe round at a time"""
+    size = 1 << max(4, int(2 * len(ids) - 1).bit_length())
+    mask = np.uint64(size - 1)
+    slots = np.full(size, _EMPTY, dtype=np.int32 if len(ids) < 2 ** 31 else np.int64)
+    rows = np.arange(len(ids))
+    positions = (fnv1a(ids) & mask).astype(np.int64)
+    while len(rows):
+        free = slots[positions] == _EMPTY
+        # The first row aiming at each free slot takes it; everyone else probes the next slot
+        taken, first = np.unique(positions[free], return_index=True)
+        winners = np.flatnonzero(free)[first]
+        slots[taken] = rows[winners]
+        placed = np.zeros(len(rows), dtype=bool)
+        placed[winners] = True
+        rows, positions = rows[~placed], (positions[~placed] + 1) & (size - 1)
+    return slots
+
+
+def build_from_file(input_path, index_dir=DEFAULT_INDEX_DIR, model_path="models/churn_pipeline.pkl",
+                    model_version=None, workers=None, chunk_size=None):
+    """Score a CSV / Parquet customer base (needs a customerID column) and index it"""
+    from src.bulk_score import DEFAULT_CHUNK_SIZE, ID_COL, score_chunks
+
+    model_version = model_version or os.path.splitext(os.path.basename(model_path))[0]
+    ids, probabilities = [], []
+    for results in score_chunks(input_path, model_path, workers, chunk_size or DEFAULT_CHUNK_SIZE):
+        if ID_COL not in results:
+            raise ValueError(f"{input_path} has no {ID_COL} column to index")
+        ids.append(np.char.encode(results[ID_COL].to_numpy().astype(str), 'utf-8'))
+        probabilities.append(results['churn_probability'].to_numpy())
+    width = max((chunk.dtype.itemsize for chunk in ids), default=1)
+    ids = np.concatenate([chunk.astype(f"S{width}") for chunk in ids]) if ids else np.array([], dtype="S1")
+    probabilities = np.concatenate(probabilities) if probabilities else np.array([])
+    return build_index(os.path.join(index_dir, model_version), ids, probabilities, model_version,
+                       model_path=model_path, source=os.path.abspath(input_path),
+                       decision=DecisionPolicy.for_model(model_path))
+
+
+# ========== SERVE ==========
+class ScoreIndex:
+    """A built index, memory-mapped read-only (cheap to open, pages loaded on use)"""
+
+    def __init__(self, path):
+        self.path = path
+        build = os.path.realpath(path)  # every file from the same build, even if it is swapped meanwhile
+        with open(os.path.join(build, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest["format_version"] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported score index format {self.manifest['format_version']} "
+                             f"(expected {INDEX_FORMAT_VERSION})")
+        arrays = {name: np.load(os.path.join(build, f"{name}.npy"), mmap_mode='r')
+                  for name in ("ids", "probabilities", "risk_codes", "by_risk", "slots")}
+        self.ids = arrays["ids"]
+        self.probabilities = arrays["probabilities"]
+        self.risk_codes = arrays["risk_codes"]
+        self.by_risk = arrays["by_risk"]
+        self.slots = arrays["slots"]
+        for name in ("ids", "probabilities", "risk_codes", "slots"):
+            _random_access(arrays[name])
+        self._width = self.ids.dtype.itemsize
+        self._mask = len(self.slots) - 1
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def find(self, customer_id):
+        """Row number of customer_id, or None"""
+        key = customer_id.encode('utf-8')
+        if len(key) > self._width or not key:
+            return None
+        padded = key.ljust(self._width, b'\0')
+        position = _fnv1a_one(padded) & self._mask
+        while True:
+            row = int(self.slots[position])
+            if row == _EMPTY:
+                return None
+            if self.ids[row] == key:
+                return row
+            position = (position + 1) & self._mask
+
+    def lookup(self, customer_id):
+        """(churn probability, risk level) for customer_id, or None if it isn't indexed"""
+        row = self.find(customer_id)
+        if row is None:
+            return None
+        return float(self.probabilities[row]), str(RISK_LABELS[self.risk_codes[row]])
+
+    def top(self, k, offset=0):
+        """The k highest-risk customers after `offset`: [(customerID, probability, risk level)]"""
+        rows = np.asarray(self.by_risk[offset:offset + k])
+        return list(zip(np.char.decode(self.ids[rows], 'utf-8').tolist(),
+                        self.probabilities[rows].astype(np.float64).tolist(),
+                        RISK_LABELS[self.risk_codes[rows]].tolist()))
+
+    def band_counts(self):
+        return dict(self.manifest["risk_band_counts"])
+
+    def matches(self, model_path):
+        """Whether the index was built from this exact model file"""
+        return self.manifest.get("model_sha256") is not None and \
+            model_path is not None and os.path.exists(model_path) and \
+            file_sha256(model_path) == self.manifest["model_sha256"]
+
+    def info(self):
+        return {key: self.manifest.get(key) for key in
+                ("model_version", "rows", "duplicate_ids", "built_at", "source", "risk_band_counts")}
+
+
+class IndexCatalog:
+    """
+    The indexes under one directory, one per model version. Each is opened on first
+    use and re-opened when it is rebuilt or the model file behind the version changes.
+    """
+
+    def __init__(self, root=DEFAULT_INDEX_DIR):
+        self.root = root
+        self._open = {}  # version -> ((manifest mtime, model path, model mtime), ScoreIndex, matches)
+        self.lookups = 0
+        self.misses = 0
+
+    def get(self, version_name, model_path=None):
+        """
+        ScoreIndex for a model version. Raises KeyError if none was built, and
+        ValueError if it was built from a different model file than model_path.
+        If a rebuild removes the files while they are being re-opened, the index
+        opened before is kept until the next call.
+        """
+        path = os.path.join(self.root, version_name)
+        try:
+            key = (os.stat(os.path.join(path, "manifest.json")).st_mtime_ns, model_path,
+                   os.stat(model_path).st_mtime_ns if model_path and os.path.exists(model_path) else None)
+        except FileNotFoundError:
+            raise KeyError(version_name)
+        cached = self._open.get(version_name)
+        if cached is None or cached[0] != key:
+            try:
+                index = ScoreIndex(path)
+            except FileNotFoundError:
+                if cached is None:
+                    raise KeyError(version_name)
+            else:
+                cached = (key, index, model_path is None or index.matches(model_path))
+                self._open[version_name] = cached
+        _, index, matches = cached
+        if not matches:
+            raise ValueError(f"The score index for '{version_name}' was built from a different model file; "
+                             f"rebuild it with python -m src.score_index")
+        return index
+
+    def lookup(self, index, customer_id):
+        """index.lookup() with hit / miss counters for /stats"""
+        self.lookups += 1
+        result = index.lookup(customer_id)
+        if result is None:
+            self.misses += 1
+        return result
+
+    def stats(self):
+        return {
+            "dir": self.root,
+            "open": {name: index.info() for name, (_, index, _) in self._open.items()},
+            "lookups": self.lookups,
+            "misses": self.misses
+        }
+
+
+def _random_access(array):
+    """Lookups touch one page here and there: skip the kernel's readahead around each fault"""
+    mapped = getattr(array, '_mmap', None)
+    if mapped is not None and hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+        mapped.madvise(mmap.MADV_RANDOM)
+
+
+def file_sha256(path):
+    if os.path.isdir(path):  # exported model (src.artifact): its manifest identifies it
+        path = os.path.join(path, "manifest.json")
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ========== CLI ==========
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a customer base and write a customerID score index")
+    parser.add_argument("input", help="CSV or Parquet with a customerID column")
+    parser.add_argument("--model", default="models/churn_pipeline.pkl",
+                        help="saved pipeline (.pkl), exported model (.model) or scorer (.npz)")
+    parser.add_argument("--version", help="model version name (default: the model file name)")
+    parser.add_argument("--output", default=DEFAULT_INDEX_DIR, help="index directory (one subdirectory per version)")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows per scoring chunk")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    manifest = build_from_file(args.input, args.output, args.model, args.version, args.workers, args.chunk_size)
+    print(f"Indexed {manifest['rows']:,} customers for '{manifest['model_version']}' in "
+          f"{time.perf_counter() - start:.1f}s -> {os.path.join(args.output, manifest['model_version'])}")
+    print(f"Risk bands: {manifest['risk_band_counts']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import argparse
+import hashlib
+import json
+import math
+
+import numpy as np
+from scipy.special import expit
+
+# NOTE: sklearn / pandas are only imported when compiling from a fitted pipeline,
+# so serving from a saved scorer artifact never loads them.
+
+# Bump when the saved artifact layout changes
+ARTIFACT_VERSION = 1
+
+
+# ========== CLEANING RULES (must match DataCleaner) ==========
+# TotalCharges arrives as a string: blanks / junk become 0
+COERCE_NUMERIC_COLS = ('TotalCharges',)
+# SeniorCitizen arrives as 0/1 but is one-hot encoded as the strings '0'/'1'
+STRING_CAST_COLS = ('SeniorCitizen',)
+
+# Risk bands: < 0.4 Low, 0.4-0.7 Medium, >= 0.7 High
+RISK_THRESHOLDS = np.array([0.4, 0.7])
+RISK_LABELS = np.array(['Low', 'Medium', 'High'])
+
+# Lookup results for categories that produce no one-hot column
+_DROPPED = -1   # category removed by drop='if_binary' (all zeros, valid)
+_UNKNOWN = -2   # category never seen during fit
+
+
+def to_total_charges(value):
+    """Scalar version of DataCleaner's TotalCharges rule ("" / junk -> 0.0)"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(number) else number
+
+
+def coerce_numeric(values):
+    """Vectorized version of pd.to_numeric(errors='coerce').fillna(0)"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        out = values.astype(np.float64)
+    else:
+        out = np.fromiter((to_total_charges(v) for v in values),
+                          dtype=np.float64, count=len(values))
+    out[np.isnan(out)] = 0.0
+    return out
+
+
+def risk_codes(probabilities):
+    """Vectorized risk band index (0 Low, 1 Medium, 2 High) for an array of churn probabilities"""
+    return np.searchsorted(RISK_THRESHOLDS, probabilities, side='right').astype(np.int8)
+
+
+def risk_levels(probabilities):
+    """Vectorized risk band for an array of churn probabilities"""
+    return RISK_LABELS[risk_codes(probabilities)]
+
+
+class CompiledScorer:
+    """
+    The fitted churn pipeline flattened into plain NumPy arrays and dicts.
+
+    DataCleaner + ColumnTransformer + LogisticRegression become:
+    - scaler means/scales for the numeric columns
+    - one {category: feature index} table per categorical column
+    - the model coefficients and intercept
+    so a customer is scored with one dot product, no pandas involved.
+    """
+
+    linear = True  # coef / intercept are the model (see src.artifact.TreeScorer)
+
+    def __init__(self, num_cols, mean, scale, cat_tables, coef, intercept,
+                 classes, feature_names):
+        self.num_cols = list(num_cols)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        # [(column, {category: feature index}, strict)]
+        # strict=True means unknown categories raise (handle_unknown='error')
+        self.cat_tables = list(cat_tables)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.classes = np.asarray(classes)
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        # Feature index per table entry, in table order (for transform_codes)
+        self._table_features = [np.fromiter(table.values(), dtype=np.intp, count=len(table))
+                                for _, table, _ in self.cat_tables]
+
+    # ========== BUILD FROM A FITTED PIPELINE ==========
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Compile a fitted Pipeline(DataCleaner, ColumnTransformer, LogisticRegression)"""
+        num_cols, means, scales, cat_tables, feature_names, model = compile_preprocessing(pipeline)
+        if not hasattr(model, 'coef_') or model.coef_.shape[0] != 1:
+            raise TypeError(f"Model must be a binary linear classifier, got {type(model).__name__}")
+        if getattr(model, 'loss', 'log_loss') != 'log_loss':
+            # e.g. SGDClassifier(loss='hinge'): decision values are not log-odds
+            raise TypeError(f"Model must be a logistic model, got loss={model.loss!r}")
+        if model.coef_.shape[1] != len(feature_names):
+            raise TypeError("Compiled feature layout does not match the fitted pipeline")
+
+        return cls(num_cols, means, scales, cat_tables, model.coef_[0],
+                   model.intercept_[0], model.classes_, feature_names)
+
+    # ========== SAVE / LOAD (no sklearn needed) ==========
+    def save(self, path, source_path=None):
+        """Write the scorer as a compact .npz (arrays + JSON metadata)"""
+        meta = {
+            "version": ARTIFACT_VERSION,
+            "num_cols": self.num_cols,
+            "cat_tables": [
+                [col, list(table.keys()), list(table.values()), strict]
+                for col, table, strict in self.cat_tables
+            ],
+            "intercept": self.intercept,
+            "feature_names": self.feature_names,
+            "source_sha256": _sha256(source_path) if source_path else None
+        }
+        with open(path, 'wb') as f:
+            np.savez(f, mean=self.mean, scale=self.scale, coef=self.coef,
+                     classes=self.classes, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path):
+        """Load a scorer written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta["version"] != ARTIFACT_VERSION:
+                raise ValueError(f"Unsupported scorer artifact version {meta['version']} "
+                                 f"(expected {ARTIFACT_VERSION})")
+            cat_tables = [
+                (col, dict(zip(categories, indices)), strict)
+                for col, categories, indices, strict in meta["cat_tables"]
+            ]
+            return cls(meta["num_cols"], data['mean'], data['scale'], cat_tables,
+                       data['coef'], meta["intercept"], data['classes'],
+                       meta["feature_names"])
+
+    # ========== SINGLE CUSTOMER ==========
+    def transform_one(self, record):
+        """Feature vector for one customer dict (same as the ColumnTransformer output row)"""
+        x = np.zeros(self.n_features)
+        for i, col in enumerate(self.num_cols):
+            value = record[col]
+            if col in COERCE_NUMERIC_COLS:
+                value = to_total_charges(value)
+            x[i] = (value - self.mean[i]) / self.scale[i]
+
+        for col, table, strict in self.cat_tables:
+            value = record[col]
+            if col in STRING_CAST_COLS:
+                value = str(value)
+            idx = table.get(value, _UNKNOWN)
+            if idx >= 0:
+                x[idx] = 1.0
+            elif idx == _UNKNOWN and strict:
+                raise ValueError(f"Found unknown category {value!r} in column '{col}'")
+        return x
+
+    def decision_one(self, record):
+        return float(self.transform_one(record) @ self.coef + self.intercept)
+
+    def predict_proba_one(self, record):
+        """Churn probability for one customer dict"""
+        return _expit_scalar(self.decision_one(record))
+
+    def predict_one(self, record):
+        """(label, churn probability) for one customer dict"""
+        return self.predict_features_one(self.transform_one(record))
+
+    def predict_features_one(self, x):
+        """(label, churn probability) for one transform_one() vector"""
+        decision = float(x @ self.coef + self.intercept)
+        return self.classes[int(decision > 0)], _expit_scalar(decision)
+
+    # ========== MANY CUSTOMERS (column-oriented) ==========
+    def transform(self, columns):
+        """
+        Feature matrix for column-oriented input.
+        `columns` maps column name -> sequence of values (a DataFrame works too).
+        """
+        n = len(columns[self.num_cols[0]])
+        X = np.zeros((n, self.n_features))
+        rows = np.arange(n)
+
+        for i, col in enumerate(self.num_cols):
+            if col in COERCE_NUMERIC_COLS:
+                values = coerce_numeric(columns[col])
+            else:
+                values = np.asarray(columns[col], dtype=np.float64)
+            X[:, i] = (values - self.mean[i]) / self.scale[i]
+
+        for col, table, strict in self.cat_tables:
+            values = columns[col]
+            if col in STRING_CAST_COLS:
+                values = (str(v) for v in values)
+            idx = np.fromiter((table.get(v, _UNKNOWN) for v in values),
+                              dtype=np.intp, count=n)
+            if strict and (idx == _UNKNOWN).any():
+                bad = np.asarray(columns[col])[idx == _UNKNOWN][0]
+                raise ValueError(f"Found unknown category {bad!r} in column '{col}'")
+            hit = idx >= 0
+            X[rows[hit], idx[hit]] = 1.0
+        return X
+
+    def transform_codes(self, numeric, codes):
+        """
+        Feature matrix for already-validated typed arrays (src.validation.CustomerBatch):
+        `numeric` maps each num_col to its values, `codes` each categorical column to
+        the position of every value in that column's table. No per-value lookups.
+        """
+        n = len(numeric[self.num_cols[0]])
+        X = np.zeros((n, self.n_features))
+        rows = np.arange(n)
+
+        for i, col in enumerate(self.num_cols):
+            X[:, i] = (numeric[col] - self.mean[i]) / self.scale[i]
+
+        for (col, _, _), features in zip(self.cat_tables, self._table_features):
+            idx = features[codes[col]]
+            hit = idx >= 0
+            X[rows[hit], idx[hit]] = 1.0
+        return X
+
+    def decision_function(self, columns):
+        return self.transform(columns) @ self.coef + self.intercept
+
+    def predict_proba(self, columns):
+        """Churn probabilities (1-D array) for column-oriented input"""
+        return self.predict_proba_features(self.transform(columns))
+
+    def predict_proba_features(self, X):
+        """Churn probabilities for a transform() matrix"""
+        return expit(X @ self.coef + self.intercept)
+
+
+# ========== BUILD HELPERS ==========
+def compile_preprocessing(pipeline):
+    """
+    Flatten the DataCleaner + ColumnTransformer of a fitted Pipeline(cleaner, preprocessor, model):
+    (num_cols, means, scales, cat_tables, feature_names, model), see CompiledScorer
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+    from src.preprocessing import DataCleaner
+
+    steps = _flatten_steps(pipeline)
+    if len(steps) != 3:
+        raise TypeError(f"Expected cleaner, preprocessor and model, got {len(steps)} steps")
+    cleaner, preprocessor, model = steps
+
+    if not isinstance(cleaner, DataCleaner):
+        raise TypeError(f"First step must be a DataCleaner, got {type(cleaner).__name__}")
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise TypeError(f"Second step must be a ColumnTransformer, got {type(preprocessor).__name__}")
+    if preprocessor.remainder != 'drop':
+        raise TypeError("Only ColumnTransformers with remainder='drop' can be compiled")
+
+    num_cols, means, scales = [], [], []
+    cat_tables = []
+    offset = 0
+    for name, transformer, cols in preprocessor.transformers_:
+        if isinstance(transformer, str) or len(cols) == 0:
+            continue
+        step = _final_step(transformer)
+
+        if isinstance(step, StandardScaler):
+            if offset != len(num_cols):
+                raise TypeError("Numeric columns must come first in the ColumnTransformer")
+            n = len(cols)
+            num_cols.extend(cols)
+            means.extend(step.mean_ if step.mean_ is not None else np.zeros(n))
+            scales.extend(step.scale_ if step.scale_ is not None else np.ones(n))
+            offset += n
+
+        elif isinstance(step, OneHotEncoder):
+            if getattr(step, 'infrequent_categories_', None) and any(
+                    c is not None for c in step.infrequent_categories_):
+                raise TypeError("OneHotEncoder with infrequent categories cannot be compiled")
+            drop_idx = step.drop_idx_
+            for i, (col, categories) in enumerate(zip(cols, step.categories_)):
+                dropped = None if drop_idx is None else drop_idx[i]
+                table = {}
+                for j, category in enumerate(categories):
+                    if dropped is not None and j == dropped:
+                        table[category] = _DROPPED
+                    else:
+                        table[category] = offset
+                        offset += 1
+                cat_tables.append((col, table, step.handle_unknown == 'error'))
+
+        else:
+            raise TypeError(f"Cannot compile transformer '{name}' ({type(step).__name__})")
+
+    feature_names = list(preprocessor.get_feature_names_out())
+    if offset != len(feature_names):
+        raise TypeError("Compiled feature layout does not match the fitted pipeline")
+    return num_cols, means, scales, cat_tables, feature_names, model
+
+
+# ========== HELPERS ==========
+def _expit_scalar(x):
+    # Same libm exp as scipy's expit, without the ufunc call overhead
+    return 1.0 / (1.0 + math.exp(-x)) if x >= -709 else 0.0
+
+
+def _sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _flatten_steps(estimator):
+    """Unpack nested Pipelines into a flat list of estimators"""
+    from sklearn.pipeline import Pipeline
+
+    if isinstance(estimator, Pipeline):
+        steps = []
+        for _, step in estimator.steps:
+            if step is None or isinstance(step, str):
+                continue
+            steps.extend(_flatten_steps(step))
+        return steps
+    return [estimator]
+
+
+def _final_step(transformer):
+    steps = _flatten_steps(transformer)
+    if len(steps) != 1:
+        raise TypeError(f"Expected a single-step transformer, got {len(steps)} steps")
+    return steps[0]
+
+
+# ========== CLI: precompile a saved pipeline ==========
+if __name__ == "__main__":
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Precompile a fitted churn pipeline into a scorer artifact")
+    parser.add_argument("model", nargs="?", default="models/churn_pipeline.pkl")
+    parser.add_argument("output", nargs="?", default="models/churn_pipeline.npz")
+    args = parser.parse_args()
+
+    scorer = CompiledScorer.from_pipeline(joblib.load(args.model))
+    scorer.save(args.output, source_path=args.model)
+    print(f"Saved compiled scorer ({scorer.n_features} features) to: {args.output}")
@@ -0,0 +1,86 @@
+import glob
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from src.artifact import TreeScorer, export_pipeline, load_artifact
+from src.preprocessing import create_preprocessing_pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+@pytest.fixture(scope="module")
+def data():
+    data = pd.read_csv(DATA_PATH)
+    return data.drop(columns=["Churn"]), (data["Churn"] == "Yes").astype(int)
+
+
+def test_linear_round_trip_is_exact(tmp_path, data):
+    customers, _ = data
+    pipeline = joblib.load(MODEL_PATH)
+    manifest = export_pipeline(pipeline, tmp_path / "churn.model", source_path=MODEL_PATH)
+    assert manifest["model"]["type"] == "linear"
+
+    scorer = load_artifact(tmp_path / "churn.model")
+    assert isinstance(scorer.coef, np.memmap) or isinstance(scorer.coef.base, np.memmap)
+    np.testing.assert_array_equal(scorer.predict_proba(customers), pipeline.predict_proba(customers)[:, 1])
+    record = customers.to_dict("records")[0]
+    assert scorer.predict_one(record) == (pipeline.predict(customers.iloc[[0]])[0], pytest.approx(
+        pipeline.predict_proba(customers.iloc[[0]])[0, 1], abs=1e-12))
+
+    # An MLflow run's bare classifier, with the preprocessing of the served pipeline
+    runs = sorted(glob.glob(str(ROOT / "notebooks" / "mlruns" / "*" / "models" / "*" / "artifacts" / "model.pkl")))
+    for path in runs[:1]:
+        model = joblib.load(path)
+        export_pipeline(model, tmp_path / "run.model", source_path=path, preprocessing=pipeline)
+        X = pipeline.named_steps["preprocessing"].transform(customers)
+        np.testing.assert_array_equal(load_artifact(tmp_path / "run.model").predict_proba(customers),
+                                      model.predict_proba(X)[:, 1])
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0),
+    HistGradientBoostingClassifier(max_iter=30, random_state=0),
+], ids=["random_forest", "hist_gradient_boosting"])
+def test_tree_round_trip_matches_sklearn(tmp_path, data, model):
+    customers, churn = data
+    pipeline = Pipeline([("preprocessing", create_preprocessing_pipeline()), ("classifier", model)])
+    pipeline.fit(customers, churn)
+    export_pipeline(pipeline, tmp_path / "trees.model")
+
+    scorer = load_artifact(tmp_path / "trees.model")
+    assert isinstance(scorer, TreeScorer) and not scorer.linear
+    np.testing.assert_allclose(scorer.predict_proba(customers), pipeline.predict_proba(customers)[:, 1],
+                               rtol=0, atol=1e-12)
+    labels = [scorer.predict_one(record)[0] for record in customers.head(200).to_dict("records")]
+    np.testing.assert_array_equal(labels, pipeline.predict(customers.head(200)))
+
+
+def test_load_needs_no_sklearn_and_checks_the_manifest(tmp_path):
+    export_pipeline(joblib.load(MODEL_PATH), tmp_path / "churn.model")
+    code = ("import sys; from src.artifact import load_artifact; "
+            f"load_artifact({str(tmp_path / 'churn.model')!r}); print('sklearn' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+    manifest_path = tmp_path / "churn.model" / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["arrays"]["coef"]["shape"] = [3]
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(ValueError):
+        load_artifact(tmp_path / "churn.model")
+
+    manifest["schema_version"] = 99
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(ValueError):
+        load_artifact(tmp_path / "churn.model")
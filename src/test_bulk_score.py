@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.bulk_score import score_file
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+def test_chunked_scores_match_pipeline(tmp_path):
+    output = tmp_path / "scored.csv"
+
+    rows = score_file(str(DATA_PATH), str(output), str(MODEL_PATH), workers=1, chunk_size=1000)
+
+    customers = pd.read_csv(DATA_PATH)
+    scored = pd.read_csv(output)
+    expected = joblib.load(MODEL_PATH).predict_proba(customers)[:, 1]
+    assert rows == len(customers)
+    assert (scored["customerID"] == customers["customerID"]).all()
+    np.testing.assert_allclose(scored["churn_probability"], expected, rtol=1e-12)
+
+
+def test_process_pool_matches_single_process_in_input_order(tmp_path):
+    single, pooled = tmp_path / "single.csv", tmp_path / "pooled.csv"
+
+    # 15 chunks: more than the 2 per worker kept in flight, so the pool is refilled as results come back
+    score_file(str(DATA_PATH), str(single), str(MODEL_PATH), workers=1, chunk_size=500)
+    rows = score_file(str(DATA_PATH), str(pooled), str(MODEL_PATH), workers=2, chunk_size=500)
+
+    customers = pd.read_csv(DATA_PATH)
+    scored = pd.read_csv(pooled)
+    assert rows == len(customers)
+    assert (scored["customerID"] == customers["customerID"]).all()
+    pd.testing.assert_frame_equal(scored, pd.read_csv(single))
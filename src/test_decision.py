@@ -0,0 +1,57 @@
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.decision import DecisionPolicy, main, optimal_threshold, thresholds_path
+from src.scoring import risk_codes
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+
+
+def test_label_and_band_come_from_one_binning():
+    rng = np.random.default_rng(0)
+    probabilities = np.r_[rng.random(10_000), 0.0, 0.4, 0.5, 0.7, 1.0, np.nextafter(0.4, 0)]
+
+    labels, risks = DecisionPolicy().decide(probabilities)
+    np.testing.assert_array_equal(risks, risk_codes(probabilities))
+    np.testing.assert_array_equal(labels, probabilities >= 0.5)
+
+    # A label threshold inside a band, and one on a band edge
+    for policy in (DecisionPolicy(0.3, [0.2, 0.6]), DecisionPolicy(0.6, [0.2, 0.6])):
+        labels, risks = policy.decide(probabilities)
+        np.testing.assert_array_equal(labels, probabilities >= policy.threshold)
+        np.testing.assert_array_equal(risks, (probabilities >= 0.2).astype(int) + (probabilities >= 0.6))
+        names = np.array(["Low", "Medium", "High"])
+        assert [policy.decide_one(p) for p in probabilities[-50:].tolist()] == \
+            list(zip(labels[-50:].tolist(), names[risks[-50:]].tolist()))
+
+    with pytest.raises(ValueError):
+        DecisionPolicy(0.5, [0.7, 0.4])
+    with pytest.raises(ValueError):
+        DecisionPolicy(1.5)
+
+
+def test_tuned_threshold_has_the_lowest_cost(tmp_path):
+    rng = np.random.default_rng(1)
+    churned = rng.random(2000) < 0.3
+    probabilities = np.clip(0.3 * churned + rng.normal(0.35, 0.2, 2000), 0, 1).round(3)  # with ties
+
+    threshold, cost = optimal_threshold(churned, probabilities, 5.0, 1.0)
+    candidates = np.r_[np.unique(probabilities), 1.01]
+    costs = [5 * (churned & (probabilities < t)).sum() + (~churned & (probabilities >= t)).sum() for t in candidates]
+    assert cost == min(costs)
+    assert 5 * (churned & (probabilities < threshold)).sum() + (~churned & (probabilities >= threshold)).sum() == cost
+
+    # The CLI writes the policy next to the model, where ModelVersion.load finds it
+    model = tmp_path / "churn_pipeline.pkl"
+    shutil.copy(MODEL_PATH, model)
+    main(["tune", str(model), "--data", str(ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"),
+          "--mlflow-db", ""])
+    saved = json.loads(Path(thresholds_path(model)).read_text())
+    policy = DecisionPolicy.for_model(model)
+    assert policy.threshold == saved["threshold"] < 0.5  # missing a churner costs more than a wasted offer
+    assert saved["source"]["cost_per_customer"] < saved["source"]["cost_per_customer_at_0.5"]
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.explain import Explainer, whatif_grid
+from src.scoring import CompiledScorer
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def customers():
+    return pd.read_csv(DATA_PATH).drop(columns=["customerID", "Churn"])
+
+
+def test_contributions_add_up_to_the_log_odds(pipeline, customers):
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    explanation = Explainer(scorer).explain(scorer.transform(customers))
+
+    # Same output columns x coefficients as the fitted ColumnTransformer + LogisticRegression
+    X = pipeline.named_steps["preprocessing"].transform(customers)
+    decision = pipeline.named_steps["classifier"].decision_function(X)
+    assert explanation.contributions.shape == (len(customers), len(customers.columns))
+    np.testing.assert_allclose(explanation.base_value + explanation.contributions.sum(axis=1), decision, atol=1e-9)
+    np.testing.assert_allclose(explanation.probabilities, pipeline.predict_proba(customers)[:, 1], atol=1e-12)
+
+    contract = explanation.features.index("Contract")
+    two_year = customers["Contract"].to_numpy() == "Two year"
+    assert len(set(explanation.contributions[two_year, contract])) == 1
+
+    factors = explanation.top_factors(3)
+    for i in (0, 100, 2000):
+        values = dict(zip(explanation.features, explanation.contributions[i]))
+        assert factors[i] == [f for f in sorted(values, key=values.get, reverse=True)[:3] if values[f] > 0]
+    assert explanation.rows(top=1)[5]["contributions"]["tenure"] == explanation.contributions[5, 0]
+
+
+def test_whatif_grid_skips_inconsistent_services(customers):
+    customer = customers.iloc[0].to_dict()
+    assert customer["InternetService"] == "DSL" and customer["Contract"] == "Month-to-month"
+
+    columns, changes = whatif_grid(customer, {
+        "Contract": ["Month-to-month", "One year", "Two year"],
+        "TechSupport": ["No", "Yes", "No internet service"],
+    })
+    assert {col: values[0] for col, values in columns.items()} == customer
+    assert len(changes) == len(columns["Contract"]) - 1 == 5
+    assert {"TechSupport": "Yes", "Contract": "Two year"} in changes
+    assert all(change.get("TechSupport") != "No internet service" for change in changes)
+
+    _, changes = whatif_grid(customer, {"InternetService": ["DSL", "No"], "TechSupport": ["No", "No internet service"]})
+    assert changes == []  # no internet also means no OnlineSecurity etc., which aren't varied
+
+    with pytest.raises(ValueError):
+        whatif_grid(customer, {col: ["Yes", "No"] for col in ["Partner", "Dependents", "PhoneService",
+                                                              "PaperlessBilling", "OnlineBackup", "StreamingTV",
+                                                              "StreamingMovies"]}, max_scenarios=100)
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+from src.online import OnlineChurnModel, labels
+from src.scoring import CompiledScorer
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+def test_updates_keep_layout_and_round_trip(tmp_path):
+    data = pd.read_csv(DATA_PATH)
+    y = labels(data.pop("Churn"))
+    model = OnlineChurnModel.from_pipeline(joblib.load(MODEL_PATH))
+    n_features = model.classifier.coef_.shape[1]
+    start_auc = roc_auc_score(y, model.predict_proba(data)[:, 1])
+
+    batch = data.iloc[:500].copy()
+    batch.loc[batch.index[0], "PaymentMethod"] = "Crypto"  # unseen category: ignored, not a new column
+    model.partial_fit(batch, y[:500])
+    for i in range(500, len(data), 500):
+        model.partial_fit(data.iloc[i:i + 500], y[i:i + 500])
+
+    assert model.rows_seen == len(data)
+    assert model.classifier.coef_.shape[1] == n_features
+    assert model.scaler.n_samples_seen_ > len(data)  # continued from the saved statistics
+    assert roc_auc_score(y, model.predict_proba(data)[:, 1]) > start_auc - 0.01
+
+    path = tmp_path / "churn_online.pkl"
+    model.save(str(path))
+    expected = model.predict_proba(data)[:, 1]
+    np.testing.assert_allclose(joblib.load(path).predict_proba(data)[:, 1], expected, rtol=1e-12)
+    scorer = CompiledScorer.load(str(tmp_path / "churn_online.npz"))
+    np.testing.assert_allclose(scorer.predict_proba(data), expected, rtol=1e-12)
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pytest
+
+from src.preprocessing import DataCleaner, create_preprocessing_pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+def legacy_transform(X):
+    """DataCleaner.transform before the in-place / dtype-aware rewrite"""
+    X = X.copy()
+    if 'customerID' in X.columns:
+        X = X.drop('customerID', axis=1)
+    X['TotalCharges'] = pd.to_numeric(X['TotalCharges'], errors='coerce').fillna(0)
+    X['SeniorCitizen'] = X['SeniorCitizen'].astype(str)
+    return X
+
+
+@pytest.fixture(scope="module")
+def customers():
+    return pd.read_csv(DATA_PATH).drop(columns="Churn")
+
+
+@pytest.fixture(scope="module")
+def preprocessor(customers):
+    return create_preprocessing_pipeline().fit(customers).named_steps['preprocessor']
+
+
+@pytest.mark.parametrize("copy", [True, False])
+def test_encoded_output_is_byte_identical(customers, preprocessor, copy):
+    expected = preprocessor.transform(legacy_transform(customers))
+
+    cleaned = DataCleaner(copy=copy).transform(customers.copy())
+
+    assert preprocessor.transform(cleaned).tobytes() == expected.tobytes()
+
+
+def test_numeric_total_charges_skips_coercion(customers, preprocessor):
+    numeric = customers.assign(TotalCharges=pd.to_numeric(customers['TotalCharges'], errors='coerce'))
+
+    cleaned = DataCleaner().transform(numeric)
+
+    assert cleaned['TotalCharges'].isna().sum() == 0
+    assert preprocessor.transform(cleaned).tobytes() == \
+        preprocessor.transform(legacy_transform(customers)).tobytes()
+
+
+def test_copy_false_cleans_in_place(customers):
+    X = customers.copy()
+    cleaned = DataCleaner(copy=False).transform(X)
+    assert cleaned is X and 'customerID' not in X.columns
+
+    Y = customers.copy()
+    DataCleaner().transform(Y)
+    assert 'customerID' in Y.columns and Y['TotalCharges'].dtype == object
+
+
+def test_old_pickles_default_to_copy():
+    pipeline = joblib.load(ROOT / "models" / "churn_pipeline.pkl")
+    cleaner = pipeline.named_steps['preprocessing'].named_steps['cleaner']
+    assert cleaner.copy is True
+    assert cleaner.get_params() == {'copy': True}
+
+
+@pytest.mark.parametrize("encoding", ["sparse", "codes"])
+def test_compact_encodings_match_dense(customers, encoding):
+    from sklearn.linear_model import LogisticRegression
+    from src.linear_models import CategoryCodeLogisticRegression
+
+    y = (pd.read_csv(DATA_PATH)['Churn'] == 'Yes').astype(int)
+    dense = create_preprocessing_pipeline().fit_transform(customers)
+    X = create_preprocessing_pipeline(encoding).fit_transform(customers)
+
+    if encoding == 'sparse':
+        assert (X.toarray() == dense).all()
+        model = LogisticRegression(class_weight='balanced', max_iter=1000)
+    else:
+        assert set(X.dtypes.astype(str)) == {'float32', 'int8'}
+        model = CategoryCodeLogisticRegression(class_weight='balanced', max_iter=1000)
+
+    reference = LogisticRegression(class_weight='balanced', max_iter=1000).fit(dense, y)
+    probabilities = model.fit(X, y).predict_proba(X)[:, 1]
+    assert abs(probabilities - reference.predict_proba(dense)[:, 1]).max() < 1e-3
@@ -0,0 +1,96 @@
+import os
+import shutil
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.score_index import IndexCatalog, ScoreIndex, build_from_file, build_index
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+def test_index_answers_like_the_model(tmp_path):
+    manifest = build_from_file(str(DATA_PATH), str(tmp_path), str(MODEL_PATH), "v1", workers=1, chunk_size=2000)
+    index = ScoreIndex(str(tmp_path / "v1"))
+
+    customers = pd.read_csv(DATA_PATH)
+    expected = joblib.load(MODEL_PATH).predict_proba(customers)[:, 1].astype(np.float32)
+    assert manifest["rows"] == len(index) == len(customers)
+    for i in range(0, len(customers), 97):
+        probability, risk = index.lookup(customers["customerID"][i])
+        assert probability == expected[i]
+        assert risk == ("High" if probability > 0.7 else "Medium" if probability > 0.4 else "Low")
+    assert index.lookup("0000-NOPE") is None
+    assert index.lookup("a customer ID far longer than any in the index") is None
+
+    top = index.top(5)
+    assert [p for _, p, _ in top] == sorted(expected, reverse=True)[:5]
+    assert index.top(2, offset=3) == top[3:5]
+    assert sum(index.band_counts().values()) == len(customers)
+    assert index.matches(str(MODEL_PATH))
+
+
+def test_duplicates_and_catalog_staleness(tmp_path):
+    build_index(str(tmp_path / "v1"), ["a", "b", "a"], [0.1, 0.5, 0.9], "v1")
+    catalog = IndexCatalog(str(tmp_path))
+    index = catalog.get("v1")
+    assert len(index) == 2 and index.manifest["duplicate_ids"] == 1
+    assert index.lookup("a") == (pytest.approx(0.9), "High")
+
+    # Rebuilt in place -> re-opened on the next get()
+    os.utime(tmp_path / "v1" / "manifest.json", ns=(0, 0))
+    build_index(str(tmp_path / "v1"), ["c"], [0.2], "v1")
+    assert catalog.get("v1").lookup("c") == (pytest.approx(0.2), "Low")
+
+    with pytest.raises(KeyError):
+        catalog.get("v2")
+
+    model = tmp_path / "model.pkl"
+    shutil.copy(MODEL_PATH, model)
+    build_index(str(tmp_path / "v3"), ["a"], [0.5], "v3", model_path=str(model))
+    assert catalog.get("v3", str(model)).lookup("a") is not None
+    model.write_bytes(model.read_bytes() + b"retrained")
+    with pytest.raises(ValueError):
+        catalog.get("v3", str(model))
+
+
+
+def test_rebuilds_swap_the_index_atomically(tmp_path, monkeypatch):
+    # An index written as a plain directory (before the symlink swap) is replaced too
+    build_index(str(tmp_path / "v1"), ["a"], [0.1], "v1")
+    build = os.path.realpath(tmp_path / "v1")
+    os.remove(tmp_path / "v1")
+    os.rename(build, tmp_path / "v1")
+
+    catalog = IndexCatalog(str(tmp_path))
+    assert catalog.get("v1").lookup("a") == (pytest.approx(0.1), "Low")
+    build_index(str(tmp_path / "v1"), ["a"], [0.1], "v1")
+    assert os.path.islink(tmp_path / "v1")
+
+    # After every rename a rebuild makes, the index opens: the old one or the new one
+    seen = []
+
+    def checked(rename):
+        def spy(*args):
+            rename(*args)
+            seen.append(ScoreIndex(str(tmp_path / "v1")).lookup("a")[0])
+        return spy
+
+    monkeypatch.setattr(os, "rename", checked(os.rename))
+    monkeypatch.setattr(os, "replace", checked(os.replace))
+    for probability in (0.5, 0.9):
+        build_index(str(tmp_path / "v1"), ["a"], [probability], "v1")
+    monkeypatch.undo()
+    assert seen == [pytest.approx(0.5), pytest.approx(0.9)]  # one swap per build
+    assert sorted(os.listdir(tmp_path)) == ["v1", os.readlink(tmp_path / "v1")]  # older builds removed
+
+    # Files gone while re-opening (rebuilt twice in a row): the catalog keeps the index it had
+    assert catalog.get("v1").lookup("a") == (pytest.approx(0.9), "High")
+    build_index(str(tmp_path / "v1"), ["a"], [0.2], "v1")
+    os.remove(tmp_path / "v1" / "ids.npy")
+    assert catalog.get("v1").lookup("a") == (pytest.approx(0.9), "High")
@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.scoring import CompiledScorer
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def customers():
+    # Whole Telco CSV, including the blank TotalCharges rows
+    return pd.read_csv(DATA_PATH).drop(columns="Churn")
+
+
+def test_batch_matches_sklearn_exactly(pipeline, customers):
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    expected = pipeline.predict_proba(customers)[:, 1]
+
+    np.testing.assert_array_equal(scorer.predict_proba(customers), expected)
+
+
+def test_single_matches_sklearn(pipeline, customers):
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    expected_proba = pipeline.predict_proba(customers)[:, 1]
+    expected_label = pipeline.predict(customers)
+
+    results = [scorer.predict_one(r) for r in customers.to_dict("records")]
+    labels = np.array([label for label, _ in results])
+    probas = np.array([proba for _, proba in results])
+
+    # Per-row dot products can differ from the batched BLAS call in the last bit
+    np.testing.assert_allclose(probas, expected_proba, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(labels, expected_label)
+
+
+def test_new_customer_blank_total_charges(pipeline, customers):
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    row = customers.iloc[[0]].assign(TotalCharges="")
+
+    expected = pipeline.predict_proba(row)[0, 1]
+    assert scorer.predict_proba_one(row.to_dict("records")[0]) == pytest.approx(expected, abs=1e-12)
+
+
+def test_unknown_binary_category_raises_like_sklearn(pipeline, customers):
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    record = customers.to_dict("records")[0]
+    record["gender"] = "Unknown"
+
+    with pytest.raises(ValueError):
+        pipeline.predict_proba(pd.DataFrame([record]))
+    with pytest.raises(ValueError):
+        scorer.predict_proba_one(record)
+
+
+def test_saved_artifact_round_trip(pipeline, customers, tmp_path):
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    path = tmp_path / "scorer.npz"
+    scorer.save(path, source_path=MODEL_PATH)
+
+    loaded = CompiledScorer.load(path)
+
+    np.testing.assert_array_equal(loaded.predict_proba(customers), scorer.predict_proba(customers))
+    record = customers.to_dict("records")[0]
+    assert loaded.predict_one(record) == scorer.predict_one(record)
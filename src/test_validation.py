@@ -0,0 +1,107 @@
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.scoring import CompiledScorer
+from src.validation import BulkValidationError, BulkValidator
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "models" / "churn_pipeline.pkl"
+DATA_PATH = ROOT / "data" / "raw" / "WA_Fn-UseC_-Telco-Customer-Churn.csv"
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    # As a JSON client sends them: TotalCharges stays a string (11 are blank)
+    data = pd.read_csv(DATA_PATH, dtype={"TotalCharges": str}, keep_default_na=False)
+    return data.drop(columns=["customerID", "Churn"]).to_dict("records")
+
+
+def test_typed_arrays_score_like_the_pipeline(pipeline, rows):
+    scorer = CompiledScorer.from_pipeline(pipeline)
+    validator = BulkValidator.from_scorer(scorer)
+    assert BulkValidator.from_pipeline(pipeline).categories == validator.categories
+
+    batch = validator.validate(rows)
+    expected = pipeline.predict_proba(pd.DataFrame(rows))[:, 1]
+    X = scorer.transform_codes(batch.numeric, batch.codes)
+    np.testing.assert_allclose(scorer.predict_proba_features(X), expected, rtol=0, atol=1e-12)
+
+    columns = {col: [row[col] for row in rows] for col in rows[0]}
+    np.testing.assert_array_equal(validator.validate(columns).codes["Contract"], batch.codes["Contract"])
+    np.testing.assert_array_equal(scorer.predict_proba(batch.columns()), scorer.predict_proba(columns))
+
+    part = batch.take([5, 0])
+    assert part.columns()["SeniorCitizen"] == [rows[5]["SeniorCitizen"], rows[0]["SeniorCitizen"]]
+    assert part.columns()["tenure"] == [rows[5]["tenure"], rows[0]["tenure"]]
+    assert len(batch.take(slice(10, 20))) == 10
+
+
+def test_invalid_values_are_reported_by_row(pipeline, rows):
+    validator = BulkValidator.from_scorer(CompiledScorer.from_pipeline(pipeline))
+    bad = [dict(row) for row in rows[:5]]
+    bad[1].update(Contract="Weekly", tenure=-3)
+    bad[2].update(TotalCharges="n/a", tenure=2.5)
+    del bad[4]["gender"]
+
+    with pytest.raises(BulkValidationError) as e:
+        validator.validate(bad)
+    assert [(error["loc"], error["type"]) for error in e.value.errors] == [
+        ((1, "tenure"), "greater_than_equal"),
+        ((1, "Contract"), "enum"),
+        ((2, "tenure"), "int_from_float"),
+        ((2, "TotalCharges"), "float_parsing"),
+        ((4, "gender"), "missing"),
+    ]
+
+    with pytest.raises(BulkValidationError) as e:
+        validator.validate([dict(row, gender="?") for row in rows[:150]])
+    assert e.value.error_count == 150 and len(e.value.errors) == validator.max_errors
+
+    with pytest.raises(BulkValidationError) as e:
+        validator.validate({"tenure": [1, 2]})
+    assert {"loc": ("gender",), "msg": "Field required", "type": "missing"} in e.value.errors
+
+
+def test_coercions_match_the_customer_model(pipeline, rows):
+    validator = BulkValidator.from_scorer(CompiledScorer.from_pipeline(pipeline))
+    customers = [dict(rows[0], tenure="5", MonthlyCharges="29.85", SeniorCitizen="1"),
+                 dict(rows[0], tenure=5.0, MonthlyCharges=True, TotalCharges=" ")]
+    batch = validator.validate(customers)
+    assert batch.numeric["tenure"].tolist() == [5, 5]
+    assert batch.numeric["MonthlyCharges"].tolist() == [29.85, 1.0]
+    assert batch.numeric["TotalCharges"].tolist() == [float(rows[0]["TotalCharges"]), 0.0]
+
+    bad = [dict(rows[0], TotalCharges=True), dict(rows[0], tenure=" 5", MonthlyCharges="inf")]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no "invalid value encountered in cast" from NaN tenure
+        with pytest.raises(BulkValidationError) as e:
+            validator.validate(bad + [dict(rows[0], tenure=float("nan"))])
+    assert [(error["loc"], error["type"]) for error in e.value.errors] == [
+        ((0, "TotalCharges"), "float_parsing"),
+        ((1, "tenure"), "float_parsing"),
+        ((1, "MonthlyCharges"), "finite_number"),
+        ((2, "tenure"), "finite_number"),
+    ]
+
+
+def test_one_customer_is_checked_like_a_batch(pipeline, rows):
+    validator = BulkValidator.from_scorer(CompiledScorer.from_pipeline(pipeline))
+    assert validator.check(rows[0]) == []
+    for change in ({"tenure": -2.5, "Contract": "Weekly"}, {"TotalCharges": True, "MonthlyCharges": "inf"},
+                   {"SeniorCitizen": 7, "gender": ["Male"]}):
+        customer = dict(rows[0], **change)
+        with pytest.raises(BulkValidationError) as e:
+            validator.validate([customer])
+        assert validator.check(customer) == [{**error, "loc": error["loc"][1:]} for error in e.value.errors]
+    del customer["tenure"]
+    assert validator.check(customer)[0] == {"loc": ("tenure",), "msg": "Field required", "type": "missing"}
@@ -0,0 +1,322 @@
+"""
+Column-at-a-time validation for bulk scoring requests.
+
+Checking a 10k-customer batch with pydantic builds 10k model objects (plus a
+dict per customer for scoring). BulkValidator checks the same schema one
+column at a time and goes straight to typed arrays:
+
+- categorical columns: the value must be one of the categories the fitted
+  OneHotEncoders saw -> small integer codes (SeniorCitizen as 0/1 or '0'/'1')
+- tenure: a whole number >= 0 -> int64
+- MonthlyCharges: a finite number >= 0 -> float64
+  (both also as numeric strings or booleans, which the Customer model coerces too)
+- TotalCharges: a numeric string, a number (not a boolean), or blank (new customer -> 0) -> float64
+
+Every invalid value is reported with its row index, in the same shape as
+pydantic's errors (loc = (row, field)).
+"""
+import math
+from operator import itemgetter
+
+import numpy as np
+
+from src.scoring import STRING_CAST_COLS
+
+# (dtype, minimum) per numeric input column
+NUMERIC_RULES = {
+    'tenure': (np.int64, 0),
+    'MonthlyCharges': (np.float64, 0.0),
+    'TotalCharges': (np.float64, 0.0),
+}
+# Blank-means-zero columns (DataCleaner fills blank TotalCharges with 0)
+BLANK_AS_ZERO_COLS = ('TotalCharges',)
+
+MAX_REPORTED_ERRORS = 100
+
+_MISSING = object()  # field absent from a row
+_BLANKS = {'': '0', ' ': '0'}
+
+
+class BulkValidationError(ValueError):
+    """Invalid batch; `errors` lists the first MAX_REPORTED_ERRORS problems, `error_count` all of them"""
+
+    def __init__(self, errors, error_count):
+        super().__init__(f"{error_count} invalid value{'s' if error_count != 1 else ''} in the batch")
+        self.errors = errors
+        self.error_count = error_count
+
+
+class CustomerBatch:
+    """
+    Validated customers. Typed arrays (numeric values, category codes) when they
+    came through a BulkValidator, plain columns otherwise; columns() gives the
+    plain {feature: list of values} form either way (built once, on demand).
+    """
+
+    def __init__(self, n, numeric=None, codes=None, validator=None, columns=None):
+        self.n = n
+        self.numeric = numeric      # {column: int64 / float64 array}
+        self.codes = codes          # {column: int16 array of indices into validator.categories[column]}
+        self.validator = validator
+        self._columns = columns
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Wrap columns that were already validated (e.g. by pydantic)"""
+        n = len(next(iter(columns.values()))) if columns else 0
+        return cls(n, columns=columns)
+
+    def __len__(self):
+        return self.n
+
+    def columns(self):
+        if self._columns is None:
+            columns = {col: values.tolist() for col, values in self.numeric.items()}
+            for col, codes in self.codes.items():
+                columns[col] = self.validator.values[col][codes].tolist()
+            self._columns = columns
+        return self._columns
+
+    def take(self, rows):
+        """The customers at `rows` (a slice or a list of indices) as a new batch"""
+        if self.codes is None:
+            if isinstance(rows, slice):
+                columns = {col: values[rows] for col, values in self._columns.items()}
+            else:
+                columns = {col: [values[i] for i in rows] for col, values in self._columns.items()}
+            return CustomerBatch.from_columns(columns)
+        if not isinstance(rows, slice):
+            rows = np.asarray(rows, dtype=np.intp)
+        numeric = {col: values[rows] for col, values in self.numeric.items()}
+        codes = {col: values[rows] for col, values in self.codes.items()}
+        return CustomerBatch(len(next(iter(codes.values()))), numeric, codes, self.validator)
+
+
+class BulkValidator:
+    """Checks a batch column by column against the categories of one fitted model"""
+
+    def __init__(self, categories, numeric_rules=None, max_errors=MAX_REPORTED_ERRORS):
+        # {column: list of categories}, in the model's own order (codes index into it)
+        self.categories = {col: list(values) for col, values in categories.items()}
+        self.numeric_rules = dict(NUMERIC_RULES if numeric_rules is None else numeric_rules)
+        self.max_errors = max_errors
+        self.fields = list(self.numeric_rules) + list(self.categories)
+        self._integer = {col: np.issubdtype(dtype, np.integer) for col, (dtype, _) in self.numeric_rules.items()}
+
+        self._lookup = {}
+        self.values = {}  # what columns() gives back per code (SeniorCitizen as int again)
+        for col, values in self.categories.items():
+            lookup = {value: code for code, value in enumerate(values)}
+            if col in STRING_CAST_COLS:
+                # One-hot encoded as '0'/'1' but sent as 0/1
+                lookup.update({int(value): code for code, value in enumerate(values) if value.isdigit()})
+                self.values[col] = np.array([int(v) if v.isdigit() else v for v in values], dtype=object)
+            else:
+                self.values[col] = np.array(values, dtype=object)
+            self._lookup[col] = lookup
+
+    @classmethod
+    def from_scorer(cls, scorer):
+        """Categories from a CompiledScorer (same order as its one-hot tables)"""
+        return cls({col: list(table) for col, table, _ in scorer.cat_tables})
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Categories from the OneHotEncoders of a fitted pipeline's ColumnTransformer"""
+        from sklearn.compose import ColumnTransformer
+        from sklearn.preprocessing import OneHotEncoder
+
+        from src.scoring import _flatten_steps
+
+        categories = {}
+        for step in _flatten_steps(pipeline):
+            if not isinstance(step, ColumnTransformer):
+                continue
+            for _, transformer, cols in step.transformers_:
+                if isinstance(transformer, str):
+                    continue
+                for encoder in _flatten_steps(transformer):
+                    if isinstance(encoder, OneHotEncoder):
+                        categories.update({col: [str(c) for c in cats]
+                                           for col, cats in zip(cols, encoder.categories_)})
+        if not categories:
+            raise TypeError("No fitted OneHotEncoder found in the pipeline")
+        return cls(categories)
+
+    # ========== VALIDATION ==========
+    def validate(self, payload):
+        """
+        A list of customer dicts or a dict of columns -> CustomerBatch.
+        Raises BulkValidationError listing every invalid value by row.
+        """
+        columns, n = self._as_columns(payload)
+        errors = []
+        numeric = {}
+        for col, (dtype, minimum) in self.numeric_rules.items():
+            numeric[col] = self._numeric(col, columns[col], n, dtype, minimum, errors)
+        codes = {col: self._categorical(col, columns[col], n, errors) for col in self.categories}
+        if errors:
+            self._raise(errors)
+        return CustomerBatch(n, numeric, codes, self)
+
+    def _as_columns(self, payload):
+        if isinstance(payload, list):
+            rows = payload
+            errors = [(i, None, "Input should be a valid dictionary", "dict_type", row)
+                      for i, row in enumerate(rows) if not isinstance(row, dict)]
+            if errors:
+                self._raise(errors)
+            try:
+                return {col: list(map(itemgetter(col), rows)) for col in self.fields}, len(rows)
+            except KeyError:  # some rows lack a field
+                return {col: [row.get(col, _MISSING) for row in rows] for col in self.fields}, len(rows)
+
+        if not isinstance(payload, dict):
+            raise BulkValidationError([{"loc": (), "msg": "Input should be a list of customers or an object of "
+                                        "columns", "type": "model_type", "input": type(payload).__name__}], 1)
+        errors = []
+        for col in self.fields:
+            if col not in payload:
+                errors.append({"loc": (col,), "msg": "Field required", "type": "missing"})
+            elif not isinstance(payload[col], (list, tuple, np.ndarray)):
+                errors.append({"loc": (col,), "msg": "Input should be a valid list", "type": "list_type"})
+        lengths = {len(payload[col]) for col in self.fields if col in payload and hasattr(payload[col], '__len__')}
+        if not errors and len(lengths) > 1:
+            errors.append({"loc": (), "msg": "All columns must have the same number of customers",
+                           "type": "value_error"})
+        if errors:
+            raise BulkValidationError(errors, len(errors))
+        return payload, lengths.pop() if lengths else 0
+
+    def _numeric(self, col, values, n, dtype, minimum, errors):
+        blank_as_zero = col in BLANK_AS_ZERO_COLS
+        array = _float_array(values, blank_as_zero)
+        if array is None:
+            # Something non-numeric in there: convert value by value and report each bad one
+            array = np.fromiter((_to_float(v, blank_as_zero) for v in values), dtype=np.float64, count=n)
+
+        integer = self._integer[col]
+        bad = ~np.isfinite(array) | (array < minimum)
+        if integer:
+            bad |= array != np.floor(array)
+        for i in np.flatnonzero(bad):
+            for msg, kind in _numeric_errors(values[i], float(array[i]), integer, minimum, blank_as_zero):
+                errors.append(_error(i, col, values[i], msg, kind))
+        if errors:  # the batch is rejected anyway; NaNs can't be cast to integers
+            return array
+        return array.astype(dtype) if dtype is not np.float64 else array
+
+    def _categorical(self, col, values, n, errors):
+        lookup = self._lookup[col]
+        try:
+            return np.fromiter(map(lookup.__getitem__, values), dtype=np.int16, count=n)
+        except (KeyError, TypeError):
+            pass
+        # Unknown (or unhashable) values: find and report each one
+        codes = np.fromiter((lookup.get(v, -1) if _hashable(v) else -1 for v in values), dtype=np.int16, count=n)
+        for i in np.flatnonzero(codes < 0):
+            errors.append(_error(i, col, values[i], self._enum_message(col), "enum"))
+        return codes
+
+    def _enum_message(self, col):
+        return "Input should be one of " + ", ".join(repr(c) for c in self.categories[col])
+
+    def check(self, customer):
+        """
+        Errors for ONE customer dict by the same rules as validate(), loc = (field,),
+        [] if it is valid. No arrays are built: cheap enough for every /predict call.
+        """
+        errors = []
+        for col, (_, minimum) in self.numeric_rules.items():
+            value = customer.get(col, _MISSING)
+            blank_as_zero = col in BLANK_AS_ZERO_COLS
+            for msg, kind in _numeric_errors(value, _to_float(value, blank_as_zero), self._integer[col], minimum,
+                                             blank_as_zero):
+                errors.append(_error(0, col, value, msg, kind))
+        for col, lookup in self._lookup.items():
+            value = customer.get(col, _MISSING)
+            if not _hashable(value) or value not in lookup:
+                errors.append(_error(0, col, value, self._enum_message(col), "enum"))
+        return [{**error, "loc": error["loc"][1:]} for error in self._report(errors)]
+
+    def _raise(self, errors):
+        raise BulkValidationError(self._report(errors), len(errors))
+
+    def _report(self, errors):
+        """The first max_errors errors, by row then field, in pydantic's shape"""
+        order = {col: i for i, col in enumerate(self.fields)}
+        errors.sort(key=lambda e: (e[0], order.get(e[1], -1)))
+        return [
+            {"loc": (int(row), field) if field else (int(row),), "msg": "Field required", "type": "missing"}
+            if value is _MISSING else
+            {"loc": (int(row), field) if field else (int(row),), "msg": msg, "type": kind, "input": value}
+            for row, field, msg, kind, value in errors[:self.max_errors]
+        ]
+
+
+# ========== HELPERS ==========
+def _error(row, field, value, msg, kind):
+    return row, field, msg, kind, value
+
+
+def _numeric_errors(value, number, integer, minimum, blank_as_zero):
+    """(msg, type) of each problem with one numeric value; `number` is it as a float (NaN: not a number)"""
+    if not math.isfinite(number):
+        if isinstance(value, float) or not math.isnan(number):
+            return [("Input should be a finite number", "finite_number")]
+        return [("Input should be a number" + (" or blank" if blank_as_zero else ""), "float_parsing")]
+    problems = []
+    if integer and number != math.floor(number):
+        problems.append(("Input should be a valid integer", "int_from_float"))
+    if number < minimum:
+        problems.append((f"Input should be greater than or equal to {minimum}", "greater_than_equal"))
+    return problems
+
+
+def _float_array(values, blank_as_zero):
+    """All values as one float64 array, or None if any of them needs a closer look"""
+    if blank_as_zero:
+        # Numeric strings with the odd blank (new customers): the common TotalCharges case.
+        # float() would take booleans too (0/1 numbers also land here, and pass, value by value)
+        if getattr(values, 'dtype', None) == bool or (isinstance(values, list) and
+                                                      (True in values or False in values)):
+            return None
+        try:
+            return np.fromiter(map(float, map(_BLANKS.get, values, values)), dtype=np.float64, count=len(values))
+        except (TypeError, ValueError):
+            return None
+    try:
+        array = np.asarray(values)
+    except ValueError:  # ragged nested lists
+        return None
+    return array.astype(np.float64) if array.dtype.kind in 'iuf' else None
+
+
+def _to_float(value, blank_as_zero):
+    """
+    One value as a float, NaN if it isn't a valid number. Same coercions as the
+    Customer model: booleans and numeric strings are numbers, except in a
+    string column (blank_as_zero), where booleans aren't and blanks are 0
+    """
+    if value is _MISSING or value is None or (isinstance(value, bool) and blank_as_zero):
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        if blank_as_zero and not value.strip():
+            return 0.0
+        if not blank_as_zero and value != value.strip():
+            return math.nan  # pydantic doesn't strip numbers either
+        try:
+            return float(value)
+        except ValueError:
+            return math.nan
+    return math.nan
+
+
+def _hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True